@@ -0,0 +1 @@
+# Benchmarks for Skreenit backend; run as modules from backend/, e.g. python -m benchmarks.ws_connections
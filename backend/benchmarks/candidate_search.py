@@ -0,0 +1,176 @@
+"""
+search_candidates() latency over a generated candidate population.
+
+Creates the minimal users / candidate_profiles / candidate_skills tables,
+seeds N candidates (3-8 skills each, skewed skill popularity), applies
+migrations/create_candidate_search.sql and times representative searches,
+including walking several keyset pages. Use a throwaway local database:
+
+    createdb skreenit_bench
+    cd backend && python -m benchmarks.candidate_search \\
+        --dsn postgresql://localhost/skreenit_bench --candidates 500000
+
+Needs psycopg 3 (pip install "psycopg[binary]"); --explain prints the plan
+of each query, --skip-seed reuses an already seeded database.
+"""
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+MIGRATION = Path(__file__).resolve().parents[2] / "migrations" / "create_candidate_search.sql"
+
+SCHEMA_SQL = """
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE TABLE IF NOT EXISTS public.users (
+    id UUID PRIMARY KEY,
+    email TEXT,
+    full_name TEXT,
+    location TEXT,
+    role TEXT DEFAULT 'candidate'
+);
+CREATE TABLE IF NOT EXISTS public.candidate_profiles (
+    id UUID PRIMARY KEY,
+    user_id UUID UNIQUE,
+    title TEXT,
+    bio TEXT,
+    experience_years INTEGER,
+    resume_url TEXT
+);
+CREATE TABLE IF NOT EXISTS public.candidate_skills (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    candidate_id UUID REFERENCES public.candidate_profiles(id) ON DELETE CASCADE,
+    skill_name TEXT NOT NULL,
+    proficiency_level TEXT,
+    years_experience INTEGER
+);
+"""
+
+SEED_SQL = """
+TRUNCATE public.candidate_skills, public.candidate_profiles, public.users;
+
+INSERT INTO public.users (id, email, full_name, location)
+SELECT gen_random_uuid(), 'candidate' || g || '@bench.test', 'Candidate ' || g,
+       (ARRAY['Bengaluru', 'Mumbai', 'Pune', 'Hyderabad', 'Chennai', 'Delhi', 'Remote', 'Kolkata'])[1 + g % 8]
+FROM generate_series(1, {n}) g;
+
+INSERT INTO public.candidate_profiles (id, user_id, title, bio, experience_years)
+SELECT u.id, u.id,
+       (ARRAY['Backend Engineer', 'Frontend Developer', 'Data Engineer', 'Data Scientist',
+              'DevOps Engineer', 'QA Engineer', 'Full Stack Developer', 'Mobile Developer',
+              'Product Manager', 'Site Reliability Engineer'])[1 + abs(hashtext(u.id::text)) % 10],
+       'Experienced in building ' ||
+       (ARRAY['payment systems', 'analytics pipelines', 'mobile apps', 'web platforms',
+              'ML models', 'cloud infrastructure', 'test automation', 'search services'])[1 + abs(hashtext(u.email)) % 8] ||
+       ' for ' || (ARRAY['fintech', 'e-commerce', 'healthcare', 'edtech', 'logistics'])[1 + abs(hashtext(u.full_name)) % 5],
+       abs(hashtext(u.email || 'x')) % 26
+FROM public.users u;
+
+WITH vocab AS (
+  SELECT ARRAY['Python', 'JavaScript', 'TypeScript', 'SQL', 'React', 'Java', 'Go', 'AWS',
+               'Docker', 'Kubernetes', 'PostgreSQL', 'Node.js', 'Django', 'FastAPI', 'Vue',
+               'Spark', 'Airflow', 'Terraform', 'Kotlin', 'Swift', 'Rust', 'C++', 'Scala',
+               'Pandas', 'TensorFlow', 'PyTorch', 'Redis', 'Kafka', 'GraphQL', 'Selenium']
+         || ARRAY(SELECT 'Skill ' || i FROM generate_series(1, 170) i) AS names
+)
+INSERT INTO public.candidate_skills (candidate_id, skill_name, years_experience)
+SELECT DISTINCT ON (p.id, s.name) p.id, s.name, (random() * 10)::int
+FROM public.candidate_profiles p
+CROSS JOIN LATERAL generate_series(1, 3 + abs(hashtext(p.id::text)) % 6) k
+CROSS JOIN vocab
+CROSS JOIN LATERAL (
+  -- random()^2 skews picks towards the common skills at the front
+  SELECT vocab.names[1 + floor(array_length(vocab.names, 1) * power(random() + k * 0, 2))::int] AS name
+) s;
+
+ANALYZE public.users;
+ANALYZE public.candidate_profiles;
+ANALYZE public.candidate_skills;
+"""
+
+COLUMNS = (
+    "p_query", "p_all_skills", "p_any_skills", "p_exclude_skills", "p_min_experience",
+    "p_max_experience", "p_location", "p_limit", "p_after_score", "p_after_id",
+)
+
+CASES = [
+    ("free text", {"p_query": "backend engineer"}),
+    ("all skills", {"p_all_skills": ["Python", "PostgreSQL"]}),
+    ("any skill + experience", {"p_any_skills": ["React", "Vue"], "p_min_experience": 3, "p_max_experience": 7}),
+    ("all + exclude + location", {"p_all_skills": ["Python"], "p_exclude_skills": ["Java"], "p_location": "bengaluru"}),
+    ("text + skills + range", {"p_query": "data pipelines", "p_all_skills": ["SQL"], "p_any_skills": ["Spark", "Airflow"],
+                               "p_min_experience": 5}),
+    ("rare skill", {"p_all_skills": ["Skill 150"]}),
+]
+
+def call(cur, params, limit):
+    args = {c: None for c in COLUMNS}
+    args.update({"p_all_skills": [], "p_any_skills": [], "p_exclude_skills": [], "p_limit": limit + 1})
+    args.update(params)
+    cur.execute(
+        "SELECT * FROM public.search_candidates(" + ", ".join(f"{c} => %({c})s" for c in COLUMNS) + ")",
+        args,
+    )
+    return cur.fetchall()
+
+def timed(cur, params, limit, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        rows = call(cur, params, limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    return rows, samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL"), help="Throwaway Postgres database")
+    parser.add_argument("--candidates", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="Keyset pages to walk per case")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--explain", action="store_true")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn (or BENCH_DATABASE_URL) is required")
+
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit('psycopg 3 is required: pip install "psycopg[binary]"')
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn, conn.cursor() as cur:
+        if not args.skip_seed:
+            started = time.perf_counter()
+            cur.execute(SCHEMA_SQL)
+            # Several statements, so no server-side parameters; n is an int
+            cur.execute(SEED_SQL.format(n=int(args.candidates)))
+            print(f"seeded {args.candidates} candidates in {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        cur.execute(MIGRATION.read_text())
+        cur.execute("ANALYZE public.candidate_skills; ANALYZE public.candidate_profiles; ANALYZE public.users;")
+        print(f"applied {MIGRATION.name} in {time.perf_counter() - started:.1f} s\n")
+
+        print(f"{'case':<28} {'first page p50':>14} {'p95':>9} {'rows':>5} {'next pages avg':>15}")
+        for label, params in CASES:
+            rows, samples = timed(cur, params, args.limit, args.runs)
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            page_ms = []
+            for _ in range(args.pages - 1):
+                if len(rows) <= args.limit:
+                    break
+                last = rows[args.limit - 1]
+                started = time.perf_counter()
+                rows = call(cur, {**params, "p_after_score": last[6], "p_after_id": last[0]}, args.limit)
+                page_ms.append((time.perf_counter() - started) * 1000)
+            nxt = f"{statistics.mean(page_ms):.1f} ms" if page_ms else "-"
+            print(f"{label:<28} {statistics.median(samples):11.1f} ms {p95:6.1f} ms {min(len(rows), args.limit):5d} {nxt:>15}")
+            if args.explain:
+                args_sql = ", ".join(f"{k} => %({k})s" for k in params)
+                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM public.search_candidates({args_sql})", params)
+                print("\n".join("    " + r[0] for r in cur.fetchall()))
+
+if __name__ == "__main__":
+    main()
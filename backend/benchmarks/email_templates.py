@@ -0,0 +1,70 @@
+"""
+Email template rendering: startup and per-message cost.
+
+Compares the previous approach (a fresh Environment per call, as the old
+EmailTemplates did, and inline f-strings) against the shared environment,
+with and without a warm bytecode cache, and render_many for bulk sends.
+
+    cd backend && python -m benchmarks.email_templates --messages 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+from utils_others import email_templates
+
+def fstring_welcome(ctx):
+    return f"""
+        <div>
+          <p>Hi {ctx['name']},</p>
+          <p>Welcome to Skreenit! Your account has been created successfully.</p>
+          <p><strong>Login Email:</strong> {ctx['email']}</p>
+          {('<p><strong>Your Company ID:</strong> ' + ctx['company_id'] + '</p>') if ctx['company_id'] else ''}
+          <p>We've sent a confirmation email to your address. Please check your inbox (and spam folder) and click the confirmation link to activate your account.</p>
+          <p>Once your email is confirmed, you can login here:</p>
+          <p><a href=\"{ctx['login_url']}\">{ctx['login_url']}</a></p>
+          <p><b>Regards,</b><br/>Team Skreenit</p>
+        </div>
+        """
+
+def timed(label, fn, count=1):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    per = elapsed / count * 1e6
+    print(f"{label:<38} {elapsed * 1000:9.1f} ms  ({per:8.1f} us/msg)")
+
+def fresh_environment():
+    email_templates._env = None
+    return email_templates.get_environment()
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=10000)
+    args = parser.parse_args()
+    n = args.messages
+    contexts = [
+        {"name": f"User {i}", "email": f"user{i}@example.com", "company_id": f"CMP{i:05d}" if i % 2 else None,
+         "login_url": email_templates.LOGIN_URL}
+        for i in range(n)
+    ]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["EMAIL_TEMPLATE_CACHE_DIR"] = cache_dir
+        timed("startup, cold bytecode cache", lambda: fresh_environment().get_template("welcome.html"))
+        timed("startup, warm bytecode cache", lambda: fresh_environment().get_template("welcome.html"))
+
+        def env_per_call():
+            for ctx in contexts[:1000]:
+                env = Environment(loader=FileSystemLoader(str(email_templates.TEMPLATE_DIR)))
+                env.get_template("welcome.html").render(**ctx)
+        timed("new Environment per message (1000)", env_per_call, 1000)
+        timed("f-string", lambda: [fstring_welcome(c) for c in contexts], n)
+        timed("render() per message", lambda: [email_templates.render("welcome.html", **c) for c in contexts], n)
+        timed("render_many()", lambda: email_templates.render_many("welcome.html", contexts), n)
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,34 @@
+"""
+SkillTaxonomy.autocomplete() latency against the bundled skill dictionary.
+
+Times repeated lookups for short and longer prefixes; a single lookup is
+expected to stay well under a millisecond.
+
+    cd backend && python -m benchmarks.skill_autocomplete --iterations 10000
+"""
+import argparse
+import time
+
+from utils_others.skill_taxonomy import get_skill_taxonomy
+
+PREFIXES = ["p", "py", "reac", "java", "kube", "machine l", "zz"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    taxonomy = get_skill_taxonomy()
+    print(f"{'load dictionary':<20} {(time.perf_counter() - started) * 1000:9.2f} ms")
+
+    for prefix in PREFIXES:
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            taxonomy.autocomplete(prefix, args.limit)
+        per = (time.perf_counter() - started) / args.iterations * 1e6
+        print(f"{prefix!r:<20} {per:9.2f} us/lookup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+WebSocket connections per worker for /notification/ws/{user_id}.
+
+Starts one uvicorn worker in-process, opens N client connections (one user
+channel each), then publishes one notification per channel through the broker
+and reports connect time, memory per connection and delivery latency.
+
+    cd backend && python -m benchmarks.ws_connections --connections 2000
+
+Raise the open-file limit (ulimit -n) above the connection count first.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import threading
+import time
+
+import uvicorn
+import websockets
+
+import main
+from routers import notification
+
+def rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run(connections: int, port: int) -> None:
+    url = f"ws://127.0.0.1:{port}/notification/ws"
+    before = rss_mb()
+    started = time.perf_counter()
+    sockets = []
+    for batch_start in range(0, connections, 200):
+        batch = range(batch_start, min(batch_start + 200, connections))
+        sockets.extend(await asyncio.gather(*(
+            websockets.connect(f"{url}/bench-{i}?token=bench-{i}", max_queue=16) for i in batch
+        )))
+    connect_s = time.perf_counter() - started
+    await asyncio.sleep(0.5)
+    after = rss_mb()
+    stats = notification.get_broker().stats()
+
+    broker = notification.get_broker()
+    sent_at = {}
+
+    def publish_all():
+        for i in range(connections):
+            sent_at[i] = time.perf_counter()
+            broker.publish(f"bench-{i}", {"type": "notification", "data": {"id": str(i)}})
+
+    async def receive(i, ws):
+        msg = json.loads(await ws.recv())
+        return (time.perf_counter() - sent_at[int(msg["data"]["id"])]) * 1000
+
+    receivers = [asyncio.create_task(receive(i, ws)) for i, ws in enumerate(sockets)]
+    await asyncio.sleep(0.1)
+    publish_started = time.perf_counter()
+    await asyncio.to_thread(publish_all)
+    latencies = sorted(await asyncio.gather(*receivers))
+    fanout_s = time.perf_counter() - publish_started
+
+    print(f"connections:         {stats['connections']}")
+    print(f"connect time:        {connect_s:.2f}s ({connections / connect_s:.0f}/s)")
+    print(f"server+client RSS:   +{after - before:.1f} MB ({(after - before) * 1024 / connections:.1f} KB/connection)")
+    print(f"publish to all:      {fanout_s * 1000:.0f} ms")
+    print(f"delivery latency:    p50 {statistics.median(latencies):.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+
+    await asyncio.gather(*(ws.close() for ws in sockets))
+
+def bench_user(token: str) -> dict:
+    # Each connection authenticates as the user whose channel it opens
+    return {"id": token, "role": "candidate"}
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    notification.get_user_from_bearer = bench_user
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_queue=16)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        asyncio.run(run(args.connections, args.port))
+    finally:
+        server.should_exit = True
+        thread.join(5)
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,14 +1,25 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from routers import auth, applicant, recruiter, dashboard, analytics, notification, video
+from services.email_outbox import start_outbox_worker, stop_outbox_worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_outbox_worker()
+    yield
+    # Flush in-process buffers before the worker exits
+    analytics.shutdown_analytics_queue()
+    stop_outbox_worker()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Skreenit API",
     description="Backend API for Skreenit recruitment platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Health check endpoint
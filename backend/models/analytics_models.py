@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, Dict
+from enum import Enum
 
 class AnalyticsEventRequest(BaseModel):
     user_id: Optional[str] = None
@@ -7,3 +8,7 @@ class AnalyticsEventRequest(BaseModel):
     event_data: Optional[Dict] = None
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
+
+class RollupGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from models.applicant_models import ApplicationStatus
 
 class NotificationRequest(BaseModel):
     user_id: str
@@ -8,3 +9,27 @@ class NotificationRequest(BaseModel):
     type: str
     related_id: Optional[str] = None
     is_read: Optional[bool] = False
+
+class NotificationTemplate(BaseModel):
+    title: str
+    message: str
+    type: str
+    related_id: Optional[str] = None
+
+class NotificationAudience(BaseModel):
+    # Either explicit recipients...
+    user_ids: Optional[List[str]] = None
+    # ...or every applicant of a job, optionally narrowed by application status
+    job_id: Optional[str] = None
+    statuses: Optional[List[ApplicationStatus]] = None
+
+class NotificationFanoutRequest(BaseModel):
+    fanout_key: str = Field(..., min_length=1, max_length=200)
+    template: NotificationTemplate
+    audience: NotificationAudience
+
+class MarkReadRequest(BaseModel):
+    # Always applies to the caller's own notifications
+    notification_ids: Optional[List[str]] = None
+    # Mark every unread notification of the user when true
+    all: bool = False
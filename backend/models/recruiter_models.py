@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum
+from models.applicant_models import ApplicationStatus
 
 class JobStatus(str, Enum):
     draft = "draft"
@@ -55,3 +56,11 @@ class RecruiterProfileRequest(BaseModel):
     phone: Optional[str] = None
     position: Optional[str] = None
     linkedin_url: Optional[str] = None
+
+class BulkStatusChangeRequest(BaseModel):
+    application_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: ApplicationStatus
+    # In-app notification and/or email to each candidate whose status changed
+    notify: bool = False
+    send_email: bool = False
+    message: Optional[str] = Field(default=None, max_length=2000)
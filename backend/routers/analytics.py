@@ -1,12 +1,29 @@
-from fastapi import APIRouter, HTTPException, Header
-from models.analytics_models import AnalyticsEventRequest
-from datetime import datetime
-from utils_others.security import get_user_from_bearer
+import os
+import json
+import itertools
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from models.analytics_models import AnalyticsEventRequest, RollupGranularity
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+from utils_others.security import get_user_from_bearer, ensure_role
 from services.supabase_client import get_client
+from services.analytics_queue import AnalyticsQueue
+from services.analytics_service import AnalyticsService, parse_timestamp
+from services.analytics_sketches import UniqueCountService, day_range
+from services.analytics_export import EXPORT_FORMATS, EXPORT_PAGE_SIZE, ExportError, stream_events
 
 router = APIRouter(tags=["analytics"])
 
+MAX_BATCH_EVENTS = 1000
+MAX_BATCH_BYTES = 1024 * 1024
+_events_adapter = TypeAdapter(List[AnalyticsEventRequest])
+
 _supabase = None
+_analytics_queue: Optional[AnalyticsQueue] = None
+_analytics_service: Optional[AnalyticsService] = None
+_unique_count_service: Optional[UniqueCountService] = None
 
 def get_supabase_client():
     global _supabase
@@ -17,7 +34,66 @@ def get_supabase_client():
             raise RuntimeError("Supabase client not configured: " + str(e)) from e
     return _supabase
 
-@router.post("/")
+def get_analytics_service() -> AnalyticsService:
+    global _analytics_service
+    if _analytics_service is None:
+        _analytics_service = AnalyticsService(get_supabase_client())
+    return _analytics_service
+
+def get_unique_count_service() -> UniqueCountService:
+    global _unique_count_service
+    if _unique_count_service is None:
+        _unique_count_service = UniqueCountService(get_supabase_client())
+    return _unique_count_service
+
+def get_analytics_queue() -> AnalyticsQueue:
+    global _analytics_queue
+    if _analytics_queue is None:
+        _analytics_queue = AnalyticsQueue(
+            client=get_supabase_client(),
+            max_size=int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("ANALYTICS_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "2.0")),
+        )
+        _analytics_queue.add_listener(get_analytics_service().record_rollups)
+        _analytics_queue.add_listener(get_unique_count_service().record_events)
+        _analytics_queue.start()
+    return _analytics_queue
+
+def require_recruiter(authorization: str = Header(default=None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = authorization.replace("Bearer ", "")
+    try:
+        user = get_user_from_bearer(token)
+        ensure_role(user, "recruiter")
+        return user
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+def ensure_job_owner(job_id: str, recruiter_id: str) -> None:
+    res = (
+        get_supabase_client().table("jobs")
+        .select("id")
+        .eq("id", job_id)
+        .eq("created_by", recruiter_id)
+        .limit(1)
+        .execute()
+    )
+    err = getattr(res, "error", None)
+    if err:
+        raise Exception(f"Job lookup error: {err}")
+    if not res.data:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+def shutdown_analytics_queue() -> None:
+    """Flush buffered events; called from the app shutdown hook."""
+    if _analytics_queue is not None:
+        _analytics_queue.stop()
+
+@router.post("/", status_code=202)
 async def create_event(payload: AnalyticsEventRequest, authorization: str = Header(default=None)):
     try:
         data = payload.dict()
@@ -30,23 +106,198 @@ async def create_event(payload: AnalyticsEventRequest, authorization: str = Head
                 data["user_id"] = user.get("id")
             except Exception:
                 pass
-        supabase = get_supabase_client()
-        res = supabase.table("analytics_events").insert(data).execute()
-        err = getattr(res, "error", None)
-        if err:
-            raise Exception(f"Analytics insert error: {err}")
-        return {"ok": True, "data": res.data}
+        analytics_queue = get_analytics_queue()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create event: {str(e)}")
+    if not analytics_queue.enqueue(data):
+        return JSONResponse(
+            status_code=503,
+            content={"ok": False, "error": "Analytics queue is full"},
+            headers={"Retry-After": "5"},
+        )
+    return {"ok": True, "queued": True}
+
+def parse_event_batch(body: bytes) -> List[Any]:
+    """
+    Accepts a JSON array, an object with an "events" array, or NDJSON (one event
+    per line). navigator.sendBeacon posts as text/plain, so the content type is
+    not trusted and the body shape decides.
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(parsed, dict):
+        parsed = parsed.get("events", [parsed])
+    if not isinstance(parsed, list):
+        raise ValueError("Expected a JSON array, an object with 'events', or NDJSON")
+    return parsed
+
+@router.post("/batch", status_code=202)
+async def create_events_batch(request: Request, authorization: str = Header(default=None)):
+    body = await request.body()
+    if len(body) > MAX_BATCH_BYTES:
+        raise HTTPException(status_code=413, detail="Analytics batch too large")
+    try:
+        raw_events = parse_event_batch(body)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid analytics batch: {str(e)}")
+    if len(raw_events) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_EVENTS} events per batch")
+    try:
+        events = _events_adapter.validate_python(raw_events)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    if not events:
+        return {"ok": True, "queued": 0}
+
+    # Resolve the caller once for the whole batch instead of per event
+    token_user_id = None
+    if authorization and authorization.startswith("Bearer "):
+        try:
+            token_user_id = get_user_from_bearer(authorization.replace("Bearer ", "")).get("id")
+        except Exception:
+            token_user_id = None
+
+    created_at = datetime.utcnow().isoformat()
+    rows = []
+    for event in events:
+        data = event.dict()
+        data["created_at"] = created_at
+        if token_user_id:
+            data["user_id"] = token_user_id
+        rows.append(data)
+
+    try:
+        accepted = get_analytics_queue().enqueue_many(rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create events: {str(e)}")
+    if accepted == 0:
+        return JSONResponse(
+            status_code=503,
+            content={"ok": False, "error": "Analytics queue is full"},
+            headers={"Retry-After": "5"},
+        )
+    return {"ok": True, "queued": accepted, "rejected": len(rows) - accepted}
+
+@router.get("/queue-stats")
+def queue_stats(user: dict = Depends(require_recruiter)):
+    try:
+        return {"ok": True, "data": get_analytics_queue().stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read queue stats: {str(e)}")
+
+def resolve_range(since: Optional[datetime], until: Optional[datetime], default_days: int = 7):
+    end = parse_timestamp(until) if until else datetime.now(timezone.utc)
+    start = parse_timestamp(since) if since else end - timedelta(days=default_days)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return start, end
+
+@router.get("/rollups/series")
+def rollup_series(
+    event_type: str,
+    granularity: RollupGranularity = RollupGranularity.day,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    subject_id: Optional[str] = None,
+    user: dict = Depends(require_recruiter),
+):
+    start, end = resolve_range(since, until)
+    try:
+        svc = get_analytics_service()
+        data = svc.get_rollup_series(event_type, granularity.value, start, end, subject_id=subject_id)
+        return {"ok": True, "data": data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch rollups: {str(e)}")
+
+@router.get("/rollups/top")
+def rollup_top(
+    event_type: str,
+    granularity: RollupGranularity = RollupGranularity.day,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(default=10, ge=1, le=100),
+    user: dict = Depends(require_recruiter),
+):
+    start, end = resolve_range(since, until)
+    try:
+        svc = get_analytics_service()
+        return {"ok": True, "data": svc.get_top_subjects(event_type, granularity.value, start, end, limit=limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch top subjects: {str(e)}")
+
+@router.get("/unique")
+def unique_count(
+    metric: str,
+    job_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    user: dict = Depends(require_recruiter),
+):
+    """Approximate distinct visitors/applicants for one of the recruiter's jobs over a day range (HyperLogLog)."""
+    try:
+        start, end = day_range(since, until)
+        ensure_job_owner(job_id, user["id"])
+        svc = get_unique_count_service()
+        return {"ok": True, "data": svc.unique_count(metric, job_id, start, end)}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to count unique visitors: {str(e)}")
+
+@router.get("/export")
+def export_events(
+    since: datetime,
+    until: datetime,
+    fmt: str = Query(default="parquet", alias="format", pattern="^(arrow|parquet)$"),
+    batch_size: int = Query(default=EXPORT_PAGE_SIZE, ge=100, le=EXPORT_PAGE_SIZE),
+    user: dict = Depends(require_recruiter),
+):
+    """Stream events in [since, until) as Arrow IPC or Parquet using chunked transfer."""
+    start, end = resolve_range(since, until)
+    try:
+        chunks = stream_events(get_supabase_client(), start, end, fmt=fmt, batch_size=batch_size)
+        # Pull the first chunk here so setup/query errors still produce a proper status code
+        first = next(chunks, b"")
+    except ExportError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export events: {str(e)}")
+    extension = "arrows" if fmt == "arrow" else "parquet"
+    filename = f"analytics_{start:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        itertools.chain([first], chunks),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.get("/user/{user_id}")
-def list_events(user_id: str):
-    try:
-        supabase = get_supabase_client()
-        res = supabase.table("analytics_events").select("*").eq("user_id", user_id).execute()
-        err = getattr(res, "error", None)
-        if err:
-            raise Exception(f"Analytics fetch error: {err}")
-        return {"ok": True, "data": res.data}
+def list_events(
+    user_id: str,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    event_type: Optional[str] = None,
+):
+    try:
+        svc = get_analytics_service()
+        page = svc.list_events(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            since=parse_timestamp(since) if since else None,
+            until=parse_timestamp(until) if until else None,
+            event_type=event_type,
+        )
+        return {"ok": True, "data": page["events"], "next_cursor": page["next_cursor"]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch events: {str(e)}")
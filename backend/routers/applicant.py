@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Form, File, UploadFile, HTTPException, Request, Header, Depends, Body
+from fastapi import APIRouter, Form, File, UploadFile, HTTPException, Request, Header, Depends, Body, Query
 import os, httpx
 from typing import Any, Dict, List, Optional
 from services.supabase_client import get_client
@@ -8,6 +8,7 @@ from models.applicant_models import (
 )
 from services.applicant_service import ApplicantService
 from utils_others.security import get_user_from_bearer, ensure_role
+from utils_others.skill_taxonomy import get_skill_taxonomy
 
 router = APIRouter(tags=["applicant"])
 
@@ -84,6 +85,11 @@ async def upload_resume(applicant_id: str = Form(...), resume: UploadFile = File
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume upload failed: {str(e)}")
 
+@router.get("/skills/autocomplete")
+def autocomplete_skills(q: str = "", limit: int = Query(default=10, ge=1, le=20)):
+    """Canonical skill names matching a typed prefix (names, aliases and later words)."""
+    return {"ok": True, "data": get_skill_taxonomy().autocomplete(q, limit)}
+
 @router.get("/resume-url/{candidate_id}")
 def get_resume_signed_url(candidate_id: str, user: dict = Depends(require_candidate)):
     try:
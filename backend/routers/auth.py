@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Request, HTTPException, Form, UploadFile, File
+import asyncio
+import logging
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException, Form, UploadFile, File
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from models.auth_models import LoginRequest
@@ -66,7 +68,7 @@ async def register(
         except RuntimeError as re:
             return JSONResponse(status_code=500, content={"ok": False, "error": str(re)})
 
-        result = service.register(
+        result = await service.register(
             full_name=full_name,
             email=email,
             mobile=mobile,
@@ -102,7 +104,7 @@ async def login(request: LoginRequest):
         return JSONResponse(status_code=401, content={"ok": False, "error": str(e)})
 
 @router.post("/password-updated")
-async def password_updated(request: Request):
+async def password_updated(request: Request, background_tasks: BackgroundTasks):
     try:
         auth_header: Optional[str] = request.headers.get("authorization")
         if not auth_header or not auth_header.lower().startswith("bearer "):
@@ -113,29 +115,23 @@ async def password_updated(request: Request):
         except RuntimeError as re:
             return JSONResponse(status_code=500, content={"ok": False, "error": str(re)})
 
-        user_info = service.validate_token(token)
-        user = user_info.get("user") or {}
-        email = user.get("email")
-        metadata = user.get("user_metadata") or {}
-        role = metadata.get("role")
-        full_name = metadata.get("full_name") or None
-
+        # validate_token is a blocking HTTP call; keep it off the event loop
         try:
-            _ = auth_service.notify_password_changed(email=email, full_name=full_name)
+            user_info = await asyncio.to_thread(service.validate_token, token)
         except Exception:
-            pass
+            return JSONResponse(status_code=401, content={"ok": False, "error": "Invalid or expired token"})
+        user = user_info.get("user") or {}
 
-        if role == "recruiter":
-            try:
-                company = auth_service.get_recruiter_company_info(user.get("id"))
-                cid = company.get("company_id")
-                cname = company.get("company_name")
-                if cid:
-                    _ = auth_service.send_recruiter_company_email(email=email, full_name=full_name, company_id=cid, company_name=cname)
-            except Exception:
-                pass
+        # Company lookup and emails happen after the response is sent
+        background_tasks.add_task(_send_password_updated_emails, service, user)
 
         # After updating metadata, return user info for frontend to handle login
         return {"ok": True, "data": {"user": user, "message": "Password updated successfully. Please log in."}}
     except Exception as e:
         return JSONResponse(status_code=500, content={"ok": False, "error": str(e)})
+
+def _send_password_updated_emails(service: AuthService, user: dict) -> None:
+    try:
+        service.send_password_updated_emails(user)
+    except Exception as e:
+        logging.error(f"Password-updated emails failed for {user.get('id')}: {e}")
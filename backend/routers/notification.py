@@ -1,28 +1,218 @@
-from fastapi import APIRouter, HTTPException
-from supabase import create_client, Client
+import asyncio
 import os
-from models.notification_models import NotificationRequest
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Header, Depends, BackgroundTasks, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from typing import Optional
+from models.notification_models import NotificationRequest, NotificationFanoutRequest, MarkReadRequest
+from services.notification_service import FanoutConflict, NotificationService
+from services.notification_broker import NotificationBroker, create_broker
+from services.supabase_client import get_client
+from utils_others.security import get_user_from_bearer, ensure_role
 
 router = APIRouter(tags=["notification"])
 
-def get_supabase_client() -> Client:
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    if not supabase_url or not supabase_key:
-        raise RuntimeError("Supabase credentials missing")
-    return create_client(supabase_url, supabase_key)
+_notification_service: Optional[NotificationService] = None
+_broker: Optional[NotificationBroker] = None
+
+def get_broker() -> NotificationBroker:
+    global _broker
+    if _broker is None:
+        _broker = create_broker(os.getenv("NOTIFICATION_BROKER_BACKEND", "local"))
+    return _broker
+
+def get_notification_service() -> NotificationService:
+    global _notification_service
+    if _notification_service is None:
+        try:
+            supabase = get_client()
+        except Exception as e:
+            raise RuntimeError("Supabase client not configured: " + str(e)) from e
+        _notification_service = NotificationService(supabase)
+        _notification_service.add_listener(get_broker().publish_rows)
+    return _notification_service
+
+def require_user(authorization: str = Header(default=None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = authorization.replace("Bearer ", "")
+    try:
+        return get_user_from_bearer(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+def require_recruiter(authorization: str = Header(default=None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = authorization.replace("Bearer ", "")
+    try:
+        user = get_user_from_bearer(token)
+        ensure_role(user, "recruiter")
+        return user
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+def ensure_self(user: dict, user_id: str) -> None:
+    if user.get("id") != user_id:
+        raise HTTPException(status_code=403, detail="Forbidden: not your notifications")
 
 @router.post("/notify")
 def send_notification(notification: NotificationRequest):
-    client = get_supabase_client()
+    try:
+        service = get_notification_service()
+        data = service.create(notification.dict())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"ok": True, "data": data}
+
+@router.get("/inbox/{user_id}")
+def get_inbox(
+    user_id: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+    user: dict = Depends(require_user),
+):
+    ensure_self(user, user_id)
+    try:
+        service = get_notification_service()
+        page = service.list_inbox(user_id, limit=limit, cursor=cursor, unread_only=unread_only)
+        return {
+            "ok": True,
+            "data": page["notifications"],
+            "next_cursor": page["next_cursor"],
+            "unread_count": service.unread_count(user_id),
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch inbox: {str(e)}")
+
+@router.get("/unread-count/{user_id}")
+def get_unread_count(user_id: str, user: dict = Depends(require_user)):
+    ensure_self(user, user_id)
+    try:
+        return {"ok": True, "data": {"unread_count": get_notification_service().unread_count(user_id)}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch unread count: {str(e)}")
+
+@router.post("/mark-read")
+def mark_read(payload: MarkReadRequest, user: dict = Depends(require_user)):
+    if not payload.all and not payload.notification_ids:
+        raise HTTPException(status_code=400, detail="Provide notification_ids or set all=true")
+    try:
+        service = get_notification_service()
+        updated = service.mark_read(user["id"], payload.notification_ids, mark_all=payload.all)
+        return {"ok": True, "data": {"updated": updated, "unread_count": service.unread_count(user["id"])}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to mark notifications read: {str(e)}")
+
+def _run_fanout(fanout_key: str) -> None:
+    try:
+        get_notification_service().run_fanout(fanout_key)
+    except Exception:
+        # Failure is recorded on the fan-out row and visible via GET /fanout/{key}
+        pass
+
+@router.post("/fanout", status_code=202)
+def create_fanout(payload: NotificationFanoutRequest, background_tasks: BackgroundTasks, user: dict = Depends(require_recruiter)):
+    audience = payload.audience.dict()
+    if not audience.get("user_ids") and not audience.get("job_id"):
+        raise HTTPException(status_code=400, detail="audience needs user_ids or job_id")
+    try:
+        service = get_notification_service()
+        service.check_audience(audience, user["id"])
+        started = service.start_fanout(
+            payload.fanout_key,
+            template=payload.template.dict(),
+            audience=audience,
+            created_by=user["id"],
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FanoutConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start fan-out: {str(e)}")
+    if started["run"]:
+        background_tasks.add_task(_run_fanout, payload.fanout_key)
+    return JSONResponse(
+        status_code=202 if started["run"] else 200,
+        content={"ok": True, "data": started["fanout"], "started": started["run"]},
+    )
+
+@router.get("/fanout/{fanout_key}")
+def get_fanout(fanout_key: str, user: dict = Depends(require_recruiter)):
+    try:
+        fanout = get_notification_service().get_fanout(fanout_key)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch fan-out: {str(e)}")
+    # Someone else's fan-out is reported as missing rather than forbidden
+    if not fanout or fanout.get("created_by") != user["id"]:
+        raise HTTPException(status_code=404, detail="Fan-out not found")
+    return {"ok": True, "data": fanout}
+
+@router.get("/ws-stats")
+def websocket_stats(user: dict = Depends(require_recruiter)):
+    return {"ok": True, "data": get_broker().stats()}
 
-    notif = notification.dict()
-    notif["created_at"] = datetime.utcnow().isoformat()
+@router.websocket("/ws/{user_id}")
+async def notifications_ws(websocket: WebSocket, user_id: str, token: Optional[str] = None, last_seen_id: Optional[str] = None):
+    """
+    Live feed of a user's notifications. Browsers cannot set headers on a
+    WebSocket, so the bearer token comes as ?token=. Pass ?last_seen_id= to
+    receive anything missed since that notification before live delivery.
+    """
+    try:
+        if not token:
+            raise ValueError("missing token")
+        user = get_user_from_bearer(token)
+    except Exception:
+        await websocket.close(code=4401)
+        return
+    if user.get("id") != user_id:
+        await websocket.close(code=4403)
+        return
 
-    result = client.table("notifications").insert(notif).execute()
-    err = getattr(result, "error", None)
-    if err:
-        raise HTTPException(status_code=400, detail=f"Notification error: {err}")
+    await websocket.accept()
+    broker = get_broker()
+    # Subscribe before replaying so nothing published in between is lost
+    sub = broker.subscribe(user_id)
+    sent_ids = set()
+    receiver = getter = None
+    try:
+        if last_seen_id:
+            service = get_notification_service()
+            missed = await asyncio.to_thread(service.list_since, user_id, last_seen_id)
+            for row in missed:
+                sent_ids.add(row.get("id"))
+                await websocket.send_json({"type": "notification", "data": row})
 
-    return {"ok": True, "data": result.data}
+        # Drain client frames (pings/close) concurrently so disconnects are noticed
+        receiver = asyncio.create_task(websocket.receive_text())
+        while True:
+            getter = asyncio.create_task(sub.queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                receiver.result()  # raises WebSocketDisconnect on close
+                receiver = asyncio.create_task(websocket.receive_text())
+                continue
+            message = getter.result()
+            if message.get("type") == "overflow":
+                await websocket.close(code=4408, reason="Client too slow; reconnect with last_seen_id")
+                break
+            row_id = (message.get("data") or {}).get("id")
+            if row_id in sent_ids:
+                sent_ids.discard(row_id)
+                continue
+            await websocket.send_json(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(sub)
+        for task in (receiver, getter):
+            if task is not None and not task.done():
+                task.cancel()
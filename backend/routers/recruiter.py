@@ -1,17 +1,33 @@
 
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Header, Depends, Query
+from fastapi.responses import StreamingResponse
+import itertools
+import logging
+import re
+from typing import List, Optional
 import os
 
 from services.supabase_client import get_client
 
-from models.recruiter_models import JobPostRequest, JobSkillRequest
+from models.recruiter_models import BulkStatusChangeRequest, JobPostRequest, JobSkillRequest
 from services.recruiter_service import RecruiterService
+from services.candidate_summary import CandidateSummaryService
+from services.applicant_export import EXPORT_FORMATS, ApplicantExportService, ApplicantNotFound
+from services.candidate_search import CandidateSearchService
+from services.application_status_service import ApplicationStatusService
+from services.review_service import ApplicationReviewService, ReviewNotFound, parse_review_fields
 from utils_others.security import get_user_from_bearer, ensure_role
+from utils_others.skill_taxonomy import normalize_skill
 
 router = APIRouter(tags=["recruiter"])
 
 _supabase = None
 _service = None
+_review_service = None
+_summary_service = None
+_search_service = None
+_status_service = None
+_export_service = None
 
 def get_supabase():
     global _supabase
@@ -28,6 +44,36 @@ def get_recruiter_service():
         _service = RecruiterService(get_supabase())
     return _service
 
+def get_review_service():
+    global _review_service
+    if _review_service is None:
+        _review_service = ApplicationReviewService(get_supabase())
+    return _review_service
+
+def get_summary_service():
+    global _summary_service
+    if _summary_service is None:
+        _summary_service = CandidateSummaryService(get_supabase())
+    return _summary_service
+
+def get_search_service():
+    global _search_service
+    if _search_service is None:
+        _search_service = CandidateSearchService(get_supabase())
+    return _search_service
+
+def get_status_service():
+    global _status_service
+    if _status_service is None:
+        _status_service = ApplicationStatusService(get_supabase())
+    return _status_service
+
+def get_export_service():
+    global _export_service
+    if _export_service is None:
+        _export_service = ApplicantExportService(get_supabase(), get_summary_service())
+    return _export_service
+
 def require_recruiter(authorization: str = Header(default=None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
@@ -83,6 +129,122 @@ def delete_job(job_id: str, user: dict = Depends(require_recruiter)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Job delete failed: {str(e)}")
 
+@router.get("/job/{job_id}/applicants")
+def list_job_applicants(
+    job_id: str,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    user: dict = Depends(require_recruiter)
+):
+    """Newest-first page of a job's applicants with title, experience, top skills and video/resume flags."""
+    try:
+        svc = get_summary_service()
+        page = svc.list_job_applicants(job_id, user["id"], limit=limit, cursor=cursor, status=status)
+        return {"ok": True, "data": page["applicants"], "next_cursor": page["next_cursor"]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch applicants: {str(e)}")
+
+@router.get("/job/{job_id}/applicants/export")
+def export_job_applicants(
+    job_id: str,
+    fmt: str = Query(default="csv", alias="format", pattern="^(csv|xlsx)$"),
+    status: Optional[str] = None,
+    user: dict = Depends(require_recruiter)
+):
+    """Stream every applicant of a job as CSV or XLSX, one keyset page at a time."""
+    try:
+        svc = get_export_service()
+        job = svc.job_for_recruiter(job_id, user["id"])
+        chunks = svc.stream(job_id, user["id"], fmt=fmt, status=status)
+        # Pull the first chunk here so query errors still produce a proper status code
+        first = next(chunks, b"")
+    except ApplicantNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export applicants: {str(e)}")
+    slug = re.sub(r"[^a-z0-9]+", "-", (job.get("title") or "job").lower()).strip("-") or "job"
+    return StreamingResponse(
+        itertools.chain([first], chunks),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="applicants_{slug}.{fmt}"'},
+    )
+
+@router.get("/candidates/search")
+def search_candidates(
+    q: Optional[str] = None,
+    skill: List[str] = Query(default=[], description="Required skills (all must match)"),
+    any_skill: List[str] = Query(default=[], description="At least one must match"),
+    exclude_skill: List[str] = Query(default=[], description="None may match"),
+    min_experience: Optional[int] = Query(default=None, ge=0),
+    max_experience: Optional[int] = Query(default=None, ge=0),
+    location: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: dict = Depends(require_recruiter)
+):
+    try:
+        svc = get_search_service()
+        page = svc.search(
+            query=q,
+            all_skills=skill,
+            any_skills=any_skill,
+            exclude_skills=exclude_skill,
+            min_experience=min_experience,
+            max_experience=max_experience,
+            location=location,
+            limit=limit,
+            cursor=cursor,
+        )
+        return {"ok": True, "data": page["candidates"], "next_cursor": page["next_cursor"]}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Candidate search failed: {str(e)}")
+
+def _announce_status_change(recruiter_id: str, updated: list, status: str, message, notify: bool, send_email: bool) -> None:
+    svc = get_status_service()
+    if notify:
+        try:
+            svc.notify(recruiter_id, updated, status, message)
+        except Exception as e:
+            # Fan-out progress and errors are recorded on notification_fanouts
+            logging.error(f"Status change notifications failed: {e}")
+    if send_email:
+        try:
+            svc.email(updated, status, message)
+        except Exception as e:
+            logging.error(f"Status change emails failed: {e}")
+
+@router.post("/applications/status")
+def bulk_update_application_status(
+    payload: BulkStatusChangeRequest,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_recruiter)
+):
+    """
+    Move many applications to one status. Returns an outcome per application;
+    notifications and emails for the changed ones are queued after the response.
+    """
+    try:
+        svc = get_status_service()
+        result = svc.bulk_update(user["id"], payload.application_ids, payload.status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update application status: {str(e)}")
+    updated = result.pop("updated")
+    if updated and (payload.notify or payload.send_email):
+        background_tasks.add_task(
+            _announce_status_change, user["id"], updated, result["status"],
+            payload.message, payload.notify, payload.send_email,
+        )
+    result["notifications_queued"] = len(updated) if payload.notify else 0
+    result["emails_queued"] = len(updated) if payload.send_email else 0
+    return {"ok": True, "data": result}
+
 @router.post("/companies")
 def create_company(payload: dict, user: dict = Depends(require_recruiter)):
     try:
@@ -163,11 +325,17 @@ def get_recruiter_profile(user_id: str, user: dict = Depends(require_recruiter))
 @router.post("/job/{job_id}/skills")
 def add_job_skill(job_id: str, payload: JobSkillRequest, user: dict = Depends(require_recruiter)):
     try:
+        data = payload.dict()
+        data["skill_name"] = normalize_skill(data.get("skill_name"))
+        if not data["skill_name"]:
+            raise HTTPException(status_code=400, detail="skill_name is required")
         supabase = get_supabase()
-        res = supabase.table("job_skills").insert(payload.dict()).execute()
+        res = supabase.table("job_skills").insert(data).execute()
         if getattr(res, "error", None):
             raise Exception(res.error)
         return {"ok": True, "data": res.data}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add skill: {str(e)}")
 
@@ -181,3 +349,23 @@ def list_job_skills(job_id: str, user: dict = Depends(require_recruiter)):
         return {"ok": True, "data": res.data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch skills: {str(e)}")
+
+@router.get("/application/{application_id}/review")
+async def get_application_review(application_id: str, fields: Optional[str] = None, user: dict = Depends(require_recruiter)):
+    """
+    Application, job, candidate profile, education, experience, skills, videos
+    and resume for one application in a single response. fields is a
+    comma-separated subset (e.g. "profile,videos"); video and resume URLs come
+    back signed.
+    """
+    try:
+        selected = parse_review_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        svc = get_review_service()
+        return {"ok": True, "data": await svc.get_review(application_id, user["id"], selected)}
+    except ReviewNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load application review: {str(e)}")
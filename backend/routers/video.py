@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Depends
-from typing import Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional
+import logging
 import os
+import re
+import tempfile
 from models.video_models import VideoResponseRequest
 from services.video_service import VideoService
+from services.video_jobs import VideoJobStore, configured_processors
+from services.video_stream import RangeNotSatisfiable, StreamSourceError, VideoStreamer, parse_range
+from utils_others.chunk_cache import DiskChunkCache
 from utils_others.security import get_user_from_bearer, ensure_role
+from utils_others.video_probe import probe_video
 from services.supabase_client import get_client
 
 router = APIRouter(tags=["video"])
 
 _supabase = None
 _video_service = None
+_video_job_store = None
+_video_streamer = None
 
 def get_supabase():
     global _supabase
@@ -27,6 +38,26 @@ def get_video_service():
         _video_service = VideoService(supabase)
     return _video_service
 
+def get_video_job_store():
+    global _video_job_store
+    if _video_job_store is None:
+        _video_job_store = VideoJobStore(get_supabase())
+    return _video_job_store
+
+def get_video_streamer():
+    global _video_streamer
+    if _video_streamer is None:
+        video_service = get_video_service()
+        cache = DiskChunkCache(
+            os.getenv("VIDEO_CHUNK_CACHE_DIR", os.path.join(tempfile.gettempdir(), "skreenit-video-chunks")),
+            max_bytes=int(os.getenv("VIDEO_CHUNK_CACHE_MB", "1024")) * 1024 * 1024,
+        )
+        _video_streamer = VideoStreamer(
+            sign=lambda path: video_service.sign_video_paths([path]).get(path),
+            cache=cache,
+        )
+    return _video_streamer
+
 def require_candidate(authorization: str = Header(default=None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
@@ -35,11 +66,31 @@ def require_candidate(authorization: str = Header(default=None)):
         user = get_user_from_bearer(token)
         ensure_role(user, "candidate")
         return user
+    except HTTPException:
+        raise
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+def require_recruiter(authorization: str = Header(default=None)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = authorization.replace("Bearer ", "")
+    try:
+        user = get_user_from_bearer(token)
+        ensure_role(user, "recruiter")
+        return user
+    except HTTPException:
+        raise
     except PermissionError:
         raise HTTPException(status_code=403, detail="Forbidden")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+MAX_SIGNED_APPLICATIONS = 100
+MAX_COMPARED_CANDIDATES = 50
+
 @router.post("/response")
 def add_video_response(payload: VideoResponseRequest, user: dict = Depends(require_candidate)):
     try:
@@ -62,6 +113,44 @@ def list_video_responses(application_id: str, user: dict = Depends(require_candi
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch video responses: {str(e)}")
 
+@router.get("/responses/signed")
+def list_signed_video_responses(
+    application_id: List[str] = Query(..., description="Repeat for several applications"),
+    user: dict = Depends(require_recruiter)
+):
+    """Video responses for one or more applications with signed playback URLs attached."""
+    application_ids = list(dict.fromkeys(application_id))
+    if len(application_ids) > MAX_SIGNED_APPLICATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SIGNED_APPLICATIONS} applications per request")
+    try:
+        video_service = get_video_service()
+        allowed = video_service.recruiter_application_ids(user["id"], application_ids)
+        return {"ok": True, "data": video_service.get_signed_responses(allowed)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch video responses: {str(e)}")
+
+@router.get("/candidates")
+def compare_candidate_videos(
+    candidate_id: List[str] = Query(..., description="Repeat for several candidates"),
+    user: dict = Depends(require_recruiter)
+):
+    """All video responses and general videos of the given candidates for the recruiter's jobs, with signed playback URLs."""
+    candidate_ids = list(dict.fromkeys(candidate_id))
+    if len(candidate_ids) > MAX_COMPARED_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARED_CANDIDATES} candidates per request")
+    try:
+        video_service = get_video_service()
+        grouped = video_service.get_candidates_videos(candidate_ids, recruiter_id=user["id"])
+        rows = []
+        for entry in grouped.values():
+            rows.extend(entry["videos"])
+            if entry["general_video"]:
+                rows.append(entry["general_video"])
+        video_service.attach_signed_urls(rows)
+        return {"ok": True, "data": grouped}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch candidate videos: {str(e)}")
+
 @router.post("/general")
 async def upload_general_video_unified(
     candidate_id: str = Form(...),
@@ -72,6 +161,13 @@ async def upload_general_video_unified(
     user: dict = Depends(require_candidate)
 ):
     try:
+        # Read duration/resolution/codec from the container headers before the full read
+        try:
+            media = await run_in_threadpool(probe_video, video.file)
+        except Exception as e:
+            logging.warning(f"Video probe failed for {video.filename}: {e}")
+            media = None
+        await video.seek(0)
         contents = await video.read()
         # Ensure we have a safe filename string for downstream storage APIs
         filename = video.filename or f"{candidate_id}_upload"
@@ -81,31 +177,108 @@ async def upload_general_video_unified(
         video_url = video_service.upload_video_to_storage(contents, filename, candidate_id)
 
         if application_id and question_id:
+            video_table = "video_responses"
             db_result = video_service.save_video_response(
                 application_id=application_id,
                 question_id=question_id,
                 video_url=video_url,
-                duration=None,
-                status="completed"
+                status="completed",
+                media=media
             )
         else:
+            video_table = "general_video_interviews"
             db_result = video_service.save_general_video(
                 candidate_id=candidate_id,
                 video_url=video_url,
-                status="completed"
+                status="completed",
+                media=media
             )
 
+        # Thumbnails, transcripts and analysis are produced by the video job workers
+        jobs = []
+        if db_result.get("id"):
+            try:
+                jobs = get_video_job_store().enqueue(video_table, db_result["id"], video_url, configured_processors())
+            except Exception as e:
+                logging.error(f"Failed to queue processing for {video_table} {db_result['id']}: {e}")
+
         return {
             "ok": True,
             "data": {
                 "status": "uploaded",
                 "video_url": video_url,
+                "media": media,
+                "processing_jobs": [j.get("processor") for j in jobs],
                 "database_record": db_result
             }
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload general video: {str(e)}")
 
+@router.get("/jobs/stats")
+def video_job_stats(user: dict = Depends(require_recruiter)):
+    try:
+        return {"ok": True, "data": get_video_job_store().stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read video job stats: {str(e)}")
+
+@router.get("/stream/{file_path:path}")
+def stream_video(
+    file_path: str,
+    request: Request,
+    token: Optional[str] = None,
+    authorization: str = Header(default=None)
+):
+    """
+    Range-capable proxy for stored videos, for clients that cannot reach
+    storage signed URLs. <video> elements cannot send headers, so the token may
+    also be passed as ?token=. Candidates may only stream their own uploads,
+    recruiters only videos of candidates who applied to their jobs.
+    """
+    user = get_user_from_bearer(authorization or token)
+    if any(part in ("", ".", "..") for part in file_path.split("/")):
+        raise HTTPException(status_code=400, detail="Invalid video path")
+    role = user.get("role")
+    if role == "candidate":
+        allowed = file_path.startswith(f"{user.get('id')}/")
+    elif role == "recruiter":
+        try:
+            allowed = get_video_service().recruiter_can_view_path(user["id"], file_path)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to check video access: {str(e)}")
+    else:
+        allowed = False
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    streamer = get_video_streamer()
+    range_header = request.headers.get("range")
+    # Fetch the chunk the client asked for first; its Content-Range also gives the size
+    hint = re.match(r"bytes=(\d+)-", range_header or "")
+    try:
+        size = streamer.object_size(file_path, int(hint.group(1)) if hint else 0)
+        span = parse_range(range_header, size)
+    except RangeNotSatisfiable as e:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{e.size}"})
+    except StreamSourceError as e:
+        if e.status_code in (400, 404):
+            raise HTTPException(status_code=404, detail="Video not found")
+        raise HTTPException(status_code=502, detail=f"Failed to stream video: {str(e)}")
+
+    start, end = span if span else (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(max(0, end - start + 1)),
+        "Cache-Control": "private, max-age=3600",
+    }
+    if span:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        streamer.iter_range(file_path, start, end),
+        status_code=206 if span else 200,
+        media_type=streamer.content_type(file_path),
+        headers=headers,
+    )
+
 @router.get("/general/{candidate_id}")
 def get_general_video(candidate_id: str, user: dict = Depends(require_candidate)):
     try:
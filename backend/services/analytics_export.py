@@ -0,0 +1,177 @@
+import argparse
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from supabase import Client
+from .supabase_client import get_client
+from .analytics_service import parse_timestamp
+from utils_others.pagination import keyset_filter
+
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_COLUMNS = ("id", "user_id", "event_type", "event_data", "ip_address", "user_agent", "created_at")
+# PostgREST's default max-rows; larger pages come back truncated to this
+EXPORT_PAGE_SIZE = 1000
+
+class ExportError(Exception):
+    """Raised when an export cannot be produced (e.g. pyarrow missing)."""
+    pass
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks = []
+        return out
+
+def iter_event_pages(
+    client: Client,
+    since: datetime,
+    until: datetime,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Walk analytics_events oldest-first in keyset pages; never holds more than
+    one page. A short page does not end the walk, since PostgREST silently
+    caps responses (max-rows) below larger limits; only an empty page does.
+    """
+    after: Optional[Dict[str, Any]] = None
+    while True:
+        query = (
+            client.table("analytics_events")
+            .select(",".join(EXPORT_COLUMNS))
+            .gte("created_at", since.isoformat())
+            .lt("created_at", until.isoformat())
+        )
+        if after:
+            query = query.or_(keyset_filter("created_at", after["created_at"], "id", after["id"], descending=False))
+        res = query.order("created_at").order("id").limit(page_size).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise ExportError(f"Analytics export fetch error: {err}")
+        rows = res.data or []
+        if not rows:
+            return
+        yield rows
+        after = rows[-1]
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception as e:
+        raise ExportError(f"pyarrow import failed: {e}")
+    return pa, pq
+
+def _record_batch(pa, schema, rows: List[Dict[str, Any]]):
+    columns = {name: [] for name in EXPORT_COLUMNS}
+    for row in rows:
+        for name in EXPORT_COLUMNS:
+            value = row.get(name)
+            if name == "event_data" and value is not None:
+                value = json.dumps(value, separators=(",", ":"))
+            elif name == "created_at" and value is not None:
+                value = parse_timestamp(value)
+            elif value is not None:
+                value = str(value)
+            columns[name].append(value)
+    return pa.record_batch([pa.array(columns[f.name], type=f.type) for f in schema], schema=schema)
+
+def stream_events(
+    client: Client,
+    since: datetime,
+    until: datetime,
+    fmt: str = "arrow",
+    batch_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield an Arrow IPC stream or Parquet file for [since, until), one record
+    batch (Parquet: one row group) per page, so memory stays bounded by
+    batch_size (or the server row cap, if lower) regardless of how many
+    events are exported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported export format: {fmt}")
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("event_type", pa.string()),
+        ("event_data", pa.string()),  # JSON text
+        ("ip_address", pa.string()),
+        ("user_agent", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in iter_event_pages(client, since, until, page_size=batch_size):
+            batch = _record_batch(pa, schema, rows)
+            if fmt == "arrow":
+                writer.write_batch(batch)
+            else:
+                writer.write_table(pa.Table.from_batches([batch]))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export analytics_events to Arrow IPC or Parquet")
+    parser.add_argument("--since", required=True, help="ISO timestamp (inclusive)")
+    parser.add_argument("--until", required=True, help="ISO timestamp (exclusive)")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument("--out", required=True, help="Output file path")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+    with open(args.out, "wb") as f:
+        for chunk in stream_events(
+            client,
+            parse_timestamp(args.since),
+            parse_timestamp(args.until),
+            fmt=args.format,
+            batch_size=args.batch_size,
+        ):
+            f.write(chunk)
+
+if __name__ == "__main__":
+    # e.g. SUPABASE_URL=http://127.0.0.1:54321 python -m services.analytics_export --since 2026-01-01 --until 2026-02-01 --out jan.parquet
+    main()
@@ -0,0 +1,159 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from supabase import Client
+from services.supabase_client import get_client
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsQueue:
+    """
+    Bounded in-process buffer for analytics events.
+
+    Requests only enqueue; a background thread bulk-inserts batches into
+    `analytics_events` once `batch_size` events are waiting or `flush_interval`
+    seconds have passed, whichever comes first. When the buffer is full new
+    events are rejected (and counted) instead of blocking the request.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        self._client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_size)
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "flushed": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    @property
+    def supabase(self) -> Client:
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """Register a callable that receives every successfully written batch."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="analytics-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and write out everything still buffered."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self._drain()
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        return self.enqueue_many([event]) == 1
+
+    def enqueue_many(self, events: List[Dict[str, Any]]) -> int:
+        """Buffer events without blocking. Returns how many were accepted."""
+        accepted = 0
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+                accepted += 1
+            except queue.Full:
+                break
+        with self._lock:
+            self._stats["enqueued"] += accepted
+            self._stats["rejected"] += len(events) - accepted
+        return accepted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+        out["depth"] = self._queue.qsize()
+        out["capacity"] = self._queue.maxsize
+        return out
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.25)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _drain(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                res = self.supabase.table("analytics_events").insert(batch).execute()
+                err = getattr(res, "error", None)
+                if err:
+                    raise Exception(f"Analytics insert error: {err}")
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"Dropping {len(batch)} analytics events after {attempt + 1} attempts: {e}")
+                    with self._lock:
+                        self._stats["failed"] += len(batch)
+                    return
+                with self._lock:
+                    self._stats["retries"] += 1
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+        with self._lock:
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_flush_ms"] = round((time.monotonic() - started) * 1000, 2)
+
+        for listener in self._listeners:
+            try:
+                listener(batch)
+            except Exception as e:
+                logger.warning(f"Analytics listener {getattr(listener, '__name__', listener)} failed: {e}")
@@ -0,0 +1,181 @@
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from supabase import Client
+from .supabase_client import get_client
+from utils_others.pagination import decode_cursor, keyset_filter, split_page
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+# Keys checked, in order, to attribute an event to a job/application/etc.
+# Must match public.analytics_event_subject in migrations/create_analytics_rollups.sql
+SUBJECT_KEYS = ("job_id", "application_id", "related_id")
+
+def parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        ts = value
+    elif value:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    else:
+        ts = datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+def truncate_timestamp(ts: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+def rollup_subject(event: Dict[str, Any]) -> str:
+    """First non-empty subject key, rendered the way Postgres' ->> renders JSON values."""
+    data = event.get("event_data") or {}
+    if isinstance(data, dict):
+        for key in SUBJECT_KEYS:
+            value = data.get(key)
+            if value is None:
+                continue
+            text = value if isinstance(value, str) else json.dumps(value)
+            if text:
+                return text
+    return ""
+
+def build_rollup_rows(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse a batch of raw events into per-bucket count increments."""
+    counts: Counter = Counter()
+    for event in events:
+        event_type = event.get("event_type")
+        if not event_type:
+            continue
+        ts = parse_timestamp(event.get("created_at"))
+        subject = rollup_subject(event)
+        for granularity in ROLLUP_GRANULARITIES:
+            counts[(granularity, truncate_timestamp(ts, granularity).isoformat(), event_type, subject)] += 1
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "event_type": event_type,
+            "subject_id": subject,
+            "event_count": count,
+        }
+        for (granularity, bucket_start, event_type, subject), count in counts.items()
+    ]
+
+class AnalyticsService:
+    def __init__(self, client: Optional[Client] = None):
+        self.supabase = client or get_client()
+
+    def record_rollups(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion-queue listener: fold a flushed batch into analytics_rollups."""
+        rows = build_rollup_rows(events)
+        if not rows:
+            return
+        res = self.supabase.rpc("increment_analytics_rollups", {"p_rows": rows}).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Rollup update error: {err}")
+
+    def rebuild_rollups(self, since: datetime, until: datetime) -> None:
+        res = self.supabase.rpc("rebuild_analytics_rollups", {
+            "p_since": since.isoformat(),
+            "p_until": until.isoformat(),
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Rollup rebuild error: {err}")
+
+    def get_rollup_series(
+        self,
+        event_type: str,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+        subject_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        res = self.supabase.rpc("analytics_rollup_series", {
+            "p_event_type": event_type,
+            "p_granularity": granularity,
+            "p_since": since.isoformat(),
+            "p_until": until.isoformat(),
+            "p_subject_id": subject_id,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Rollup series error: {err}")
+        return res.data or []
+
+    def get_top_subjects(
+        self,
+        event_type: str,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        res = self.supabase.rpc("top_analytics_subjects", {
+            "p_event_type": event_type,
+            "p_granularity": granularity,
+            "p_since": since.isoformat(),
+            "p_until": until.isoformat(),
+            "p_limit": limit,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Top subjects error: {err}")
+        return res.data or []
+
+    def list_events(
+        self,
+        user_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        event_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Newest-first page of a user's events, keyed on (created_at, id) so each
+        page is a bounded range scan on idx_analytics_user_created.
+        """
+        query = (
+            self.supabase.table("analytics_events")
+            .select("*")
+            .eq("user_id", user_id)
+        )
+        if event_type:
+            query = query.eq("event_type", event_type)
+        if since:
+            query = query.gte("created_at", since.isoformat())
+        if until:
+            query = query.lt("created_at", until.isoformat())
+        after = decode_cursor(cursor, ("created_at", "id"))
+        if after:
+            query = query.or_(keyset_filter("created_at", after["created_at"], "id", after["id"]))
+        res = (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Analytics fetch error: {err}")
+        page, next_cursor = split_page(res.data or [], limit, ("created_at", "id"))
+        return {"events": page, "next_cursor": next_cursor}
+
+    def ensure_partitions(self, months_ahead: int = 2) -> None:
+        res = self.supabase.rpc("ensure_analytics_partitions", {"p_months_ahead": months_ahead}).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Partition maintenance error: {err}")
+
+    def apply_retention(self, retain_months: int = 12) -> List[str]:
+        """Drop monthly analytics_events partitions older than retain_months; returns dropped names."""
+        res = self.supabase.rpc("drop_old_analytics_partitions", {"p_retain_months": retain_months}).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Retention error: {err}")
+        return res.data or []
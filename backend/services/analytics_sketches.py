@@ -0,0 +1,136 @@
+import base64
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from supabase import Client
+from .supabase_client import get_client
+from .analytics_service import parse_timestamp
+from utils_others.hyperloglog import HyperLogLog
+
+# metric -> (event types counted, event_data key identifying the job)
+UNIQUE_METRICS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "job_viewers": (("job_view",), "job_id"),
+    "job_applicants": (("application_submit",), "job_id"),
+}
+SKETCH_PRECISION = 12
+
+SketchKey = Tuple[str, str, str]  # (metric, job_id, ISO day)
+
+def visitor_key(event: Dict[str, Any]) -> Optional[str]:
+    """Identity used for uniqueness: the user when known, else ip + user agent."""
+    if event.get("user_id"):
+        return f"u:{event['user_id']}"
+    if event.get("ip_address"):
+        return f"a:{event['ip_address']}|{event.get('user_agent') or ''}"
+    return None
+
+def decode_registers(value: Any) -> bytes:
+    # PostgREST renders bytea as "\x<hex>"
+    if isinstance(value, str) and value.startswith("\\x"):
+        return bytes.fromhex(value[2:])
+    if isinstance(value, str):
+        return base64.b64decode(value)
+    return bytes(value)
+
+class UniqueCountService:
+    """
+    Per (metric, job, day) HyperLogLog sketches fed from the analytics ingestion
+    path. Deltas accumulate in memory and are merged into
+    analytics_hll_sketches (register-wise max, done in SQL so concurrent workers
+    cannot lose updates) after every flushed batch.
+    """
+
+    def __init__(self, client: Optional[Client] = None):
+        self.supabase = client or get_client()
+        self._pending: Dict[SketchKey, HyperLogLog] = {}
+        self._lock = threading.Lock()
+
+    def record_events(self, events: List[Dict[str, Any]]) -> None:
+        """Ingestion-queue listener."""
+        with self._lock:
+            for event in events:
+                for metric, (event_types, subject_key) in UNIQUE_METRICS.items():
+                    if event.get("event_type") not in event_types:
+                        continue
+                    data = event.get("event_data") or {}
+                    job_id = data.get(subject_key) if isinstance(data, dict) else None
+                    who = visitor_key(event)
+                    if not job_id or not who:
+                        continue
+                    day = parse_timestamp(event.get("created_at")).date().isoformat()
+                    key = (metric, str(job_id), day)
+                    sketch = self._pending.get(key)
+                    if sketch is None:
+                        sketch = self._pending[key] = HyperLogLog(SKETCH_PRECISION)
+                    sketch.add(who)
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        rows = [
+            {
+                "metric": metric,
+                "subject_id": job_id,
+                "day": day,
+                "registers": base64.b64encode(sketch.to_bytes()).decode("ascii"),
+            }
+            for (metric, job_id, day), sketch in pending.items()
+        ]
+        try:
+            res = self.supabase.rpc("merge_hll_sketches", {"p_rows": rows}).execute()
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(err)
+        except Exception as e:
+            # Keep the deltas so the next flush retries them; merging is idempotent
+            with self._lock:
+                for key, sketch in pending.items():
+                    current = self._pending.get(key)
+                    self._pending[key] = sketch if current is None else current.merge(sketch)
+            raise Exception(f"Sketch persist error: {str(e)}")
+
+    def unique_count(self, metric: str, job_id: str, since: date, until: date) -> Dict[str, Any]:
+        """Estimate distinct visitors for [since, until] (inclusive days) by merging daily sketches."""
+        if metric not in UNIQUE_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        res = (
+            self.supabase.table("analytics_hll_sketches")
+            .select("day,registers")
+            .eq("metric", metric)
+            .eq("subject_id", job_id)
+            .gte("day", since.isoformat())
+            .lte("day", until.isoformat())
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Sketch fetch error: {err}")
+        merged = HyperLogLog(SKETCH_PRECISION)
+        days = 0
+        for row in res.data or []:
+            merged.merge(HyperLogLog.from_bytes(decode_registers(row["registers"])))
+            days += 1
+        # Include deltas that have not been persisted yet
+        with self._lock:
+            for (m, j, day), sketch in self._pending.items():
+                if m == metric and j == job_id and since.isoformat() <= day <= until.isoformat():
+                    merged.merge(sketch)
+        return {
+            "metric": metric,
+            "job_id": job_id,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "estimate": merged.count(),
+            "relative_error": round(merged.relative_error, 4),
+            "days_with_data": days,
+        }
+
+def day_range(since: Optional[datetime], until: Optional[datetime], default_days: int = 30) -> Tuple[date, date]:
+    end = parse_timestamp(until).date() if until else parse_timestamp(None).date()
+    start = parse_timestamp(since).date() if since else end - timedelta(days=default_days - 1)
+    if start > end:
+        raise ValueError("since must not be after until")
+    return start, end
@@ -0,0 +1,179 @@
+import csv
+import io
+import re
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape
+from supabase import Client
+from .supabase_client import get_client
+from .analytics_export import _ChunkSink
+from .candidate_summary import CandidateSummaryService
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_COLUMNS = (
+    "application_id", "candidate_id", "full_name", "location", "title", "experience_years",
+    "top_skills", "skill_count", "has_video", "has_resume", "ai_score", "status", "applied_at",
+)
+# list_job_applicants asks for one extra row to detect the next page, and
+# PostgREST caps responses at 1000 rows by default
+EXPORT_PAGE_SIZE = 999
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+class ApplicantExportError(Exception):
+    pass
+
+class ApplicantNotFound(ApplicantExportError):
+    pass
+
+def iter_applicant_pages(
+    summaries: CandidateSummaryService,
+    job_id: str,
+    recruiter_id: str,
+    status: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Walk a job's applicants in list_job_applicants keyset pages; never holds more than one page."""
+    cursor: Optional[str] = None
+    while True:
+        page = summaries.list_job_applicants(job_id, recruiter_id, limit=page_size, cursor=cursor, status=status)
+        if page["applicants"]:
+            yield page["applicants"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        # Keep spreadsheet apps from evaluating candidate-supplied text as a formula
+        return "'" + value
+    return value
+
+def stream_csv(pages: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the file as UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in pages:
+        for row in rows:
+            writer.writerow([_csv_value(row.get(c)) for c in EXPORT_COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Applicants" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+def stream_xlsx(pages: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """
+    Single-sheet workbook built with zipfile on a non-seekable sink: the sheet
+    XML is deflated as rows arrive and the compressed bytes are yielded after
+    every page, so nothing but the current page is held in memory. Strings are
+    written inline, which avoids a shared-strings table that would need every
+    value up front.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_PARTS.items():
+            zf.writestr(name, content)
+        with zf.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(EXPORT_COLUMNS).encode("utf-8"))
+            for rows in pages:
+                sheet.write("".join(_xlsx_row(row.get(c) for c in EXPORT_COLUMNS) for row in rows).encode("utf-8"))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            sheet.write(b"</sheetData></worksheet>")
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+class ApplicantExportService:
+    def __init__(self, client: Optional[Client] = None, summaries: Optional[CandidateSummaryService] = None):
+        self.supabase = client or get_client()
+        self.summaries = summaries or CandidateSummaryService(self.supabase)
+
+    def job_for_recruiter(self, job_id: str, recruiter_id: str) -> Dict[str, Any]:
+        res = (
+            self.supabase.table("jobs")
+            .select("id,title")
+            .eq("id", job_id)
+            .eq("created_by", recruiter_id)
+            .limit(1)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise ApplicantExportError(f"Job lookup error: {err}")
+        if not res.data:
+            raise ApplicantNotFound("Job not found")
+        return res.data[0]
+
+    def stream(
+        self,
+        job_id: str,
+        recruiter_id: str,
+        fmt: str = "csv",
+        status: Optional[str] = None,
+        page_size: int = EXPORT_PAGE_SIZE,
+    ) -> Iterator[bytes]:
+        """Export bytes for a job's applicants, produced page by page."""
+        if fmt not in EXPORT_FORMATS:
+            raise ApplicantExportError(f"Unsupported export format: {fmt}")
+        pages = iter_applicant_pages(self.summaries, job_id, recruiter_id, status=status, page_size=page_size)
+        return stream_csv(pages) if fmt == "csv" else stream_xlsx(pages)
@@ -2,11 +2,20 @@ import time
 from typing import Any, Dict, List, Optional
 from supabase import Client
 from services.supabase_client import get_client
+from services.candidate_summary import CandidateSummaryService
 from utils_others.file_upload import upload_to_bucket, create_signed_url
+from utils_others.skill_taxonomy import normalize_skill
+
+def _years(skill: Dict[str, Any]) -> float:
+    try:
+        return float(skill.get("years_experience") or 0)
+    except (TypeError, ValueError):
+        return 0.0
 
 class ApplicantService:
     def __init__(self, client: Optional[Client] = None):
         self.supabase = client or get_client()
+        self.summaries = CandidateSummaryService(self.supabase)
 
     # Draft handling: store/retrieve JSON draft payload in candidate_drafts table
     def save_draft(self, candidate_id: str, draft_payload: Dict[str, Any]) -> None:
@@ -82,23 +91,30 @@ class ApplicantService:
                 "candidate_id", candidate_id
             ).execute()
             if skills:
-                normalized = []
+                # "JS", "Javascript" and "javascript " are all stored as "JavaScript";
+                # after that, duplicates collapse into the most experienced entry
+                by_name: Dict[str, Dict[str, Any]] = {}
                 for s in skills:
-                    normalized.append(
-                        {
-                            "candidate_id": candidate_id,
-                            "skill_name": s.get("skill_name") or s.get("name"),
-                            "proficiency_level": s.get("proficiency_level") or s.get("level"),
-                            "years_experience": s.get("years_experience") or s.get("years") or 0,
-                        }
-                    )
-                to_insert = [row for row in normalized if row.get("skill_name")]
+                    row = {
+                        "candidate_id": candidate_id,
+                        "skill_name": normalize_skill(s.get("skill_name") or s.get("name")),
+                        "proficiency_level": s.get("proficiency_level") or s.get("level"),
+                        "years_experience": s.get("years_experience") or s.get("years") or 0,
+                    }
+                    if not row["skill_name"]:
+                        continue
+                    key = row["skill_name"].lower()
+                    if key not in by_name or _years(row) > _years(by_name[key]):
+                        by_name[key] = row
+                to_insert = list(by_name.values())
                 if to_insert:
                     res = self.supabase.table("candidate_skills").insert(to_insert).execute()
                     err = getattr(res, "error", None)
                     if err:
                         raise Exception(f"Skills save error: {err}")
 
+        self.summaries.refresh(candidate_id)
+
     def get_detailed_form(self, candidate_id: str) -> Dict[str, Any]:
         result: Dict[str, Any] = {}
         prof = (
@@ -158,6 +174,7 @@ class ApplicantService:
             ).execute()
         except Exception:
             pass
+        self.summaries.refresh(candidate_id)
         signed = create_signed_url(self.supabase, "resumes", path, 3600)
         return {"ok": True, "data": {"resume_path": path, "resume_url": signed}}
 
@@ -0,0 +1,155 @@
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+from supabase import Client
+from .supabase_client import get_client
+from .email_outbox import EmailOutbox
+from .notification_service import NotificationService
+from models.applicant_models import ApplicationStatus
+from utils_others.email_templates import EmailTemplates
+
+S = ApplicationStatus
+# Pipeline moves a recruiter may make; hired is final, rejected can be reopened
+ALLOWED_TRANSITIONS: Dict[ApplicationStatus, Set[ApplicationStatus]] = {
+    S.submitted: {S.under_review, S.video_pending, S.interview_scheduled, S.rejected},
+    S.under_review: {S.video_pending, S.interview_scheduled, S.rejected},
+    S.video_pending: {S.video_completed, S.under_review, S.rejected},
+    S.video_completed: {S.under_review, S.interview_scheduled, S.rejected},
+    S.interview_scheduled: {S.under_review, S.hired, S.rejected},
+    S.rejected: {S.under_review},
+    S.hired: set(),
+}
+
+STATUS_LABELS = {
+    S.submitted: "Submitted",
+    S.under_review: "Under review",
+    S.video_pending: "Video interview requested",
+    S.video_completed: "Video interview completed",
+    S.interview_scheduled: "Interview scheduled",
+    S.rejected: "Not selected",
+    S.hired: "Hired",
+}
+
+def allowed_sources(to_status: ApplicationStatus) -> List[str]:
+    """Statuses an application may move to to_status from."""
+    return sorted(s.value for s, targets in ALLOWED_TRANSITIONS.items() if to_status in targets)
+
+class ApplicationStatusService:
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        notifications: Optional[NotificationService] = None,
+        outbox: Optional[EmailOutbox] = None,
+    ):
+        self.supabase = client or get_client()
+        self.notifications = notifications or NotificationService(self.supabase)
+        self.outbox = outbox or EmailOutbox(self.supabase)
+        self.templates = EmailTemplates()
+
+    def bulk_update(self, recruiter_id: str, application_ids: List[str], to_status: ApplicationStatus) -> Dict[str, Any]:
+        """
+        Move many applications to to_status in one statement, scoped to the
+        recruiter's jobs. Each id gets an outcome: updated, unchanged (already
+        there), invalid_transition, or not_found (missing or another
+        recruiter's).
+        """
+        to_status = ApplicationStatus(to_status)
+        application_ids = list(dict.fromkeys(application_ids))
+        res = self.supabase.rpc("bulk_update_application_status", {
+            "p_recruiter_id": recruiter_id,
+            "p_application_ids": application_ids,
+            "p_to_status": to_status.value,
+            "p_allowed_from": allowed_sources(to_status),
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Status update error: {err}")
+        found = {row["application_id"]: row for row in res.data or []}
+
+        results = []
+        summary = {"updated": 0, "unchanged": 0, "invalid_transition": 0, "not_found": 0}
+        for app_id in application_ids:
+            row = found.get(app_id)
+            if row is None:
+                outcome = "not_found"
+            elif row.get("updated"):
+                outcome = "updated"
+            elif row.get("from_status") == to_status.value:
+                outcome = "unchanged"
+            else:
+                outcome = "invalid_transition"
+            summary[outcome] += 1
+            result = {"application_id": app_id, "outcome": outcome}
+            if row is not None:
+                result["from_status"] = row.get("from_status")
+            results.append(result)
+        updated = [found[r["application_id"]] for r in results if r["outcome"] == "updated"]
+        return {"status": to_status.value, "results": results, "summary": summary, "updated": updated}
+
+    def notify(self, recruiter_id: str, updated: List[Dict[str, Any]], to_status: ApplicationStatus,
+               message: Optional[str] = None) -> List[str]:
+        """
+        In-app notifications for the changed applications: one idempotent
+        fan-out per job (keyed on the status and the exact set of
+        applications), so a retried request notifies nobody twice.
+        """
+        to_status = ApplicationStatus(to_status)
+        keys = []
+        for job_id, rows in _by_job(updated).items():
+            digest = hashlib.sha1(",".join(sorted(r["application_id"] for r in rows)).encode("utf-8")).hexdigest()[:16]
+            key = f"status:{to_status.value}:{job_id}:{digest}"
+            started = self.notifications.start_fanout(
+                key,
+                template={
+                    "title": f"Application update: {STATUS_LABELS[to_status]}",
+                    "message": message or f"Your application status is now {STATUS_LABELS[to_status].lower()}.",
+                    "type": "application_status",
+                    "related_id": job_id,
+                },
+                audience={"user_ids": [r["candidate_id"] for r in rows if r.get("candidate_id")]},
+                created_by=recruiter_id,
+            )
+            if started["run"]:
+                self.notifications.run_fanout(key)
+            keys.append(key)
+        return keys
+
+    def email(self, updated: List[Dict[str, Any]], to_status: ApplicationStatus, message: Optional[str] = None) -> int:
+        """Queue one status email per changed application: two lookups, then a single outbox insert."""
+        to_status = ApplicationStatus(to_status)
+        if not updated:
+            return 0
+        candidate_ids = list({r["candidate_id"] for r in updated if r.get("candidate_id")})
+        job_ids = list({r["job_id"] for r in updated if r.get("job_id")})
+        users = self.supabase.table("users").select("id,email,full_name").in_("id", candidate_ids).execute()
+        jobs = self.supabase.table("jobs").select("id,title").in_("id", job_ids).execute()
+        for res in (users, jobs):
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Status email lookup error: {err}")
+        users_by_id = {u["id"]: u for u in users.data or []}
+        titles = {j["id"]: j.get("title") for j in jobs.data or []}
+
+        messages = []
+        for row in updated:
+            user = users_by_id.get(row.get("candidate_id"))
+            if not user or not user.get("email"):
+                continue
+            html = self.templates.application_status({
+                "full_name": user.get("full_name"),
+                "job_title": titles.get(row.get("job_id")),
+                "status_label": STATUS_LABELS[to_status],
+                "message": message,
+            })
+            messages.append({
+                "to": user["email"],
+                "subject": f"Update on your application: {STATUS_LABELS[to_status]}",
+                "html": html,
+            })
+        self.outbox.enqueue_many(messages, email_type="info")
+        return len(messages)
+
+def _by_job(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        grouped.setdefault(row.get("job_id"), []).append(row)
+    return grouped
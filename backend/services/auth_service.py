@@ -1,18 +1,48 @@
 import os
+import asyncio
+import random
+import secrets
+import string
+import time
 import httpx
 import logging
 from typing import Optional, Dict, Any
 from supabase import Client
 from services.supabase_client import get_client
-from utils_others.resend_email import send_email
+from services.email_outbox import EmailOutbox
+from utils_others.email_templates import EmailTemplates
 
 logging.basicConfig(level=logging.INFO)
 
+TEMP_PASSWORD_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz23456789!@#$%^&*"
+
+# Company ids are derived from the name, so two companies with the same first
+# eight letters collide; later attempts swap the tail for random letters
+COMPANY_ID_ATTEMPTS = 5
+
+def generate_company_id(company_name: str, random_letters: int = 0) -> str:
+    """8 upper-case letters: the company name's first letters, then random ones."""
+    base = ''.join(ch for ch in company_name if ch.isalpha()).upper()[:8 - random_letters]
+    return base + ''.join(random.choice(string.ascii_uppercase) for _ in range(8 - len(base)))
+
+def _is_unique_violation(error: Exception) -> bool:
+    return getattr(error, "code", None) == "23505" or "duplicate key" in str(error)
+
 class AuthService:
     def __init__(self, client: Optional[Client] = None) -> None:
         self.supabase = client or get_client()
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        self.outbox = EmailOutbox(self.supabase)
+        self.templates = EmailTemplates()
+
+    def _queue_email(self, to: str, subject: str, html: str, email_type: str) -> Dict[str, Any]:
+        """Hand an email to the outbox; the worker sends it (with retries) off the request path."""
+        try:
+            row = self.outbox.enqueue(to=to, subject=subject, html=html, email_type=email_type)
+            return {"email_sent": True, "outbox_id": row.get("id")}
+        except Exception as e:
+            return {"email_sent": False, "error": str(e)}
 
     def login(self, email: str, password: str) -> Dict[str, Any]:
         res = self.supabase.auth.sign_in_with_password({
@@ -35,7 +65,7 @@ class AuthService:
         resp.raise_for_status()
         return {"user": resp.json()}
 
-    def register(self,
+    async def register(self,
                  full_name: str,
                  email: str,
                  mobile: str,
@@ -45,19 +75,28 @@ class AuthService:
                  company_name: Optional[str] = None,
                  resume_bytes: Optional[bytes] = None,
                  resume_filename: Optional[str] = None) -> Dict[str, Any]:
-        import secrets, time, random, string
-
-        ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz23456789!@#$%^&*"
-        def gen_temp(length: int = 12) -> str:
-            return "".join(secrets.choice(ALPHABET) for _ in range(length)
+        """
+        Create the auth user, then upload the resume and create the recruiter's
+        company concurrently. A failed resume upload is not fatal (resume_path
+        is None). A company id already taken by another company is retried with
+        a new id; any other company failure undoes the resume upload and
+        deletes the auth user before the error is raised. The welcome email is
+        queued last, once the company id is final.
+        """
+        timings: Dict[str, float] = {}
 
-        )
+        async def timed(step: str, fn, *args):
+            started = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, *args)
+            finally:
+                timings[step] = round((time.perf_counter() - started) * 1000, 1)
 
-        temp_password = gen_temp(12)
+        temp_password = "".join(secrets.choice(TEMP_PASSWORD_ALPHABET) for _ in range(12))
 
         logging.info(f"Attempting to create user {email} in Supabase")
         try:
-            auth_res = self.supabase.auth.sign_up({
+            auth_res = await timed("sign_up", self.supabase.auth.sign_up, {
                 "email": email,
                 "password": temp_password,
                 "options": {
@@ -85,100 +124,112 @@ class AuthService:
         if not user_id:
             raise RuntimeError("Failed to create user in Supabase")
 
-        resume_path = None
+        steps: Dict[str, Any] = {}
         if resume_bytes is not None and resume_filename:
-            try:
-                ts = int(time.time() * 1000)
-                safe_name = resume_filename.replace(" ", "_")
-                resume_path = f"{user_id}/{ts}-{safe_name}"
-                up = self.supabase.storage.from_("resumes").upload(resume_path, resume_bytes)
-                if getattr(up, "error", None):
-                    resume_path = None
-            except Exception:
-                resume_path = None
-
+            safe_name = resume_filename.replace(" ", "_")
+            resume_path = f"{user_id}/{int(time.time() * 1000)}-{safe_name}"
+            steps["resume_upload"] = timed("resume_upload", self._upload_resume, resume_path, resume_bytes)
         # If recruiter and company_name provided but company_id missing, create company and update user metadata
-        final_company_id = company_id
-        if role == "recruiter" and (not final_company_id) and (company_name or "").strip():
-            base = ''.join(ch for ch in (company_name or "") if ch.isalpha()).upper()
-            if len(base) < 8:
-                base = base + ''.join(random.choice(string.ascii_uppercase) for _ in range(8 - len(base)))
-            gen_id = base[:8]
+        if role == "recruiter" and (not company_id) and (company_name or "").strip():
+            steps["company"] = timed("company", self._create_company, user_id, company_name)
+
+        started = time.perf_counter()
+        outcomes = dict(zip(steps, await asyncio.gather(*steps.values(), return_exceptions=True)))
+        timings["parallel_steps"] = round((time.perf_counter() - started) * 1000, 1)
+
+        if isinstance(outcomes.get("resume_upload"), BaseException):
+            logging.warning(f"Resume upload for {email} failed, continuing without it: {outcomes['resume_upload']}")
+            outcomes["resume_upload"] = None
+        if isinstance(outcomes.get("company"), BaseException):
+            error = outcomes["company"]
+            await asyncio.to_thread(self._compensate_registration, user_id, outcomes)
+            logging.error(f"Registration for {email} failed at company, rolled back: {error}")
+            raise RuntimeError(f"Registration failed (company): {error}")
+        final_company_id = outcomes.get("company") or company_id
+
+        login_url = os.getenv("FRONTEND_BASE_URL", "https://login.skreenit.com")
+        html = self.templates.welcome({
+            "full_name": full_name,
+            "email": email,
+            "company_id": final_company_id if role == "recruiter" else None,
+            "login_url": login_url,
+        })
+        logging.info(f"Queueing welcome email to {email}.")
+        started = time.perf_counter()
+        queued = await asyncio.to_thread(self._queue_email, email, "Welcome to Skreenit", html, "welcome")
+        timings["email"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return {
+            "ok": True,
+            "user_id": user_id,
+            "resume_path": outcomes.get("resume_upload"),
+            "email": email,
+            "company_id": final_company_id,
+            "email_sent": queued["email_sent"],
+            "email_response": str(queued),
+            "timings_ms": timings,
+        }
+
+    def _upload_resume(self, path: str, data: bytes) -> str:
+        up = self.supabase.storage.from_("resumes").upload(path, data)
+        if getattr(up, "error", None):
+            raise Exception(f"Resume upload error: {up.error}")
+        return path
+
+    def _create_company(self, user_id: str, company_name: str) -> str:
+        for attempt in range(COMPANY_ID_ATTEMPTS):
+            company_id = generate_company_id(company_name, random_letters=min(attempt, 1) * 3)
             try:
                 comp_ins = self.supabase.table("companies").insert({
-                    "id": gen_id,
+                    "id": company_id,
                     "name": company_name,
                     "created_by": user_id,
                 }).execute()
                 err = getattr(comp_ins, "error", None)
                 if err:
-                    raise Exception(err)
-                final_company_id = gen_id
-                try:
-                    _ = self.supabase.auth.admin.update_user_by_id(user_id, {
-                        "user_metadata": {
-                            "role": "recruiter",
-                            "company_id": final_company_id,
-                            "company_name": company_name,
-                            "onboarded": False,
-                            "password_set": False,
-                        }
-                    })
-                except Exception:
-                    pass
-            except Exception:
-                final_company_id = None
-
-        login_url = os.getenv("FRONTEND_BASE_URL", "https://login.skreenit.com")
-        html = f"""
-        <div>
-          <p>Hi {full_name},</p>
-          <p>Welcome to Skreenit! Your account has been created successfully.</p>
-          <p><strong>Login Email:</strong> {email}</p>
-          {('<p><strong>Your Company ID:</strong> ' + final_company_id + '</p>') if (role == 'recruiter' and final_company_id) else ''}
-          <p>We've sent a confirmation email to your address. Please check your inbox (and spam folder) and click the confirmation link to activate your account.</p>
-          <p>Once your email is confirmed, you can login here:</p>
-          <p><a href=\"{login_url}\">{login_url}</a></p>
-          <p><b>Regards,</b><br/>Team Skreenit</p>
-        </div>
-        """
-        logging.info(f"Sending custom welcome email to {email} via Resend.")
+                    raise Exception(f"Company create error: {err}")
+                break
+            except Exception as e:
+                if not _is_unique_violation(e) or attempt == COMPANY_ID_ATTEMPTS - 1:
+                    raise
+                logging.info(f"Company id {company_id} is taken, retrying with a new one")
         try:
-            email_res = send_email(
-                to=email,
-                subject="Welcome to Skreenit",
-                html=html,
-                email_type="welcome"
-            )
-            logging.info(f"Custom welcome email result for {email}: {email_res}")
+            self.supabase.auth.admin.update_user_by_id(user_id, {
+                "user_metadata": {
+                    "role": "recruiter",
+                    "company_id": company_id,
+                    "company_name": company_name,
+                    "onboarded": False,
+                    "password_set": False,
+                }
+            })
         except Exception as e:
-            email_res = {"error": str(e)}
+            # The company row is what recruiter login relies on; metadata is a convenience copy
+            logging.warning(f"Company metadata update failed for {user_id}: {e}")
+        return company_id
 
-        return {
-            "ok": True,
-            "user_id": user_id,
-            "resume_path": resume_path,
-            "email": email,
-            "company_id": final_company_id,
-            "email_sent": "error" not in email_res,
-            "email_response": str(email_res),
+    def _compensate_registration(self, user_id: str, outcomes: Dict[str, Any]) -> None:
+        """Best-effort undo of the registration steps that succeeded, then the auth user."""
+        undo = {
+            "resume_upload": lambda path: self.supabase.storage.from_("resumes").remove([path]),
+            "company": lambda cid: self.supabase.table("companies").delete().eq("id", cid).eq("created_by", user_id).execute(),
         }
+        for step, result in outcomes.items():
+            if isinstance(result, BaseException) or result is None:
+                continue
+            try:
+                undo[step](result)
+            except Exception as e:
+                logging.error(f"Registration rollback of {step} for {user_id} failed: {e}")
+        try:
+            self.supabase.auth.admin.delete_user(user_id)
+        except Exception as e:
+            logging.error(f"Registration rollback could not delete user {user_id}: {e}")
 
     def notify_password_changed(self, email: str, full_name: Optional[str] = None) -> Dict[str, Any]:
         display_name = full_name or (email.split("@")[0])
-        html = f"""
-        <div>
-          <p>Hi {display_name},</p>
-          <p>Your Skreenit account password was updated successfully.</p>
-          <p>If you did not initiate this change, please contact support immediately.</p>
-          <p><b>Regards,</b><br/>Team Skreenit</p>
-        </div>
-        """
-        try:
-            res = send_email(to=email, subject="Skreenit Password Updated", html=html, email_type="info")
-            return {"email_sent": True, "response": res}
-        except Exception as e:
-            return {"email_sent": False, "error": str(e)}
+        html = self.templates.password_changed({"full_name": display_name})
+        return self._queue_email(email, "Skreenit Password Updated", html, "info")
 
     def get_recruiter_company_info(self, user_id: str) -> Dict[str, Any]:
         prof = self.supabase.table("recruiter_profiles").select("company_id").eq("user_id", user_id).single().execute()
@@ -200,19 +251,33 @@ class AuthService:
         return {"company_id": company_id, "company_name": name}
 
     def send_recruiter_company_email(self, email: str, full_name: Optional[str], company_id: str, company_name: Optional[str]) -> Dict[str, Any]:
-        cname = company_name or "Your Company"
-        html = f"""
-        <div>
-          <p>Hi {full_name or ''},</p>
-          <p>Your recruiter profile has been set up on Skreenit.</p>
-          <p><strong>Company Name:</strong> {cname}<br/>
-          <strong>Company ID:</strong> {company_id}</p>
-          <p>Use this Company ID when logging in as a recruiter.</p>
-          <p><b>Regards,</b><br/>Team Skreenit</p>
-        </div>
+        html = self.templates.recruiter_company({
+            "full_name": full_name,
+            "company_id": company_id,
+            "company_name": company_name,
+        })
+        return self._queue_email(email, "Your Skreenit Company ID", html, "info")
+
+    def send_password_updated_emails(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """
-        try:
-            res = send_email(to=email, subject="Your Skreenit Company ID", html=html, email_type="info")
-            return {"email_sent": True, "response": res}
-        except Exception as e:
-            return {"email_sent": False, "error": str(e)}
+        Post-password-change notifications: the security notice, plus the
+        company ID reminder for recruiters. Meant to run off the request path.
+        """
+        email = user.get("email")
+        metadata = user.get("user_metadata") or {}
+        full_name = metadata.get("full_name") or None
+        result: Dict[str, Any] = {"password_changed": self.notify_password_changed(email=email, full_name=full_name)}
+        if metadata.get("role") == "recruiter":
+            try:
+                company = self.get_recruiter_company_info(user.get("id"))
+            except Exception as e:
+                logging.warning(f"Company lookup failed for {user.get('id')}: {e}")
+                company = {}
+            if company.get("company_id"):
+                result["company_id"] = self.send_recruiter_company_email(
+                    email=email,
+                    full_name=full_name,
+                    company_id=company["company_id"],
+                    company_name=company.get("company_name"),
+                )
+        return result
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from supabase import Client
+from .supabase_client import get_client
+from utils_others.pagination import decode_cursor, split_page
+from utils_others.skill_taxonomy import normalize_skill
+
+class CandidateSearchService:
+    """Recruiter candidate search through the search_candidates RPC (pg_trgm indexes, keyset pages)."""
+
+    def __init__(self, client: Optional[Client] = None):
+        self.supabase = client or get_client()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        all_skills: Optional[List[str]] = None,
+        any_skills: Optional[List[str]] = None,
+        exclude_skills: Optional[List[str]] = None,
+        min_experience: Optional[int] = None,
+        max_experience: Optional[int] = None,
+        location: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Best matches first. Candidates need every skill in all_skills, one of
+        any_skills and none of exclude_skills; query is matched against
+        profile title/bio and skill names.
+        """
+        if min_experience is not None and max_experience is not None and min_experience > max_experience:
+            raise ValueError("min_experience cannot exceed max_experience")
+        after = decode_cursor(cursor, ("score", "candidate_id")) or {}
+        res = self.supabase.rpc("search_candidates", {
+            "p_query": (query or "").strip() or None,
+            "p_all_skills": _clean(all_skills),
+            "p_any_skills": _clean(any_skills),
+            "p_exclude_skills": _clean(exclude_skills),
+            "p_min_experience": min_experience,
+            "p_max_experience": max_experience,
+            "p_location": (location or "").strip() or None,
+            "p_limit": limit + 1,
+            "p_after_score": after.get("score"),
+            "p_after_id": after.get("candidate_id"),
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Candidate search error: {err}")
+        page, next_cursor = split_page(res.data or [], limit, ("score", "candidate_id"))
+        return {"candidates": page, "next_cursor": next_cursor}
+
+def _clean(skills: Optional[List[str]]) -> List[str]:
+    # Stored names are canonical, so filters are too ("k8s" finds "Kubernetes")
+    return list(dict.fromkeys(n for n in (normalize_skill(s) for s in skills or []) if n))
@@ -0,0 +1,57 @@
+import logging
+from typing import Any, Dict, Optional
+from supabase import Client
+from .supabase_client import get_client
+from utils_others.pagination import decode_cursor, split_page
+
+logger = logging.getLogger(__name__)
+
+class CandidateSummaryService:
+    """
+    Maintains candidate_summaries (headline fields for applicant lists) and
+    pages through a job's applicants with them via the list_job_applicants RPC.
+    """
+
+    def __init__(self, client: Optional[Client] = None):
+        self.supabase = client or get_client()
+
+    def refresh(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Recompute one candidate's summary row. Best effort: the data it is
+        derived from is already saved, so a failure is logged rather than
+        failing the caller's write.
+        """
+        try:
+            res = self.supabase.rpc("refresh_candidate_summary", {"p_candidate_id": candidate_id}).execute()
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(err)
+            data = getattr(res, "data", None)
+            return data[0] if isinstance(data, list) and data else data
+        except Exception as e:
+            logger.warning(f"Candidate summary refresh failed for {candidate_id}: {e}")
+            return None
+
+    def list_job_applicants(
+        self,
+        job_id: str,
+        recruiter_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Newest-first keyset page of a job's applicants with their summaries, in one query."""
+        after = decode_cursor(cursor, ("applied_at", "application_id")) or {}
+        res = self.supabase.rpc("list_job_applicants", {
+            "p_job_id": job_id,
+            "p_recruiter_id": recruiter_id,
+            "p_limit": limit + 1,
+            "p_after_applied_at": after.get("applied_at"),
+            "p_after_id": after.get("application_id"),
+            "p_status": status,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Applicant list error: {err}")
+        page, next_cursor = split_page(res.data or [], limit, ("applied_at", "application_id"))
+        return {"applicants": page, "next_cursor": next_cursor}
@@ -0,0 +1,252 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+from supabase import Client
+from .supabase_client import get_client
+from utils_others.resend_email import ResendMailer, get_mailer, get_sender_address
+
+logger = logging.getLogger(__name__)
+
+class EmailOutbox:
+    """Persisted queue of outgoing emails backed by the email_outbox table."""
+
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        retry_base_seconds: float = 30.0,
+        retry_max_seconds: float = 3600.0,
+    ):
+        self.supabase = client or get_client()
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def enqueue(
+        self,
+        to: Union[str, List[str]],
+        subject: str,
+        html: str,
+        email_type: str = "default",
+        from_addr: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        row = {
+            "to_addrs": [to] if isinstance(to, str) else list(to),
+            "subject": subject,
+            "html": html,
+            "email_type": email_type,
+            "from_addr": from_addr or get_sender_address(email_type),
+            "status": "pending",
+            "next_attempt_at": datetime.now(timezone.utc).isoformat(),
+        }
+        res = self.supabase.table("email_outbox").insert(row).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Email enqueue error: {err}")
+        return (res.data or [row])[0]
+
+    def enqueue_many(self, messages: List[Dict[str, Any]], email_type: str = "default") -> List[Dict[str, Any]]:
+        """Queue many messages ({to, subject, html}) with one multi-row insert."""
+        if not messages:
+            return []
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {
+                "to_addrs": [m["to"]] if isinstance(m["to"], str) else list(m["to"]),
+                "subject": m["subject"],
+                "html": m["html"],
+                "email_type": m.get("email_type") or email_type,
+                "from_addr": m.get("from_addr") or get_sender_address(m.get("email_type") or email_type),
+                "status": "pending",
+                "next_attempt_at": now,
+            }
+            for m in messages
+        ]
+        res = self.supabase.table("email_outbox").insert(rows).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Email enqueue error: {err}")
+        return res.data or rows
+
+    def cancel(self, outbox_id: str) -> bool:
+        """Withdraw a message that has not been picked up yet."""
+        res = (
+            self.supabase.table("email_outbox")
+            .update({"status": "cancelled"})
+            .eq("id", outbox_id)
+            .eq("status", "pending")
+            .execute()
+        )
+        return bool(res.data)
+
+    def claim(self, worker_id: str, limit: int = 50, lease_seconds: int = 120) -> List[Dict[str, Any]]:
+        res = self.supabase.rpc("claim_email_outbox", {
+            "p_worker": worker_id,
+            "p_limit": limit,
+            "p_lease_seconds": lease_seconds,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Outbox claim error: {err}")
+        return res.data or []
+
+    def mark_sent(self, outbox_id: str, provider_id: Optional[str] = None) -> None:
+        res = self.supabase.table("email_outbox").update({
+            "status": "sent",
+            "provider_id": provider_id,
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "locked_by": None,
+            "locked_until": None,
+            "last_error": None,
+        }).eq("id", outbox_id).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Outbox mark sent error: {err}")
+
+    def mark_failed(self, row: Dict[str, Any], error: str) -> str:
+        """Schedule a retry with exponential backoff, or dead-letter the row. Returns the new status."""
+        # claim_email_outbox already counted this attempt when it leased the row
+        attempts = int(row.get("attempts") or 1)
+        max_attempts = int(row.get("max_attempts") or 8)
+        update: Dict[str, Any] = {
+            "last_error": error[:2000],
+            "locked_by": None,
+            "locked_until": None,
+        }
+        if attempts >= max_attempts:
+            update["status"] = "dead"
+        else:
+            delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** (attempts - 1)))
+            update["status"] = "pending"
+            update["next_attempt_at"] = (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+        res = self.supabase.table("email_outbox").update(update).eq("id", row["id"]).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Outbox mark failed error: {err}")
+        return update["status"]
+
+class EmailOutboxWorker:
+    """
+    Background thread that leases due outbox rows and sends them through the
+    batching, per-sender rate-limited mailer. Failures go back to the outbox
+    with exponential backoff until max_attempts, then the row is dead-lettered.
+    """
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        mailer: Optional[ResendMailer] = None,
+        poll_interval: float = 2.0,
+        batch_size: int = 100,
+        worker_id: Optional[str] = None,
+        owns_mailer: bool = False,
+    ):
+        self.outbox = outbox
+        # Defaults to the process-wide mailer so its per-sender throttling also
+        # covers direct sends; only a mailer handed over with owns_mailer=True is
+        # closed by close()
+        self.mailer = mailer or get_mailer()
+        self.owns_mailer = owns_mailer and mailer is not None
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"sent": 0, "retried": 0, "dead": 0}
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        if self.owns_mailer:
+            self.mailer.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Email outbox poll failed: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def run_once(self) -> int:
+        rows = self.outbox.claim(self.worker_id, limit=self.batch_size)
+        if rows:
+            self.deliver(rows)
+        return len(rows)
+
+    def deliver(self, rows: List[Dict[str, Any]]) -> None:
+        results = self.mailer.send_batch([
+            {
+                "to": row["to_addrs"],
+                "subject": row["subject"],
+                "html": row["html"],
+                "from_addr": row["from_addr"],
+                "email_type": row.get("email_type") or "default",
+            }
+            for row in rows
+        ])
+        for row, result in zip(rows, results):
+            # A failed status write leaves the row leased; it is retried once the
+            # lease expires, so log it and keep recording the rest of the batch
+            if "error" in result:
+                try:
+                    status = self.outbox.mark_failed(row, result["error"])
+                except Exception as e:
+                    logger.error(f"Email {row['id']} failed to send and could not be rescheduled: {e}")
+                    continue
+                self.stats["dead" if status == "dead" else "retried"] += 1
+                if status == "dead":
+                    logger.error(f"Email {row['id']} dead-lettered after {int(row.get('attempts') or 0) + 1} attempts: {result['error']}")
+                continue
+            try:
+                self.outbox.mark_sent(row["id"], result.get("id"))
+            except Exception as e:
+                logger.error(f"Email {row['id']} was sent but not marked sent and may be sent again: {e}")
+                continue
+            self.stats["sent"] += 1
+
+_worker: Optional[EmailOutboxWorker] = None
+
+def start_outbox_worker() -> Optional[EmailOutboxWorker]:
+    """Run the outbox worker inside the API process unless EMAIL_OUTBOX_WORKER=0."""
+    global _worker
+    if os.getenv("EMAIL_OUTBOX_WORKER", "1") == "0":
+        return None
+    if _worker is None:
+        try:
+            outbox = EmailOutbox(get_client())
+        except Exception as e:
+            logger.warning(f"Email outbox worker not started: {e}")
+            return None
+        _worker = EmailOutboxWorker(outbox)
+    _worker.start()
+    return _worker
+
+def stop_outbox_worker() -> None:
+    if _worker is not None:
+        _worker.close()
+
+if __name__ == "__main__":
+    # Standalone worker: python -m services.email_outbox
+    logging.basicConfig(level=logging.INFO)
+    worker = EmailOutboxWorker(EmailOutbox(get_client()))
+    try:
+        worker._run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, Dict[str, Any]], None]
+
+class BrokerBackend(ABC):
+    """
+    Transport between API workers. publish() must eventually invoke the
+    registered handler in every worker (including the publishing one) with the
+    same channel and message. A Redis/Postgres LISTEN-NOTIFY implementation can
+    be dropped in without touching the broker or the WebSocket endpoint.
+    """
+
+    def set_handler(self, handler: Handler) -> None:
+        self._handler = handler
+
+    @abstractmethod
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class LocalBackend(BrokerBackend):
+    """Single-worker stand-in: delivers straight to this process's subscribers."""
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._handler(channel, message)
+
+BACKENDS: Dict[str, Callable[[], BrokerBackend]] = {
+    "local": LocalBackend,
+}
+
+class Subscription:
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.channel = channel
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        # Set when the client fell too far behind; it should reconnect and resume
+        self.overflowed = False
+
+    def _put(self, message: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Wake the consumer so it notices and closes the socket
+            self.queue.get_nowait()
+            self.queue.put_nowait({"type": "overflow"})
+
+class NotificationBroker:
+    """
+    In-process pub/sub with one channel per user. publish() is thread-safe so it
+    can be called from sync request handlers and background tasks; delivery
+    happens on each subscriber's event loop.
+    """
+
+    def __init__(self, backend: Optional[BrokerBackend] = None, max_pending: int = 100):
+        self.backend = backend or LocalBackend()
+        self.backend.set_handler(self._deliver)
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._delivered = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        sub = Subscription(user_id, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def publish(self, user_id: str, message: Dict[str, Any]) -> None:
+        self._published += 1
+        self.backend.publish(user_id, message)
+
+    def publish_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """NotificationService listener: push each inserted row to its user's channel."""
+        for row in rows:
+            if row.get("user_id"):
+                self.publish(row["user_id"], {"type": "notification", "data": row})
+
+    def _deliver(self, channel: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, message)
+                self._delivered += 1
+            except RuntimeError:
+                # Loop already closed; the connection handler will clean up
+                self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            connections = sum(len(s) for s in self._subscribers.values())
+            channels = len(self._subscribers)
+        return {
+            "connections": connections,
+            "channels": channels,
+            "published": self._published,
+            "delivered": self._delivered,
+        }
+
+    def close(self) -> None:
+        self.backend.close()
+
+def create_broker(backend_name: str = "local", max_pending: int = 100) -> NotificationBroker:
+    factory = BACKENDS.get(backend_name)
+    if factory is None:
+        raise RuntimeError(f"Unknown notification broker backend: {backend_name}")
+    return NotificationBroker(factory(), max_pending=max_pending)
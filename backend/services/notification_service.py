@@ -0,0 +1,374 @@
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+from supabase import Client
+from .supabase_client import get_client
+from utils_others.pagination import decode_cursor, keyset_filter, split_page
+from utils_others.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = 500
+# PostgREST caps responses at 1000 rows by default
+AUDIENCE_PAGE_SIZE = 1000
+# Explicit recipients checked per query; keeps the in.() filter short
+AUDIENCE_CHECK_CHUNK = 100
+
+class FanoutConflict(Exception):
+    """The fan-out key is already taken by another creator."""
+    pass
+
+class UnreadCountCache:
+    """
+    Per-user unread counters kept in process. A user's count is loaded with one
+    indexed COUNT on first use and then adjusted in place on insert and
+    mark-read; the TTL bounds drift from writes made by other workers.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_size: int = 50000):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: str) -> Optional[int]:
+        return self._cache.get(user_id)
+
+    def set(self, user_id: str, count: int) -> None:
+        self._cache.set(user_id, max(0, count))
+
+    def adjust(self, user_id: str, delta: int) -> None:
+        # Users without a cached count are left alone; their next read loads it
+        self._cache.update(user_id, lambda count: max(0, count + delta))
+
+    def invalidate(self, user_id: str) -> None:
+        self._cache.delete(user_id)
+
+    def on_inserted(self, rows: List[Dict[str, Any]]) -> None:
+        """NotificationService listener: count newly inserted unread rows."""
+        for row in rows:
+            if row.get("user_id") and not row.get("is_read"):
+                self.adjust(row["user_id"], 1)
+
+class NotificationService:
+    def __init__(self, client: Optional[Client] = None, unread_cache: Optional[UnreadCountCache] = None):
+        self.supabase = client or get_client()
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self.unread_cache = unread_cache or UnreadCountCache()
+        self.add_listener(self.unread_cache.on_inserted)
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """Register a callable that receives every batch of inserted notification rows."""
+        self._listeners.append(listener)
+
+    def _notify_listeners(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        for listener in self._listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                logger.warning(f"Notification listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+    def create(self, notification: Dict[str, Any]) -> List[Dict[str, Any]]:
+        notif = dict(notification)
+        notif.setdefault("created_at", datetime.utcnow().isoformat())
+        res = self.supabase.table("notifications").insert(notif).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Notification error: {err}")
+        self._notify_listeners(res.data or [])
+        return res.data
+
+    # Inbox
+
+    def list_inbox(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        unread_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Newest-first keyset page on (created_at, id) using idx_notifications_user_created."""
+        query = self.supabase.table("notifications").select("*").eq("user_id", user_id)
+        if unread_only:
+            query = query.eq("is_read", False)
+        after = decode_cursor(cursor, ("created_at", "id"))
+        if after:
+            query = query.or_(keyset_filter("created_at", after["created_at"], "id", after["id"]))
+        res = (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Inbox fetch error: {err}")
+        page, next_cursor = split_page(res.data or [], limit, ("created_at", "id"))
+        return {"notifications": page, "next_cursor": next_cursor}
+
+    def list_since(self, user_id: str, last_seen_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Notifications newer than last_seen_id, oldest first (used to resume a live feed)."""
+        seen = (
+            self.supabase.table("notifications")
+            .select("id,created_at")
+            .eq("user_id", user_id)
+            .eq("id", last_seen_id)
+            .limit(1)
+            .execute()
+        )
+        err = getattr(seen, "error", None)
+        if err:
+            raise Exception(f"Inbox resume error: {err}")
+        anchor = (seen.data or [{}])[0]
+        if not anchor.get("created_at") or not anchor.get("id"):
+            # Unknown id (or another user's): nothing to replay
+            return []
+        res = (
+            self.supabase.table("notifications")
+            .select("*")
+            .eq("user_id", user_id)
+            .or_(keyset_filter("created_at", anchor["created_at"], "id", anchor["id"], descending=False))
+            .order("created_at")
+            .order("id")
+            .limit(limit)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Inbox resume error: {err}")
+        return res.data or []
+
+    def unread_count(self, user_id: str) -> int:
+        cached = self.unread_cache.get(user_id)
+        if cached is not None:
+            return cached
+        res = (
+            self.supabase.table("notifications")
+            .select("id", count="exact", head=True)
+            .eq("user_id", user_id)
+            .eq("is_read", False)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Unread count error: {err}")
+        count = getattr(res, "count", None) or 0
+        self.unread_cache.set(user_id, count)
+        return count
+
+    def mark_read(self, user_id: str, notification_ids: Optional[List[str]] = None, mark_all: bool = False) -> int:
+        """Mark notifications read in one UPDATE; returns how many changed from unread."""
+        if not mark_all and not notification_ids:
+            return 0
+        query = (
+            self.supabase.table("notifications")
+            .update({"is_read": True})
+            .eq("user_id", user_id)
+            .eq("is_read", False)
+        )
+        if not mark_all:
+            query = query.in_("id", list(dict.fromkeys(notification_ids)))
+        res = query.execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Mark read error: {err}")
+        changed = len(res.data or [])
+        if mark_all:
+            self.unread_cache.set(user_id, 0)
+        else:
+            self.unread_cache.adjust(user_id, -changed)
+        return changed
+
+    # Fan-out
+
+    def resolve_audience(self, audience: Dict[str, Any]) -> List[str]:
+        """Expand an audience spec into a de-duplicated, ordered list of user ids."""
+        user_ids: List[str] = []
+        if audience.get("user_ids"):
+            user_ids.extend(audience["user_ids"])
+        if audience.get("job_id"):
+            statuses = audience.get("statuses") or []
+            start = 0
+            while True:
+                query = (
+                    self.supabase.table("job_applications")
+                    .select("candidate_id")
+                    .eq("job_id", audience["job_id"])
+                )
+                if statuses:
+                    query = query.in_("status", [getattr(s, "value", s) for s in statuses])
+                res = query.order("id").range(start, start + AUDIENCE_PAGE_SIZE - 1).execute()
+                err = getattr(res, "error", None)
+                if err:
+                    raise Exception(f"Audience query error: {err}")
+                rows = res.data or []
+                # PostgREST may return fewer rows than asked for (max-rows), so only an empty page ends the walk
+                if not rows:
+                    break
+                user_ids.extend(r["candidate_id"] for r in rows if r.get("candidate_id"))
+                start += len(rows)
+        return list(dict.fromkeys(user_ids))
+
+    def check_audience(self, audience: Dict[str, Any], recruiter_id: str) -> None:
+        """
+        Raise PermissionError unless the recruiter may notify the whole
+        audience: job audiences must be the recruiter's own jobs, and explicit
+        user_ids must have applied to at least one of them.
+        """
+        if audience.get("job_id"):
+            res = (
+                self.supabase.table("jobs")
+                .select("id")
+                .eq("id", audience["job_id"])
+                .eq("created_by", recruiter_id)
+                .limit(1)
+                .execute()
+            )
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Audience job lookup error: {err}")
+            if not res.data:
+                raise PermissionError("Job not found for this recruiter")
+        user_ids = list(dict.fromkeys(audience.get("user_ids") or []))
+        if user_ids:
+            allowed = self.recruiter_applicant_ids(recruiter_id, user_ids)
+            outsiders = [uid for uid in user_ids if uid not in allowed]
+            if outsiders:
+                raise PermissionError(f"{len(outsiders)} recipient(s) have not applied to your jobs")
+
+    def recruiter_applicant_ids(self, recruiter_id: str, user_ids: List[str]) -> Set[str]:
+        """The subset of user_ids that applied to any job created by the recruiter."""
+        jobs = self.supabase.table("jobs").select("id").eq("created_by", recruiter_id).execute()
+        err = getattr(jobs, "error", None)
+        if err:
+            raise Exception(f"Audience job lookup error: {err}")
+        owned = [j["id"] for j in jobs.data or []]
+        found: Set[str] = set()
+        if not owned:
+            return found
+        for start in range(0, len(user_ids), AUDIENCE_CHECK_CHUNK):
+            res = (
+                self.supabase.table("job_applications")
+                .select("candidate_id")
+                .in_("job_id", owned)
+                .in_("candidate_id", user_ids[start:start + AUDIENCE_CHECK_CHUNK])
+                .execute()
+            )
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Audience check error: {err}")
+            found.update(r["candidate_id"] for r in res.data or [])
+        return found
+
+    def get_fanout(self, fanout_key: str) -> Optional[Dict[str, Any]]:
+        res = (
+            self.supabase.table("notification_fanouts")
+            .select("*")
+            .eq("fanout_key", fanout_key)
+            .limit(1)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Fan-out fetch error: {err}")
+        return res.data[0] if res.data else None
+
+    def start_fanout(
+        self,
+        fanout_key: str,
+        template: Dict[str, Any],
+        audience: Dict[str, Any],
+        created_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Register a fan-out job under its idempotency key. Returns the record and
+        whether it should be run; an existing key is only re-run when its
+        previous attempt did not complete. Raises FanoutConflict when the key
+        was registered by someone else.
+        """
+        existing = self.get_fanout(fanout_key)
+        if existing:
+            self._check_owner(existing, created_by)
+            return {"fanout": existing, "run": existing.get("status") in ("pending", "failed")}
+        row = {
+            "fanout_key": fanout_key,
+            "template": template,
+            "audience": audience,
+            "status": "pending",
+            "created_by": created_by,
+        }
+        try:
+            res = self.supabase.table("notification_fanouts").insert(row).execute()
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(err)
+        except Exception as e:
+            # Lost a race with another request using the same key
+            existing = self.get_fanout(fanout_key)
+            if existing:
+                self._check_owner(existing, created_by)
+                return {"fanout": existing, "run": False}
+            raise Exception(f"Fan-out create error: {str(e)}")
+        return {"fanout": (res.data or [row])[0], "run": True}
+
+    @staticmethod
+    def _check_owner(fanout: Dict[str, Any], created_by: Optional[str]) -> None:
+        if fanout.get("created_by") != created_by:
+            raise FanoutConflict("Fan-out key is already in use")
+
+    def _update_fanout(self, fanout_key: str, values: Dict[str, Any]) -> None:
+        res = self.supabase.table("notification_fanouts").update(values).eq("fanout_key", fanout_key).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Fan-out update error: {err}")
+
+    def run_fanout(self, fanout_key: str, chunk_size: int = FANOUT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Insert the fan-out's notifications in multi-row chunks, recording progress
+        after each one. Chunks upsert on (fanout_key, user_id) and ignore
+        duplicates, so a retried or concurrent run never notifies anyone twice.
+        """
+        fanout = self.get_fanout(fanout_key)
+        if not fanout:
+            raise Exception("Fan-out not found")
+        template = fanout.get("template") or {}
+        try:
+            user_ids = self.resolve_audience(fanout.get("audience") or {})
+            self._update_fanout(fanout_key, {"status": "running", "total": len(user_ids), "sent": 0, "error": None})
+            created_at = datetime.utcnow().isoformat()
+            sent = 0
+            for start in range(0, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                rows = [
+                    {
+                        "user_id": uid,
+                        "title": template.get("title"),
+                        "message": template.get("message"),
+                        "type": template.get("type"),
+                        "related_id": template.get("related_id"),
+                        "is_read": False,
+                        "fanout_key": fanout_key,
+                        "created_at": created_at,
+                    }
+                    for uid in chunk
+                ]
+                res = (
+                    self.supabase.table("notifications")
+                    .upsert(rows, on_conflict="fanout_key,user_id", ignore_duplicates=True)
+                    .execute()
+                )
+                err = getattr(res, "error", None)
+                if err:
+                    raise Exception(f"Notification insert error: {err}")
+                # Only rows actually inserted are returned when duplicates are ignored
+                self._notify_listeners(res.data or [])
+                sent += len(chunk)
+                self._update_fanout(fanout_key, {"sent": sent})
+            self._update_fanout(fanout_key, {"status": "completed", "completed_at": datetime.utcnow().isoformat()})
+        except Exception as e:
+            logger.error(f"Fan-out {fanout_key} failed: {e}")
+            try:
+                self._update_fanout(fanout_key, {"status": "failed", "error": str(e)})
+            except Exception:
+                pass
+            raise
+        return self.get_fanout(fanout_key) or {}
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+from supabase import Client
+from .supabase_client import get_client
+from .video_service import SIGNED_URL_TTL, VideoService
+from utils_others.file_upload import create_signed_urls
+
+# Sections a recruiter review page can ask for; "application" is always returned
+REVIEW_FIELDS = ("job", "profile", "education", "experience", "skills", "videos", "general_video", "resume")
+
+class ReviewNotFound(Exception):
+    pass
+
+def parse_review_fields(fields: Optional[str]) -> List[str]:
+    """Comma-separated field selection; empty means everything."""
+    if not fields:
+        return list(REVIEW_FIELDS)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(selected) - set(REVIEW_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(selected))
+
+class ApplicationReviewService:
+    """
+    Everything a recruiter needs to review one application, assembled server
+    side: the application row first (it names the job and candidate), then
+    every selected section concurrently, then one signing call per bucket.
+    """
+
+    def __init__(self, client: Optional[Client] = None, video_service: Optional[VideoService] = None):
+        self.supabase = client or get_client()
+        self.video_service = video_service or VideoService(self.supabase)
+
+    def _select(self, table: str, column: str, value: Any, single: bool = False) -> Any:
+        query = self.supabase.table(table).select("*").eq(column, value)
+        if single:
+            query = query.maybe_single()
+        res = query.execute()
+        if res is None:
+            # maybe_single() yields no response at all when nothing matched
+            return None
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"{table} fetch error: {err}")
+        data = getattr(res, "data", None)
+        if single:
+            return data or None
+        return data or []
+
+    def _fetchers(self, application: Dict[str, Any]) -> Dict[str, Any]:
+        candidate_id = application.get("candidate_id")
+        return {
+            "job": lambda: self._select("jobs", "id", application.get("job_id"), single=True),
+            "profile": lambda: self._select("candidate_profiles", "id", candidate_id, single=True),
+            "education": lambda: self._select("candidate_education", "candidate_id", candidate_id),
+            "experience": lambda: self._select("candidate_experience", "candidate_id", candidate_id),
+            "skills": lambda: self._select("candidate_skills", "candidate_id", candidate_id),
+            "videos": lambda: self._select("video_responses", "application_id", application["id"]),
+            "general_video": lambda: self._select("general_video_interviews", "candidate_id", candidate_id, single=True),
+        }
+
+    def _sign_resume(self, path: Optional[str], expires_in: int) -> Optional[Dict[str, Any]]:
+        if not path:
+            return None
+        url = create_signed_urls(self.supabase, "resumes", [path], expires_in).get(path)
+        return {"path": path, "signed_url": url}
+
+    async def get_review(self, application_id: str, recruiter_id: str, fields: Iterable[str] = REVIEW_FIELDS,
+                         expires_in: int = SIGNED_URL_TTL) -> Dict[str, Any]:
+        application = await asyncio.to_thread(self._select, "job_applications", "id", application_id, True)
+        if not application:
+            raise ReviewNotFound("Application not found")
+
+        fields = list(fields)
+        fetchers = self._fetchers(application)
+        # The job is always loaded: it is how ownership is checked
+        wanted = {"job"} | {f for f in fields if f in fetchers}
+        if "resume" in fields:
+            wanted.add("profile")
+        names = sorted(wanted)
+        results = await asyncio.gather(*(asyncio.to_thread(fetchers[name]) for name in names))
+        sections = dict(zip(names, results))
+
+        job = sections["job"]
+        if not job or job.get("created_by") != recruiter_id:
+            # Same answer as a missing application, so ids cannot be probed
+            raise ReviewNotFound("Application not found")
+
+        video_rows: List[Dict[str, Any]] = list(sections.get("videos") or [])
+        if sections.get("general_video") and "general_video" in fields:
+            video_rows.append(sections["general_video"])
+        resume_path = (sections.get("profile") or {}).get("resume_url") if "resume" in fields else None
+        signing = [asyncio.to_thread(self.video_service.attach_signed_urls, video_rows, expires_in)]
+        if "resume" in fields:
+            signing.append(asyncio.to_thread(self._sign_resume, resume_path, expires_in))
+        signed = await asyncio.gather(*signing)
+        if "resume" in fields:
+            sections["resume"] = signed[1]
+
+        review = {"application": application}
+        for name in fields:
+            review[name] = sections.get(name)
+        return review
@@ -0,0 +1,132 @@
+import argparse
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from supabase import Client
+from .candidate_summary import CandidateSummaryService
+from .supabase_client import get_client
+from utils_others.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+# table -> (owner column, sort key choosing which duplicate survives)
+SKILL_TABLES: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    "candidate_skills": ("candidate_id", lambda r: -(r.get("years_experience") or 0)),
+    "job_skills": ("job_id", lambda r: not r.get("is_required")),
+}
+
+def backfill_skill_names(
+    client: Client,
+    table: str,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    taxonomy: Optional[SkillTaxonomy] = None,
+) -> Dict[str, int]:
+    """
+    Rewrite skill_name to its canonical form and drop rows that become
+    duplicates for the same owner (the most experienced / required one is
+    kept). Rows are read in (owner, id) order so each owner's skills are
+    handled together; renames are batched per target name. Candidates whose
+    skills changed get their candidate_summaries row refreshed.
+    """
+    owner_column, survivor = SKILL_TABLES[table]
+    taxonomy = taxonomy or get_skill_taxonomy()
+    stats = {"scanned": 0, "renamed": 0, "duplicates_removed": 0}
+    offset = 0
+    group: List[Dict[str, Any]] = []
+    touched: List[Any] = []
+    summaries = CandidateSummaryService(client) if table == "candidate_skills" else None
+
+    def settle(rows: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Any]], List[Any]]:
+        renames: Dict[str, List[Any]] = {}
+        drops: List[Any] = []
+        kept = set()
+        for row in sorted(rows, key=lambda r: (survivor(r), str(r["id"]))):
+            name = taxonomy.normalize(row.get("skill_name"))
+            if not name:
+                continue
+            if name.lower() in kept:
+                drops.append(row["id"])
+                continue
+            kept.add(name.lower())
+            if name != row.get("skill_name"):
+                renames.setdefault(name, []).append(row["id"])
+        if rows and (renames or drops):
+            touched.append(rows[0].get(owner_column))
+        return renames, drops
+
+    def apply(renames: Dict[str, List[Any]], drops: List[Any]) -> None:
+        stats["renamed"] += sum(len(ids) for ids in renames.values())
+        stats["duplicates_removed"] += len(drops)
+        if dry_run:
+            touched.clear()
+            return
+        for name, ids in renames.items():
+            res = client.table(table).update({"skill_name": name}).in_("id", ids).execute()
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Skill rename error: {err}")
+        if drops:
+            res = client.table(table).delete().in_("id", drops).execute()
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Duplicate skill delete error: {err}")
+        if summaries:
+            for owner_id in touched:
+                summaries.refresh(owner_id)
+        touched.clear()
+
+    while True:
+        res = (
+            client.table(table)
+            .select("*")
+            .order(owner_column)
+            .order("id")
+            .range(offset, offset + batch_size - 1)
+            .execute()
+        )
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Skill read error: {err}")
+        page = res.data or []
+        stats["scanned"] += len(page)
+        renames: Dict[str, List[Any]] = {}
+        drops: List[Any] = []
+        for row in page:
+            if group and row.get(owner_column) != group[0].get(owner_column):
+                r, d = settle(group)
+                for name, ids in r.items():
+                    renames.setdefault(name, []).extend(ids)
+                drops.extend(d)
+                group = []
+            group.append(row)
+        if len(page) < batch_size:
+            r, d = settle(group)
+            for name, ids in r.items():
+                renames.setdefault(name, []).extend(ids)
+            drops.extend(d)
+            apply(renames, drops)
+            break
+        apply(renames, drops)
+        # Deleted rows were all before the read position, so the window shifts back
+        offset += len(page) - (0 if dry_run else len(drops))
+    logger.info(f"Skill backfill for {table}: {stats}")
+    return stats
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-normalize stored skill names against the skill dictionary")
+    parser.add_argument("--table", choices=sorted(SKILL_TABLES), action="append",
+                        help="Defaults to every skill table")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = get_client()
+    for table in args.table or sorted(SKILL_TABLES):
+        stats = backfill_skill_names(client, table, batch_size=args.batch_size, dry_run=args.dry_run)
+        print(json.dumps({"table": table, "dry_run": args.dry_run, **stats}))
+
+if __name__ == "__main__":
+    # e.g. python -m services.skill_backfill --dry-run
+    main()
@@ -0,0 +1,463 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from supabase import Client
+from .supabase_client import get_client
+
+logger = logging.getLogger(__name__)
+
+VIDEO_TABLES = ("video_responses", "general_video_interviews")
+DEFAULT_PROCESSORS = ("thumbnail", "transcript", "analysis")
+
+Processor = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# name -> callable(job) returning the columns to write on the video row.
+# Processors run in worker processes, so they must be module-level functions.
+PROCESSORS: Dict[str, Processor] = {}
+
+def register_processor(name: str) -> Callable[[Processor], Processor]:
+    def decorator(fn: Processor) -> Processor:
+        PROCESSORS[name] = fn
+        return fn
+    return decorator
+
+def configured_processors() -> List[str]:
+    """Processors queued for every upload (VIDEO_PROCESSORS, comma separated)."""
+    raw = os.getenv("VIDEO_PROCESSORS", ",".join(DEFAULT_PROCESSORS))
+    return [p.strip() for p in raw.split(",") if p.strip()]
+
+# Stub processors: no media work, deterministic output. Used for local runs
+# and tests until real implementations are registered under the same names.
+
+def stub_thumbnail(job: Dict[str, Any]) -> Dict[str, Any]:
+    # Media fragment URL: browsers render the frame at t=1s as a poster
+    return {"thumbnail_url": f"{job['video_url']}#t=1"}
+
+def stub_transcript(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {"transcript": ""}
+
+def stub_analysis(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {"ai_analysis": {"processor": "stub", "analyzed_at": datetime.now(timezone.utc).isoformat()}}
+
+STUB_PROCESSORS: Dict[str, Processor] = {
+    "thumbnail": stub_thumbnail,
+    "transcript": stub_transcript,
+    "analysis": stub_analysis,
+}
+
+def register_stub_processors() -> None:
+    for name, fn in STUB_PROCESSORS.items():
+        PROCESSORS.setdefault(name, fn)
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class VideoJobStore:
+    """video_jobs table access; leasing and heartbeats go through SQL functions."""
+
+    def __init__(self, client: Optional[Client] = None, retry_base_seconds: float = 30.0):
+        self.supabase = client or get_client()
+        self.retry_base_seconds = retry_base_seconds
+
+    def enqueue(self, video_table: str, video_id: str, video_url: str, processors: List[str]) -> List[Dict[str, Any]]:
+        if video_table not in VIDEO_TABLES:
+            raise ValueError(f"Unknown video table: {video_table}")
+        processors = list(dict.fromkeys(processors))
+        if not processors:
+            return []
+        res = self.supabase.rpc("enqueue_video_jobs", {
+            "p_video_table": video_table,
+            "p_video_id": video_id,
+            "p_video_url": video_url,
+            "p_processors": processors,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Video job enqueue error: {err}")
+        return res.data or []
+
+    def claim(self, worker_id: str, processors: List[str], limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        res = self.supabase.rpc("claim_video_jobs", {
+            "p_worker": worker_id,
+            "p_processors": processors,
+            "p_limit": limit,
+            "p_lease_seconds": lease_seconds,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Video job claim error: {err}")
+        return res.data or []
+
+    def heartbeat(self, worker_id: str, job_ids: List[str], lease_seconds: int) -> List[str]:
+        res = self.supabase.rpc("heartbeat_video_jobs", {
+            "p_worker": worker_id,
+            "p_ids": job_ids,
+            "p_lease_seconds": lease_seconds,
+        }).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Video job heartbeat error: {err}")
+        return [r if isinstance(r, str) else r.get("heartbeat_video_jobs") for r in (res.data or [])]
+
+    def complete(self, job: Dict[str, Any], worker_id: str, result: Dict[str, Any]) -> None:
+        if result:
+            # A job for a recording that has since been replaced must not overwrite the new results
+            res = (
+                self.supabase.table(job["video_table"])
+                .update(result)
+                .eq("id", job["video_id"])
+                .eq("video_url", job["video_url"])
+                .execute()
+            )
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(f"Video result write error: {err}")
+        res = self.supabase.table("video_jobs").update({
+            "status": "completed",
+            "result": result,
+            "finished_at": _utcnow().isoformat(),
+            "locked_by": None,
+            "locked_until": None,
+            "last_error": None,
+        }).eq("id", job["id"]).eq("locked_by", worker_id).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Video job complete error: {err}")
+
+    def fail(self, job: Dict[str, Any], worker_id: str, error: str) -> str:
+        """Back off and retry, or mark dead once max_attempts leases were used. Returns the new status."""
+        attempts = int(job.get("attempts") or 1)
+        update: Dict[str, Any] = {"last_error": error[:2000], "locked_by": None, "locked_until": None}
+        if attempts >= int(job.get("max_attempts") or 5):
+            update["status"] = "dead"
+            update["finished_at"] = _utcnow().isoformat()
+        else:
+            update["status"] = "pending"
+            update["run_after"] = (_utcnow() + timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1))).isoformat()
+        self.supabase.table("video_jobs").update(update).eq("id", job["id"]).eq("locked_by", worker_id).execute()
+        return update["status"]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        res = self.supabase.rpc("video_job_stats", {}).execute()
+        err = getattr(res, "error", None)
+        if err:
+            raise Exception(f"Video job stats error: {err}")
+        return res.data or []
+
+class InMemoryVideoJobStore:
+    """Same interface as VideoJobStore, kept in process; for tests and local runs."""
+
+    def __init__(self, retry_base_seconds: float = 0.0, max_attempts: int = 5, clock: Callable[[], float] = time.time):
+        self.retry_base_seconds = retry_base_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.videos: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, video_table: str, video_id: str, video_url: str, processors: List[str]) -> List[Dict[str, Any]]:
+        if video_table not in VIDEO_TABLES:
+            raise ValueError(f"Unknown video table: {video_table}")
+        created = []
+        with self._lock:
+            existing = {(j["video_table"], j["video_id"], j["processor"]): j for j in self.jobs.values()}
+            for p in dict.fromkeys(processors):
+                job = existing.get((video_table, video_id, p))
+                if job is not None:
+                    if job["video_url"] != video_url:
+                        # New recording for the same video row: process it from scratch
+                        job.update(video_url=video_url, status="pending", attempts=0, run_after=self.clock(),
+                                   locked_by=None, locked_until=None, result=None, last_error=None,
+                                   created_at=self.clock(), started_at=None, finished_at=None)
+                        created.append(dict(job))
+                    continue
+                job = {
+                    "id": str(uuid.uuid4()), "video_table": video_table, "video_id": video_id,
+                    "video_url": video_url, "processor": p, "status": "pending", "attempts": 0,
+                    "max_attempts": self.max_attempts, "run_after": self.clock(), "locked_by": None,
+                    "locked_until": None, "created_at": self.clock(), "started_at": None, "finished_at": None,
+                }
+                self.jobs[job["id"]] = job
+                created.append(dict(job))
+        return created
+
+    def claim(self, worker_id: str, processors: List[str], limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        now = self.clock()
+        claimed = []
+        with self._lock:
+            due = sorted(
+                (j for j in self.jobs.values() if j["processor"] in processors and (
+                    (j["status"] == "pending" and j["run_after"] <= now)
+                    or (j["status"] == "running" and j["locked_until"] < now))),
+                key=lambda j: j["run_after"],
+            )
+            for job in due[:limit]:
+                job.update(status="running", attempts=job["attempts"] + 1, locked_by=worker_id,
+                           locked_until=now + lease_seconds, started_at=now)
+                claimed.append(dict(job))
+        return claimed
+
+    def heartbeat(self, worker_id: str, job_ids: List[str], lease_seconds: int) -> List[str]:
+        owned = []
+        with self._lock:
+            for job_id in job_ids:
+                job = self.jobs.get(job_id)
+                if job and job["locked_by"] == worker_id and job["status"] == "running":
+                    job["locked_until"] = self.clock() + lease_seconds
+                    owned.append(job_id)
+        return owned
+
+    def complete(self, job: Dict[str, Any], worker_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            stored = self.jobs[job["id"]]
+            if stored["video_url"] == job["video_url"]:
+                self.videos.setdefault((job["video_table"], job["video_id"]), {}).update(result or {})
+            if stored["locked_by"] == worker_id:
+                stored.update(status="completed", result=result, finished_at=self.clock(),
+                              locked_by=None, locked_until=None, last_error=None)
+
+    def fail(self, job: Dict[str, Any], worker_id: str, error: str) -> str:
+        with self._lock:
+            stored = self.jobs[job["id"]]
+            if stored["locked_by"] != worker_id:
+                return stored["status"]
+            stored.update(last_error=error, locked_by=None, locked_until=None)
+            if stored["attempts"] >= stored["max_attempts"]:
+                stored.update(status="dead", finished_at=self.clock())
+            else:
+                stored.update(status="pending",
+                              run_after=self.clock() + self.retry_base_seconds * 2 ** (stored["attempts"] - 1))
+            return stored["status"]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = self.clock()
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for job in self.jobs.values():
+                s = out.setdefault(job["processor"], {
+                    "processor": job["processor"], "pending": 0, "running": 0, "dead": 0,
+                    "oldest_pending_seconds": None, "avg_latency_seconds": None, "_latencies": [],
+                })
+                if job["status"] in ("pending", "running", "dead"):
+                    s[job["status"]] += 1
+                if job["status"] == "pending":
+                    age = now - job["created_at"]
+                    s["oldest_pending_seconds"] = max(s["oldest_pending_seconds"] or 0, age)
+                if job["status"] == "completed":
+                    s["_latencies"].append(job["finished_at"] - job["created_at"])
+        for s in out.values():
+            latencies = s.pop("_latencies")
+            if latencies:
+                s["avg_latency_seconds"] = sum(latencies) / len(latencies)
+        return sorted(out.values(), key=lambda s: s["processor"])
+
+class VideoJobRunner:
+    """
+    Leases jobs for the registered processors and runs them in a process pool.
+    At most `concurrency` jobs run at once, optionally fewer per processor via
+    `limits`. A heartbeat thread renews leases while jobs run; results are
+    written back by the runner (not the pool), and failures are retried with
+    backoff by the store.
+    """
+
+    def __init__(
+        self,
+        store,
+        processors: Optional[Dict[str, Processor]] = None,
+        concurrency: int = 2,
+        limits: Optional[Dict[str, int]] = None,
+        lease_seconds: int = 60,
+        heartbeat_interval: float = 20.0,
+        poll_interval: float = 2.0,
+        executor: Optional[Executor] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.store = store
+        self.processors = dict(processors if processors is not None else PROCESSORS)
+        self.concurrency = concurrency
+        self.limits = limits or {}
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._inflight: Dict[Future, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._counters = {"completed": 0, "failed": 0, "dead": 0, "lost_leases": 0}
+        self._run_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.concurrency)
+        return self._executor
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name="video-jobs", daemon=True),
+            threading.Thread(target=self._heartbeat_loop, name="video-jobs-heartbeat", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming, let running jobs finish (up to timeout) and record their outcome."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self.drain(timeout)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once(wait_timeout=self.poll_interval)
+            except Exception as e:
+                logger.error(f"Video job poll failed: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            self.heartbeat()
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            ids = [job["id"] for job in self._inflight.values()]
+        if not ids:
+            return
+        try:
+            owned = set(self.store.heartbeat(self.worker_id, ids, self.lease_seconds))
+        except Exception as e:
+            logger.warning(f"Video job heartbeat failed: {e}")
+            return
+        lost = [i for i in ids if i not in owned]
+        if lost:
+            self._counters["lost_leases"] += len(lost)
+            logger.warning(f"Lost leases on video jobs {lost}; another worker may rerun them")
+
+    def _capacity(self) -> Dict[str, int]:
+        with self._lock:
+            running: Dict[str, int] = {}
+            for job in self._inflight.values():
+                running[job["processor"]] = running.get(job["processor"], 0) + 1
+            free = self.concurrency - len(self._inflight)
+        capacity = {}
+        for name in self.processors:
+            limit = self.limits.get(name, self.concurrency)
+            capacity[name] = max(0, min(free, limit - running.get(name, 0)))
+        return capacity
+
+    def claim_and_submit(self) -> int:
+        submitted = 0
+        for name, slots in self._capacity().items():
+            free = self.concurrency - len(self._inflight)
+            slots = min(slots, free)
+            if slots <= 0:
+                continue
+            for job in self.store.claim(self.worker_id, [name], slots, self.lease_seconds):
+                future = self.executor.submit(self.processors[name], job)
+                job["_submitted"] = time.monotonic()
+                with self._lock:
+                    self._inflight[future] = job
+                submitted += 1
+        return submitted
+
+    def run_once(self, wait_timeout: float = 0.0) -> int:
+        """Claim up to free capacity, then wait (bounded) for running jobs and record results."""
+        self.claim_and_submit()
+        with self._lock:
+            futures = list(self._inflight)
+        if not futures:
+            if wait_timeout:
+                self._stop.wait(wait_timeout)
+            return 0
+        done, _ = wait(futures, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            self._finish(future)
+        return len(done)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            futures = list(self._inflight)
+        done, _ = wait(futures, timeout=timeout)
+        for future in done:
+            self._finish(future)
+
+    def _finish(self, future: Future) -> None:
+        with self._lock:
+            job = self._inflight.pop(future, None)
+        if job is None:
+            return
+        self._run_total += time.monotonic() - job.pop("_submitted")
+        try:
+            result = future.result()
+        except Exception as e:
+            status = self.store.fail(job, self.worker_id, f"{type(e).__name__}: {e}")
+            self._counters["dead" if status == "dead" else "failed"] += 1
+            logger.warning(f"Video job {job['id']} ({job['processor']}) failed: {e}")
+            return
+        try:
+            self.store.complete(job, self.worker_id, result or {})
+            self._counters["completed"] += 1
+        except Exception as e:
+            status = self.store.fail(job, self.worker_id, f"result write failed: {e}")
+            self._counters["dead" if status == "dead" else "failed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            inflight = len(self._inflight)
+        finished = self._counters["completed"] + self._counters["failed"] + self._counters["dead"]
+        return {
+            "worker_id": self.worker_id,
+            "processors": sorted(self.processors),
+            "concurrency": self.concurrency,
+            "inflight": inflight,
+            **self._counters,
+            "avg_run_seconds": round(self._run_total / finished, 3) if finished else None,
+            "queue": self.store.stats(),
+        }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run video post-processing workers")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("VIDEO_JOB_CONCURRENCY", "2")))
+    parser.add_argument("--limit", action="append", default=[], metavar="PROCESSOR=N",
+                        help="Per-processor concurrency limit, e.g. --limit transcript=1")
+    parser.add_argument("--stub", action="store_true", help="Register the stub processors")
+    parser.add_argument("--stats-interval", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.stub:
+        register_stub_processors()
+    if not PROCESSORS:
+        parser.error("No processors registered (use --stub for local runs)")
+    limits = {k: int(v) for k, v in (item.split("=", 1) for item in args.limit)}
+    runner = VideoJobRunner(VideoJobStore(get_client()), concurrency=args.concurrency, limits=limits)
+    runner.start()
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            logger.info(json.dumps(runner.stats(), default=str))
+    except KeyboardInterrupt:
+        runner.stop()
+
+if __name__ == "__main__":
+    # e.g. python -m services.video_jobs --stub --concurrency 4 --limit transcript=1
+    main()
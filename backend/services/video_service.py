@@ -1,12 +1,37 @@
 import uuid
 from datetime import datetime
 from supabase import Client
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from utils_others.file_upload import create_signed_urls, storage_path_from_url
+from utils_others.ttl_cache import TTLCache
+from services.candidate_summary import CandidateSummaryService
+
+SIGNED_URL_TTL = 3600
+# Cached URLs are dropped once 20% of their lifetime is left, so clients never get one about to expire
+SIGNED_URL_CACHE_FRACTION = 0.8
+# A player issues many Range requests per video; remember access decisions briefly
+STREAM_ACCESS_TTL = 300
+
+def media_columns(media: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map probe_video() output onto the video table columns (duration is whole seconds)."""
+    if not media:
+        return {}
+    duration = media.get("duration")
+    return {
+        "duration": int(round(duration)) if duration is not None else None,
+        "width": media.get("width"),
+        "height": media.get("height"),
+        "codec": media.get("codec"),
+        "container": media.get("container"),
+    }
 
 class VideoService:
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, url_cache: Optional[TTLCache] = None):
         self.supabase = supabase_client
         self.bucket_name = "videos"
+        self.url_cache = url_cache or TTLCache(max_size=20000, ttl=SIGNED_URL_TTL * SIGNED_URL_CACHE_FRACTION)
+        self.summaries = CandidateSummaryService(supabase_client)
+        self.access_cache = TTLCache(max_size=20000, ttl=STREAM_ACCESS_TTL)
 
     def upload_video_to_storage(self, file_content: bytes, filename: str, candidate_id: str) -> str:
         try:
@@ -28,8 +53,76 @@ class VideoService:
         except Exception as e:
             raise Exception(f"Failed to create signed URL: {str(e)}")
 
+    def sign_video_paths(self, paths: List[str], expires_in: int = SIGNED_URL_TTL) -> Dict[str, str]:
+        """Signed URLs for many objects: cache hits first, then one storage batch call for the rest."""
+        out: Dict[str, str] = {}
+        missing: List[str] = []
+        for path in dict.fromkeys(paths):
+            cached = self.url_cache.get((path, expires_in))
+            if cached:
+                out[path] = cached
+            else:
+                missing.append(path)
+        if missing:
+            signed = create_signed_urls(self.supabase, self.bucket_name, missing, expires_in)
+            for path, url in signed.items():
+                self.url_cache.set((path, expires_in), url, ttl=expires_in * SIGNED_URL_CACHE_FRACTION)
+            out.update(signed)
+        return out
+
+    def recruiter_application_ids(self, recruiter_id: str, application_ids: List[str]) -> List[str]:
+        """The subset of application_ids that belong to jobs created by the recruiter."""
+        apps = (
+            self.supabase.table("job_applications")
+            .select("id,job_id")
+            .in_("id", application_ids)
+            .execute()
+        )
+        err = getattr(apps, "error", None)
+        if err:
+            raise Exception(err)
+        job_ids = list({a["job_id"] for a in apps.data or [] if a.get("job_id")})
+        if not job_ids:
+            return []
+        jobs = (
+            self.supabase.table("jobs")
+            .select("id")
+            .in_("id", job_ids)
+            .eq("created_by", recruiter_id)
+            .execute()
+        )
+        err = getattr(jobs, "error", None)
+        if err:
+            raise Exception(err)
+        owned = {j["id"] for j in jobs.data or []}
+        return [a["id"] for a in apps.data or [] if a.get("job_id") in owned]
+
+    def get_signed_responses(self, application_ids: List[str], expires_in: int = SIGNED_URL_TTL) -> Dict[str, List[Dict[str, Any]]]:
+        """Video responses for several applications with a signed_url attached to each, in one query and one signing call."""
+        try:
+            grouped: Dict[str, List[Dict[str, Any]]] = {app_id: [] for app_id in application_ids}
+            if not application_ids:
+                return grouped
+            res = (
+                self.supabase.table("video_responses")
+                .select("*")
+                .in_("application_id", application_ids)
+                .order("recorded_at")
+                .execute()
+            )
+            err = getattr(res, "error", None)
+            if err:
+                raise Exception(err)
+            rows = self.attach_signed_urls(res.data or [], expires_in)
+            for row in rows:
+                grouped.setdefault(row["application_id"], []).append(row)
+            return grouped
+        except Exception as e:
+            raise Exception(f"Failed to fetch signed video responses: {str(e)}")
+
     def save_video_response(self, application_id: str, question_id: str, video_url: str,
-                            transcript: Optional[str] = None, duration: Optional[int] = None, status: str = "completed") -> Dict[str, Any]:
+                            transcript: Optional[str] = None, duration: Optional[int] = None, status: str = "completed",
+                            media: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         try:
             payload = {
                 "application_id": application_id,
@@ -38,8 +131,11 @@ class VideoService:
                 "transcript": transcript,
                 "duration": duration,
                 "status": status,
-                "recorded_at": datetime.utcnow().isoformat()
+                "recorded_at": datetime.utcnow().isoformat(),
+                **media_columns(media),
             }
+            if duration is not None:
+                payload["duration"] = duration
             res = self.supabase.table("video_responses").insert(payload).execute()
             err = getattr(res, "error", None)
             if err:
@@ -51,7 +147,8 @@ class VideoService:
         except Exception as e:
             raise Exception(f"Failed to save video response: {str(e)}")
 
-    def save_general_video(self, candidate_id: str, video_url: str, status: str = "completed", ai_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def save_general_video(self, candidate_id: str, video_url: str, status: str = "completed", ai_analysis: Optional[Dict[str, Any]] = None,
+                           media: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         try:
             payload = {
                 "candidate_id": candidate_id,
@@ -59,12 +156,14 @@ class VideoService:
                 "status": status,
                 "created_at": datetime.utcnow().isoformat(),
                 "is_general": True,
-                "ai_analysis": ai_analysis or {}
+                "ai_analysis": ai_analysis or {},
+                **media_columns(media),
             }
             res = self.supabase.table("general_video_interviews").upsert(payload, on_conflict="candidate_id").execute()
             err = getattr(res, "error", None)
             if err:
                 raise Exception(err)
+            self.summaries.refresh(candidate_id)
             data = getattr(res, "data", None)
             if not data:
                 return {}
@@ -82,12 +181,64 @@ class VideoService:
         except Exception as e:
             raise Exception(f"Failed to fetch video responses: {str(e)}")
 
-    def get_candidate_videos(self, candidate_id: str) -> Dict[str, Any]:
+    def get_candidates_videos(self, candidate_ids: List[str], recruiter_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Every video response and the general video for several candidates, in
+        one query (joined through job_applications by the candidate_videos RPC).
+        With recruiter_id, only applications to that recruiter's jobs are included.
+        """
         try:
-            res = self.supabase.table("video_responses").select("*").eq("candidate_id", candidate_id).execute()
+            candidate_ids = list(dict.fromkeys(candidate_ids))
+            grouped: Dict[str, Dict[str, Any]] = {
+                cid: {"videos": [], "general_video": None} for cid in candidate_ids
+            }
+            if not candidate_ids:
+                return grouped
+            res = self.supabase.rpc("candidate_videos", {
+                "p_candidate_ids": candidate_ids,
+                "p_recruiter_id": recruiter_id,
+            }).execute()
             err = getattr(res, "error", None)
             if err:
                 raise Exception(err)
-            return {"videos": res.data}
+            for row in res.data or []:
+                grouped[row["candidate_id"]] = {
+                    "videos": row.get("videos") or [],
+                    "general_video": row.get("general_video"),
+                }
+            return grouped
         except Exception as e:
             raise Exception(f"Failed to fetch candidate videos: {str(e)}")
+
+    def get_candidate_videos(self, candidate_id: str, recruiter_id: Optional[str] = None) -> Dict[str, Any]:
+        return self.get_candidates_videos([candidate_id], recruiter_id)[candidate_id]
+
+    def recruiter_can_view_path(self, recruiter_id: str, path: str) -> bool:
+        """
+        Whether a stored object is a video response or general video of a
+        candidate who applied to one of the recruiter's jobs. Uploads live
+        under {candidate_id}/, so one candidate_videos lookup settles it.
+        """
+        key = (recruiter_id, path)
+        cached = self.access_cache.get(key)
+        if cached is not None:
+            return cached
+        candidate_id, sep, _ = path.partition("/")
+        allowed = False
+        if candidate_id and sep:
+            found = self.get_candidate_videos(candidate_id, recruiter_id)
+            rows = found["videos"] + ([found["general_video"]] if found["general_video"] else [])
+            allowed = any(
+                storage_path_from_url(row["video_url"], self.bucket_name) == path
+                for row in rows if row.get("video_url")
+            )
+        self.access_cache.set(key, allowed)
+        return allowed
+
+    def attach_signed_urls(self, rows: List[Dict[str, Any]], expires_in: int = SIGNED_URL_TTL) -> List[Dict[str, Any]]:
+        """Set signed_url on each row from its video_url, with one signing call for all of them."""
+        paths = [storage_path_from_url(row["video_url"], self.bucket_name) if row.get("video_url") else None for row in rows]
+        signed = self.sign_video_paths([p for p in paths if p], expires_in)
+        for row, path in zip(rows, paths):
+            row["signed_url"] = signed.get(path) if path else None
+        return rows
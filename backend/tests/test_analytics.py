@@ -0,0 +1,137 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import analytics
+from services.analytics_queue import AnalyticsQueue
+from test_utils import FakeSupabase
+
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    q = AnalyticsQueue(client=FakeSupabase(), max_size=50, batch_size=100)
+    monkeypatch.setattr(analytics, "_analytics_queue", q)
+    return q
+
+
+@pytest.fixture
+def client(fake_queue):
+    return TestClient(main.app)
+
+
+def test_parse_event_batch_accepts_array_object_and_ndjson():
+    events = [{"event_type": "job_view"}, {"event_type": "application_submit"}]
+    assert analytics.parse_event_batch(json.dumps(events).encode()) == events
+    assert analytics.parse_event_batch(json.dumps({"events": events}).encode()) == events
+    ndjson = "\n".join(json.dumps(e) for e in events) + "\n"
+    assert analytics.parse_event_batch(ndjson.encode()) == events
+
+
+def test_batch_endpoint_queues_beacon_payload(client, fake_queue):
+    body = "\n".join(json.dumps({"event_type": "job_view", "event_data": {"job_id": str(i)}}) for i in range(20))
+    r = client.post("/analytics/batch", content=body, headers={"Content-Type": "text/plain"})
+    assert r.status_code == 202
+    assert r.json()["queued"] == 20
+    fake_queue.stop()
+    client_db = fake_queue.supabase
+    assert len(client_db.tables["analytics_events"]) == 20
+    assert client_db.calls.count(("analytics_events", "insert")) == 1
+
+
+def test_batch_endpoint_rejects_invalid_events(client, fake_queue):
+    r = client.post("/analytics/batch", json=[{"event_type": "job_view"}, {"event_data": {}}])
+    assert r.status_code == 422
+    assert fake_queue.stats()["enqueued"] == 0
+
+
+def test_queue_stats_requires_recruiter(client, fake_queue):
+    assert client.get("/analytics/queue-stats").status_code == 401
+    # The stub token resolves to a candidate
+    assert client.get("/analytics/queue-stats", headers={"Authorization": "Bearer t"}).status_code == 403
+    main.app.dependency_overrides[analytics.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    try:
+        r = client.get("/analytics/queue-stats")
+        assert r.status_code == 200
+        assert r.json()["data"]["enqueued"] == 0
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_reporting_endpoints_require_recruiter(client):
+    for path, params in [
+        ("/analytics/rollups/series", {"event_type": "job_view"}),
+        ("/analytics/rollups/top", {"event_type": "job_view"}),
+        ("/analytics/unique", {"metric": "job_viewers", "job_id": "job-1"}),
+    ]:
+        assert client.get(path, params=params).status_code == 401
+        assert client.get(path, params=params, headers={"Authorization": "Bearer t"}).status_code == 403
+
+
+def test_unique_count_is_limited_to_own_jobs(client, monkeypatch):
+    from services.analytics_sketches import UniqueCountService
+    db = FakeSupabase({"jobs": [{"id": "job-1", "created_by": "rec-1"}, {"id": "job-2", "created_by": "rec-2"}]})
+    monkeypatch.setattr(analytics, "_supabase", db)
+    monkeypatch.setattr(analytics, "_unique_count_service", UniqueCountService(db))
+    main.app.dependency_overrides[analytics.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    try:
+        r = client.get("/analytics/unique", params={"metric": "job_viewers", "job_id": "job-1"})
+        assert r.status_code == 200
+        assert r.json()["data"]["estimate"] == 0
+        assert client.get("/analytics/unique", params={"metric": "job_viewers", "job_id": "job-2"}).status_code == 404
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_rollup_rows_aggregate_per_bucket_and_subject():
+    from services.analytics_service import build_rollup_rows
+    events = [
+        {"event_type": "job_view", "event_data": {"job_id": "j1"}, "created_at": "2026-03-01T10:05:00"},
+        {"event_type": "job_view", "event_data": {"job_id": "j1"}, "created_at": "2026-03-01T10:55:00"},
+        {"event_type": "job_view", "event_data": {"job_id": "j1"}, "created_at": "2026-03-01T11:10:00"},
+        {"event_type": "job_view", "event_data": None, "created_at": "2026-03-01T11:10:00"},
+    ]
+    rows = {(r["granularity"], r["bucket_start"], r["subject_id"]): r["event_count"] for r in build_rollup_rows(events)}
+    assert rows[("hour", "2026-03-01T10:00:00+00:00", "j1")] == 2
+    assert rows[("hour", "2026-03-01T11:00:00+00:00", "j1")] == 1
+    assert rows[("day", "2026-03-01T00:00:00+00:00", "j1")] == 3
+    assert rows[("day", "2026-03-01T00:00:00+00:00", "")] == 1
+
+
+def test_rollup_subject_matches_sql_rules():
+    from services.analytics_service import rollup_subject
+    # Same outcomes as COALESCE(NULLIF(event_data->>key, ''), ...) in analytics_event_subject
+    assert rollup_subject({"event_data": {"job_id": "", "application_id": "a1"}}) == "a1"
+    assert rollup_subject({"event_data": {"job_id": None, "related_id": "r1"}}) == "r1"
+    assert rollup_subject({"event_data": {"job_id": 0}}) == "0"
+    assert rollup_subject({"event_data": {"job_id": True}}) == "true"
+    assert rollup_subject({"event_data": {"job_id": ""}}) == ""
+    assert rollup_subject({"event_data": None}) == ""
+
+
+def test_keyset_cursor_round_trip():
+    from utils_others.pagination import decode_cursor, keyset_filter, split_page
+    rows = [{"created_at": f"2026-03-01T10:0{i}:00+00:00", "id": f"e{i}"} for i in range(3)]
+    page, cursor = split_page(rows, 2, ("created_at", "id"))
+    assert len(page) == 2
+    assert decode_cursor(cursor) == {"created_at": "2026-03-01T10:01:00+00:00", "id": "e1"}
+    assert split_page(rows, 3, ("created_at", "id"))[1] is None
+    expr = keyset_filter("created_at", "2026-03-01T10:01:00+00:00", "id", "e1")
+    assert expr == 'created_at.lt."2026-03-01T10:01:00+00:00",and(created_at.eq."2026-03-01T10:01:00+00:00",id.lt."e1")'
+
+
+@pytest.mark.parametrize("values", [{"id": "e1"}, {"created_at": None, "id": "e1"}, {"created_at": ["x"], "id": "e1"},
+                                    {"created_at": "2026-03-01T10:01:00+00:00", "id": True}])
+def test_cursor_missing_or_mistyped_keys_is_rejected(values):
+    from utils_others.pagination import decode_cursor, encode_cursor
+    # Valid base64 JSON objects, just not ones split_page would produce
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), ("created_at", "id"))
+
+
+def test_events_endpoint_rejects_malformed_cursor(monkeypatch):
+    from services.analytics_service import AnalyticsService
+    from utils_others.pagination import encode_cursor
+    monkeypatch.setattr(analytics, "_analytics_service", AnalyticsService(FakeSupabase({"analytics_events": []})))
+    r = TestClient(main.app).get("/analytics/user/u1", params={"cursor": encode_cursor({"id": "e1"})})
+    assert r.status_code == 400
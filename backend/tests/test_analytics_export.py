@@ -0,0 +1,147 @@
+import io
+import re
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import analytics
+from services.analytics_export import iter_event_pages, stream_events
+from test_utils import FakeResponse
+
+SINCE = datetime(2026, 3, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2026, 3, 2, tzinfo=timezone.utc)
+KEYSET = re.compile(r'^created_at\.gt\."(?P<at>[^"]+)",and\(created_at\.eq\."[^"]+",id\.gt\."(?P<id>[^"]+)"\)$')
+
+
+class CappedEventsQuery:
+    """analytics_events query that, like PostgREST, returns at most max_rows rows whatever the limit."""
+    def __init__(self, db):
+        self.db = db
+        self.filters = []
+        self._limit = None
+
+    def select(self, *columns, **kwargs):
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r[column] < value)
+        return self
+
+    def or_(self, expr):
+        m = KEYSET.match(expr)
+        assert m, expr
+        after = (m["at"], m["id"])
+        self.filters.append(lambda r: (r["created_at"], r["id"]) > after)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def execute(self):
+        self.db.limits.append(self._limit)
+        rows = sorted((r for r in self.db.rows if all(f(r) for f in self.filters)),
+                      key=lambda r: (r["created_at"], r["id"]))
+        return FakeResponse(rows[:min(self._limit, self.db.max_rows)])
+
+
+class CappedEventsClient:
+    def __init__(self, rows, max_rows=1000):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.limits = []
+
+    def table(self, name):
+        assert name == "analytics_events"
+        return CappedEventsQuery(self)
+
+
+def make_events(n):
+    return [
+        {
+            "id": f"e{i:05d}",
+            "user_id": f"u{i % 7}",
+            "event_type": "job_view",
+            "event_data": {"job_id": f"j{i % 3}"},
+            "ip_address": None,
+            "user_agent": "pytest",
+            # Several events per second so the id tie-breaker matters
+            "created_at": (SINCE + timedelta(seconds=i // 3)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def test_keyset_pages_continue_past_server_row_cap():
+    db = CappedEventsClient(make_events(2500), max_rows=1000)
+    pages = list(iter_event_pages(db, SINCE, UNTIL, page_size=5000))
+    assert [len(p) for p in pages] == [1000, 1000, 500]
+    ids = [r["id"] for p in pages for r in p]
+    assert ids == sorted(ids) and len(set(ids)) == 2500
+
+
+def test_arrow_round_trip_multiple_batches():
+    events = make_events(2500)
+    db = CappedEventsClient(events, max_rows=1000)
+    data = b"".join(stream_events(db, SINCE, UNTIL, fmt="arrow", batch_size=1000))
+    reader = pa.ipc.open_stream(io.BytesIO(data))
+    batches = list(reader)
+    assert [b.num_rows for b in batches] == [1000, 1000, 500]
+    table = pa.Table.from_batches(batches)
+    assert table.column("id").to_pylist() == [e["id"] for e in events]
+    assert table.column("event_data")[0].as_py() == '{"job_id":"j0"}'
+    assert table.column("created_at")[3].as_py() == SINCE + timedelta(seconds=1)
+
+
+def test_parquet_round_trip_row_group_per_page():
+    events = make_events(1200)
+    db = CappedEventsClient(events, max_rows=500)
+    data = b"".join(stream_events(db, SINCE, UNTIL, fmt="parquet", batch_size=1000))
+    f = pq.ParquetFile(io.BytesIO(data))
+    assert f.metadata.num_rows == 1200
+    assert f.metadata.num_row_groups == 3
+    table = f.read()
+    assert table.column("id").to_pylist() == [e["id"] for e in events]
+    assert table.column("user_agent").to_pylist() == ["pytest"] * 1200
+
+
+@pytest.fixture
+def as_recruiter():
+    main.app.dependency_overrides[analytics.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield
+    main.app.dependency_overrides.clear()
+
+
+def test_export_endpoint_streams_every_page(monkeypatch, as_recruiter):
+    db = CappedEventsClient(make_events(1500), max_rows=1000)
+    monkeypatch.setattr(analytics, "_supabase", db)
+    r = TestClient(main.app).get("/analytics/export", params={
+        "since": SINCE.isoformat(), "until": UNTIL.isoformat(), "format": "arrow",
+    })
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert 'filename="analytics_20260301T000000_20260302T000000.arrows"' in r.headers["content-disposition"]
+    assert pa.ipc.open_stream(io.BytesIO(r.content)).read_all().num_rows == 1500
+    assert db.limits == [1000, 1000, 1000]
+
+
+def test_export_requires_recruiter(monkeypatch):
+    db = CappedEventsClient(make_events(10))
+    monkeypatch.setattr(analytics, "_supabase", db)
+    http = TestClient(main.app)
+    params = {"since": SINCE.isoformat(), "until": UNTIL.isoformat()}
+    assert http.get("/analytics/export", params=params).status_code == 401
+    # The stub token resolves to a candidate
+    assert http.get("/analytics/export", params=params, headers={"Authorization": "Bearer t"}).status_code == 403
+    assert db.limits == []
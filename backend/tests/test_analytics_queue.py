@@ -0,0 +1,56 @@
+import time
+from services.analytics_queue import AnalyticsQueue
+from test_utils import FakeSupabase
+
+
+def make_queue(client, **kwargs):
+    opts = {"max_size": 100, "batch_size": 10, "flush_interval": 0.05, "retry_backoff": 0}
+    opts.update(kwargs)
+    return AnalyticsQueue(client=client, **opts)
+
+
+def test_events_are_written_in_batches():
+    client = FakeSupabase()
+    q = make_queue(client)
+    accepted = q.enqueue_many([{"event_type": "job_view", "n": i} for i in range(25)])
+    q.stop()
+    assert accepted == 25
+    assert len(client.tables["analytics_events"]) == 25
+    assert client.calls.count(("analytics_events", "insert")) == 3
+    assert q.stats()["flushed"] == 25
+
+
+def test_background_flusher_writes_after_interval():
+    client = FakeSupabase()
+    q = make_queue(client)
+    q.start()
+    q.enqueue({"event_type": "job_view"})
+    deadline = time.monotonic() + 2
+    while not client.tables.get("analytics_events") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    q.stop()
+    assert len(client.tables["analytics_events"]) == 1
+
+
+def test_full_queue_rejects_instead_of_blocking():
+    client = FakeSupabase()
+    q = make_queue(client, max_size=5)
+    accepted = q.enqueue_many([{"event_type": "job_view"} for _ in range(8)])
+    assert accepted == 5
+    assert q.stats()["rejected"] == 3
+    assert q.stats()["depth"] == 5
+    q.stop()
+    assert len(client.tables["analytics_events"]) == 5
+
+
+def test_failed_insert_is_retried_and_listeners_see_batch():
+    client = FakeSupabase()
+    client.fail_tables["analytics_events"] = 1
+    seen = []
+    q = make_queue(client)
+    q.add_listener(seen.extend)
+    q.enqueue({"event_type": "application_submit"})
+    q.stop()
+    assert len(client.tables["analytics_events"]) == 1
+    assert q.stats()["retries"] == 1
+    assert seen == [{"event_type": "application_submit"}]
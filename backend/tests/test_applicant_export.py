@@ -0,0 +1,166 @@
+import csv
+import io
+import tracemalloc
+import zipfile
+
+from fastapi.testclient import TestClient
+
+import main
+from routers import recruiter
+from services.applicant_export import EXPORT_COLUMNS, EXPORT_PAGE_SIZE, ApplicantExportService, ApplicantNotFound
+from test_utils import FakeSupabase
+
+ROWS = 100_000
+
+
+def install_large_job(client, rows=ROWS):
+    """
+    list_job_applicants for a job with `rows` applicants, generated per page
+    rather than held in the fake, so the test measures only the export's memory.
+    Row i is the i-th newest application. Like PostgREST, a call returns at
+    most 1000 rows whatever p_limit asks for.
+    """
+    def row(i):
+        return {
+            "application_id": f"app-{i:06d}",
+            "candidate_id": f"cand-{i:06d}",
+            "status": "submitted" if i % 3 else "under_review",
+            "ai_score": round((i % 100) / 100, 2),
+            "applied_at": f"2026-03-01T00:00:00.{999999 - i:06d}+00:00",
+            "full_name": f"Candidate {i}",
+            "location": "Pune" if i % 2 else "=HYPERLINK(\"http://x\")",
+            "title": "Data Engineer",
+            "experience_years": i % 15,
+            "top_skills": ["Python", "SQL"],
+            "skill_count": 2,
+            "has_video": i % 2 == 0,
+            "has_resume": True,
+        }
+
+    def list_applicants(params):
+        client.rpc_params.append(params)
+        if params["p_job_id"] != "job-big" or params["p_recruiter_id"] != "rec-1":
+            return []
+        start = int(params["p_after_id"].split("-")[1]) + 1 if params.get("p_after_id") else 0
+        return [row(i) for i in range(start, min(start + min(params["p_limit"], 1000), rows))]
+
+    client.rpc_params = []
+    client.rpc_handlers["list_job_applicants"] = list_applicants
+    return client
+
+
+def make_client(rows=ROWS):
+    return install_large_job(FakeSupabase({
+        "jobs": [{"id": "job-big", "created_by": "rec-1", "title": "Senior Data Engineer"}],
+    }), rows)
+
+
+def drain(chunks, sink):
+    """Consume an export into sink, returning (chunk count, largest chunk, tracemalloc peak)."""
+    tracemalloc.start()
+    try:
+        count = largest = 0
+        for chunk in chunks:
+            sink.write(chunk)
+            count += 1
+            largest = max(largest, len(chunk))
+        return count, largest, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_csv_export_streams_100k_rows_in_constant_memory(tmp_path):
+    client = make_client()
+    path = tmp_path / "applicants.csv"
+    with open(path, "wb") as out:
+        count, largest, peak = drain(ApplicantExportService(client).stream("job-big", "rec-1", fmt="csv"), out)
+
+    size = path.stat().st_size
+    pages = -(-ROWS // EXPORT_PAGE_SIZE)
+    assert count >= pages
+    # Memory stays around one page, far below the size of the whole file
+    assert largest < 512 * 1024
+    assert peak < 8 * 1024 * 1024 < size
+    assert client.calls.count(("list_job_applicants", "rpc")) == pages
+
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        assert tuple(next(reader)) == EXPORT_COLUMNS
+        total = 0
+        for i, line in enumerate(reader):
+            total += 1
+            if i in (0, 1, ROWS - 1):
+                record = dict(zip(EXPORT_COLUMNS, line))
+                assert record["application_id"] == f"app-{i:06d}"
+                assert record["top_skills"] == "Python, SQL"
+        assert total == ROWS
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = csv.DictReader(f)
+        first = next(rows)
+        # Formula-looking values are neutralised
+        assert first["location"].startswith("'=")
+
+
+def test_xlsx_export_streams_100k_rows_in_constant_memory(tmp_path):
+    client = make_client()
+    path = tmp_path / "applicants.xlsx"
+    with open(path, "wb") as out:
+        count, largest, peak = drain(ApplicantExportService(client).stream("job-big", "rec-1", fmt="xlsx"), out)
+
+    assert count > 1
+    assert peak < 8 * 1024 * 1024
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert {"[Content_Types].xml", "xl/workbook.xml", "xl/worksheets/sheet1.xml"} <= set(zf.namelist())
+        rows = 0
+        tail = b""
+        with zf.open("xl/worksheets/sheet1.xml") as sheet:
+            head = sheet.read(4096)
+            assert b"<c t=\"inlineStr\"><is><t xml:space=\"preserve\">application_id</t></is></c>" in head
+            assert b'<c t="b"><v>1</v></c>' in head
+            data = head
+            while data:
+                chunk = tail + data
+                rows += chunk.count(b"<row>")
+                tail = chunk[-4:]
+                rows -= tail.count(b"<row>")
+                data = sheet.read(1 << 20)
+            rows += tail.count(b"<row>")
+    assert rows == ROWS + 1
+
+
+def test_export_rejects_other_recruiters_job():
+    client = make_client(rows=10)
+    svc = ApplicantExportService(client)
+    try:
+        svc.job_for_recruiter("job-big", "rec-2")
+    except ApplicantNotFound:
+        pass
+    else:
+        raise AssertionError("expected ApplicantNotFound")
+
+
+def test_export_endpoint():
+    client = make_client(rows=2500)
+    recruiter._export_service = ApplicantExportService(client)
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    try:
+        http = TestClient(main.app)
+        res = http.get("/recruiter/job/job-big/applicants/export?format=csv&status=submitted")
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/csv")
+        assert 'filename="applicants_senior-data-engineer.csv"' in res.headers["content-disposition"]
+        lines = list(csv.reader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert len(lines) == 2501
+        assert client.rpc_params[0]["p_status"] == "submitted"
+
+        res = http.get("/recruiter/job/job-big/applicants/export?format=xlsx")
+        assert res.status_code == 200
+        assert zipfile.ZipFile(io.BytesIO(res.content)).read("xl/worksheets/sheet1.xml").count(b"<row>") == 2501
+
+        assert http.get("/recruiter/job/job-big/applicants/export?format=pdf").status_code == 422
+        main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-2", "role": "recruiter"}
+        assert http.get("/recruiter/job/job-big/applicants/export").status_code == 404
+    finally:
+        main.app.dependency_overrides.clear()
+        recruiter._export_service = None
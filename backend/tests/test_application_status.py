@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import recruiter
+from services.application_status_service import ApplicationStatusService, allowed_sources
+from models.applicant_models import ApplicationStatus
+from test_utils import FakeSupabase
+
+
+def install_bulk_rpc(client):
+    """Python model of bulk_update_application_status."""
+    def handler(params):
+        owned = {j["id"] for j in client.tables["jobs"] if j["created_by"] == params["p_recruiter_id"]}
+        out = []
+        for app in client.tables["job_applications"]:
+            if app["id"] not in params["p_application_ids"] or app["job_id"] not in owned:
+                continue
+            from_status = app["status"]
+            changed = from_status in params["p_allowed_from"]
+            if changed:
+                app["status"] = params["p_to_status"]
+            out.append({"application_id": app["id"], "candidate_id": app["candidate_id"], "job_id": app["job_id"],
+                        "from_status": from_status, "updated": changed})
+        return out
+    client.rpc_handlers["bulk_update_application_status"] = handler
+    return client
+
+
+def make_client(n=300):
+    apps = [{"id": f"app-{i}", "job_id": "job-1", "candidate_id": f"cand-{i}", "status": "submitted"} for i in range(n)]
+    apps += [
+        {"id": "hired-1", "job_id": "job-1", "candidate_id": "cand-h", "status": "hired"},
+        {"id": "rejected-1", "job_id": "job-1", "candidate_id": "cand-r", "status": "rejected"},
+        {"id": "other-1", "job_id": "job-2", "candidate_id": "cand-o", "status": "submitted"},
+    ]
+    return install_bulk_rpc(FakeSupabase({
+        "jobs": [{"id": "job-1", "created_by": "rec-1", "title": "Backend Engineer"},
+                 {"id": "job-2", "created_by": "rec-2", "title": "Designer"}],
+        "job_applications": apps,
+        "users": [{"id": f"cand-{i}", "email": f"c{i}@example.com", "full_name": f"Candidate {i}"} for i in range(n)],
+        "notifications": [],
+        "notification_fanouts": [],
+        "email_outbox": [],
+    }))
+
+
+def test_transition_sources():
+    assert allowed_sources(ApplicationStatus.hired) == ["interview_scheduled"]
+    assert "hired" not in allowed_sources(ApplicationStatus.rejected)
+
+
+def test_bulk_reject_reports_per_row_outcomes_in_one_call():
+    client = make_client()
+    ids = [f"app-{i}" for i in range(300)] + ["hired-1", "rejected-1", "other-1", "missing", "app-0"]
+    result = ApplicationStatusService(client).bulk_update("rec-1", ids, ApplicationStatus.rejected)
+
+    assert result["summary"] == {"updated": 300, "unchanged": 1, "invalid_transition": 1, "not_found": 2}
+    outcomes = {r["application_id"]: r["outcome"] for r in result["results"]}
+    assert outcomes["hired-1"] == "invalid_transition"
+    assert outcomes["rejected-1"] == "unchanged"
+    assert outcomes["other-1"] == "not_found"
+    assert len(result["results"]) == 304
+    assert client.calls == [("bulk_update_application_status", "rpc")]
+    statuses = {a["id"]: a["status"] for a in client.tables["job_applications"]}
+    assert statuses["other-1"] == "submitted" and statuses["hired-1"] == "hired"
+
+
+def test_notifications_and_emails_for_changed_rows_only():
+    client = make_client(n=5)
+    svc = ApplicationStatusService(client)
+    result = svc.bulk_update("rec-1", ["app-0", "app-1", "hired-1"], ApplicationStatus.interview_scheduled)
+
+    keys = svc.notify("rec-1", result["updated"], ApplicationStatus.interview_scheduled)
+    svc.notify("rec-1", result["updated"], ApplicationStatus.interview_scheduled)  # retried request
+    assert len(keys) == 1
+    assert sorted(n["user_id"] for n in client.tables["notifications"]) == ["cand-0", "cand-1"]
+
+    assert svc.email(result["updated"], ApplicationStatus.interview_scheduled, message="We'll be in touch.") == 2
+    outbox = client.tables["email_outbox"]
+    assert sorted(m["to_addrs"][0] for m in outbox) == ["c0@example.com", "c1@example.com"]
+    assert "Backend Engineer" in outbox[0]["html"] and "Interview scheduled" in outbox[0]["html"]
+    assert client.calls.count(("email_outbox", "insert")) == 1
+
+
+@pytest.fixture
+def status_client(monkeypatch):
+    client = make_client(n=3)
+    monkeypatch.setattr(recruiter, "_status_service", ApplicationStatusService(client))
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield TestClient(main.app), client
+    main.app.dependency_overrides.pop(recruiter.require_recruiter, None)
+
+
+def test_bulk_status_endpoint(status_client):
+    http, client = status_client
+    res = http.post("/recruiter/applications/status", json={
+        "application_ids": ["app-0", "app-1", "other-1"], "status": "under_review", "notify": True, "send_email": True,
+    })
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert data["summary"]["updated"] == 2 and data["summary"]["not_found"] == 1
+    assert data["notifications_queued"] == 2 and data["emails_queued"] == 2
+    # Background tasks have run by the time TestClient returns
+    assert len(client.tables["notifications"]) == 2
+    assert len(client.tables["email_outbox"]) == 2
+
+    bad = http.post("/recruiter/applications/status", json={"application_ids": ["app-2"], "status": "promoted"})
+    assert bad.status_code == 422
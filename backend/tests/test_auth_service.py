@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from services.auth_service import AuthService
+from test_utils import FakeSupabase
+
+
+def register(service, **overrides):
+    kwargs = {
+        "full_name": "Ann Lee",
+        "email": "ann@example.com",
+        "mobile": "555",
+        "location": "Pune",
+        "role": "candidate",
+    }
+    kwargs.update(overrides)
+    return asyncio.run(service.register(**kwargs))
+
+
+def test_candidate_registration_uploads_resume_and_queues_email():
+    client = FakeSupabase()
+    result = register(AuthService(client), resume_bytes=b"%PDF", resume_filename="my cv.pdf")
+
+    assert result["user_id"] in client.auth.users
+    assert result["resume_path"].endswith("-my_cv.pdf")
+    assert ("resumes", result["resume_path"]) in client.storage.objects
+    [email] = client.tables["email_outbox"]
+    assert email["to_addrs"] == ["ann@example.com"] and email["status"] == "pending"
+    assert result["email_sent"] is True
+    assert {"sign_up", "resume_upload", "email", "parallel_steps"} <= set(result["timings_ms"])
+
+
+def test_recruiter_registration_creates_company():
+    client = FakeSupabase()
+    result = register(AuthService(client), role="recruiter", company_name="Acme Widgets")
+
+    assert result["company_id"] == "ACMEWIDG"
+    assert client.tables["companies"][0]["created_by"] == result["user_id"]
+    assert client.auth.users[result["user_id"]]["user_metadata"]["company_id"] == "ACMEWIDG"
+    assert "ACMEWIDG" in client.tables["email_outbox"][0]["html"]
+
+
+def test_company_failure_rolls_back_resume_and_user():
+    client = FakeSupabase()
+    client.fail_tables["companies"] = 1
+    with pytest.raises(RuntimeError, match="company"):
+        register(AuthService(client), role="recruiter", company_name="Acme Widgets",
+                 resume_bytes=b"%PDF", resume_filename="cv.pdf")
+
+    assert client.auth.users == {}
+    assert client.tables.get("companies", []) == []
+    assert client.storage.objects == {}
+    # The welcome email is only queued once every step succeeded
+    assert client.tables.get("email_outbox", []) == []
+
+
+def test_failed_resume_upload_is_not_fatal():
+    client = FakeSupabase()
+    client.storage.fail_uploads = 1
+    result = register(AuthService(client), resume_bytes=b"%PDF", resume_filename="cv.pdf")
+
+    assert result["resume_path"] is None
+    assert result["user_id"] in client.auth.users
+    assert client.tables["email_outbox"][0]["status"] == "pending"
+
+
+class UniqueCompanies(FakeSupabase):
+    """Rejects a companies insert whose id is taken, like the primary key does."""
+    def table(self, name):
+        query = super().table(name)
+        if name != "companies":
+            return query
+        execute = query.execute
+
+        def checked():
+            if query.op == "insert" and any(c["id"] == query.payload["id"] for c in self.tables.get("companies", [])):
+                raise Exception('duplicate key value violates unique constraint "companies_pkey"')
+            return execute()
+        query.execute = checked
+        return query
+
+
+def test_company_id_collision_retries_with_a_new_id():
+    client = UniqueCompanies()
+    service = AuthService(client)
+    first = register(service, role="recruiter", company_name="Acme Widgets")
+    second = register(service, email="bo@example.com", role="recruiter", company_name="Acme Widgets Ltd")
+
+    assert first["company_id"] == "ACMEWIDG"
+    assert second["company_id"].startswith("ACMEW") and second["company_id"] != "ACMEWIDG"
+    assert len(second["company_id"]) == 8
+    assert second["user_id"] in client.auth.users
+    assert second["company_id"] in client.tables["email_outbox"][1]["html"]
+
+
+def test_duplicate_email_is_rejected():
+    service = AuthService(FakeSupabase())
+    register(service)
+    with pytest.raises(ValueError, match="already registered"):
+        register(service)
+
+
+@pytest.fixture
+def password_client(monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    from routers import auth
+
+    client = FakeSupabase({
+        "recruiter_profiles": [{"user_id": "rec-1", "company_id": "ACMEWIDG"}],
+        "companies": [{"id": "ACMEWIDG", "name": "Acme Widgets"}],
+    })
+    service = AuthService(client)
+    users = {
+        "rec-token": {"id": "rec-1", "email": "rec@example.com", "user_metadata": {"role": "recruiter", "full_name": "Rae"}},
+        "cand-token": {"id": "cand-1", "email": "cand@example.com", "user_metadata": {"role": "candidate"}},
+    }
+
+    def validate_token(token):
+        if token not in users:
+            raise Exception("401 Unauthorized")
+        return {"user": users[token]}
+
+    monkeypatch.setattr(service, "validate_token", validate_token)
+    monkeypatch.setattr(auth, "_auth_service", service)
+    return TestClient(main.app), client
+
+
+def test_password_updated_queues_recruiter_emails(password_client):
+    http, client = password_client
+    res = http.post("/auth/password-updated", headers={"Authorization": "Bearer rec-token"})
+
+    assert res.status_code == 200
+    assert res.json()["data"]["user"]["id"] == "rec-1"
+    subjects = sorted(row["subject"] for row in client.tables["email_outbox"])
+    assert subjects == ["Skreenit Password Updated", "Your Skreenit Company ID"]
+    company_email = next(r for r in client.tables["email_outbox"] if r["subject"] == "Your Skreenit Company ID")
+    assert "ACMEWIDG" in company_email["html"] and "Acme Widgets" in company_email["html"]
+
+
+def test_password_updated_candidate_gets_one_email(password_client):
+    http, client = password_client
+    res = http.post("/auth/password-updated", headers={"Authorization": "Bearer cand-token"})
+
+    assert res.status_code == 200
+    assert [r["to_addrs"] for r in client.tables["email_outbox"]] == [["cand@example.com"]]
+
+
+def test_password_updated_rejects_bad_token(password_client):
+    http, client = password_client
+    assert http.post("/auth/password-updated").status_code == 401
+    assert http.post("/auth/password-updated", headers={"Authorization": "Bearer nope"}).status_code == 401
+    assert "email_outbox" not in client.tables
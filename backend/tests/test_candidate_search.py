@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import recruiter
+from services.candidate_search import CandidateSearchService
+from test_utils import FakeSupabase
+
+ROWS = [
+    {"candidate_id": f"c{i:02d}", "title": "Backend Engineer", "score": round(1 - i * 0.1, 2)}
+    for i in range(5)
+]
+
+
+def make_client():
+    client = FakeSupabase()
+    client.params = []
+
+    def search(params):
+        client.params.append(params)
+        rows = ROWS
+        if params["p_after_score"] is not None:
+            anchor = (params["p_after_score"], params["p_after_id"])
+            rows = [r for r in rows if (r["score"], r["candidate_id"]) < anchor]
+        return rows[:params["p_limit"]]
+
+    client.rpc_handlers["search_candidates"] = search
+    return client
+
+
+def test_search_maps_filters_and_pages_by_score():
+    client = make_client()
+    svc = CandidateSearchService(client)
+
+    first = svc.search(query="  backend ", all_skills=["Python", " python", ""], any_skills=["reactjs", "Vue"],
+                       exclude_skills=["PHP"], min_experience=2, max_experience=6, location="Pune", limit=3)
+    params = client.params[0]
+    assert params["p_query"] == "backend"
+    assert params["p_all_skills"] == ["Python"]
+    assert params["p_any_skills"] == ["React", "Vue.js"]
+    assert params["p_exclude_skills"] == ["PHP"]
+    assert (params["p_min_experience"], params["p_max_experience"], params["p_limit"]) == (2, 6, 4)
+    assert [r["candidate_id"] for r in first["candidates"]] == ["c00", "c01", "c02"]
+
+    second = svc.search(query="backend", limit=3, cursor=first["next_cursor"])
+    assert client.params[1]["p_after_score"] == 0.8
+    assert client.params[1]["p_after_id"] == "c02"
+    assert [r["candidate_id"] for r in second["candidates"]] == ["c03", "c04"]
+    assert second["next_cursor"] is None
+
+
+def test_search_rejects_inverted_experience_range():
+    with pytest.raises(ValueError):
+        CandidateSearchService(make_client()).search(min_experience=8, max_experience=3)
+
+
+@pytest.fixture
+def search_client(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(recruiter, "_search_service", CandidateSearchService(client))
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield TestClient(main.app), client
+    main.app.dependency_overrides.pop(recruiter.require_recruiter, None)
+
+
+def test_search_endpoint(search_client):
+    http, client = search_client
+    res = http.get("/recruiter/candidates/search", params=[
+        ("q", "backend"), ("skill", "Python"), ("skill", "SQL"), ("exclude_skill", "PHP"), ("limit", "2"),
+    ])
+    assert res.status_code == 200
+    assert len(res.json()["data"]) == 2
+    assert res.json()["next_cursor"]
+    assert client.params[0]["p_all_skills"] == ["Python", "SQL"]
+
+    bad = http.get("/recruiter/candidates/search", params={"min_experience": 9, "max_experience": 2})
+    assert bad.status_code == 400
@@ -0,0 +1,138 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import recruiter
+from services.applicant_service import ApplicantService
+from services.candidate_summary import CandidateSummaryService
+from services.video_service import VideoService
+from test_utils import FakeSupabase
+
+
+def install_summary_rpcs(client):
+    """Python models of refresh_candidate_summary and list_job_applicants."""
+    def refresh(params):
+        cid = params["p_candidate_id"]
+        t = client.tables
+        user = next((u for u in t.get("users", []) if u["id"] == cid), {})
+        profile = next((p for p in t.get("candidate_profiles", []) if p["id"] == cid), {})
+        skills = sorted((s for s in t.get("candidate_skills", []) if s["candidate_id"] == cid),
+                        key=lambda s: (-(s.get("years_experience") or 0), s["skill_name"]))
+        video = next((g for g in t.get("general_video_interviews", []) if g["candidate_id"] == cid), {})
+        row = {
+            "candidate_id": cid,
+            "full_name": user.get("full_name"),
+            "title": profile.get("title"),
+            "experience_years": profile.get("experience_years"),
+            "top_skills": [s["skill_name"] for s in skills][:5],
+            "skill_count": len(skills),
+            "has_video": bool(video.get("video_url")),
+            "has_resume": bool(profile.get("resume_url")),
+        }
+        summaries = t.setdefault("candidate_summaries", [])
+        summaries[:] = [s for s in summaries if s["candidate_id"] != cid] + [row]
+        return row
+
+    def list_applicants(params):
+        t = client.tables
+        if not any(j["id"] == params["p_job_id"] and j["created_by"] == params["p_recruiter_id"] for j in t["jobs"]):
+            return []
+        summaries = {s["candidate_id"]: s for s in t.get("candidate_summaries", [])}
+        apps = [a for a in t["job_applications"] if a["job_id"] == params["p_job_id"]
+                and params.get("p_status") in (None, a["status"])]
+        apps.sort(key=lambda a: (a["applied_at"], a["id"]), reverse=True)
+        if params.get("p_after_applied_at"):
+            anchor = (params["p_after_applied_at"], params["p_after_id"])
+            apps = [a for a in apps if (a["applied_at"], a["id"]) < anchor]
+        return [
+            {"application_id": a["id"], "candidate_id": a["candidate_id"], "status": a["status"],
+             "applied_at": a["applied_at"], **{k: v for k, v in summaries.get(a["candidate_id"], {}).items() if k != "candidate_id"}}
+            for a in apps[:params["p_limit"]]
+        ]
+
+    client.rpc_handlers["refresh_candidate_summary"] = refresh
+    client.rpc_handlers["list_job_applicants"] = list_applicants
+    return client
+
+
+def make_client():
+    return install_summary_rpcs(FakeSupabase({
+        "users": [{"id": "cand-1", "full_name": "Asha Rao"}],
+        "jobs": [{"id": "job-1", "created_by": "rec-1"}],
+        "job_applications": [
+            {"id": f"app-{i:02d}", "job_id": "job-1", "candidate_id": "cand-1" if i == 0 else f"cand-x{i}",
+             "status": "submitted" if i % 2 else "shortlisted", "applied_at": f"2026-03-{i + 1:02d}T00:00:00+00:00"}
+            for i in range(7)
+        ],
+    }))
+
+
+def summary(client, cid="cand-1"):
+    return next(s for s in client.tables["candidate_summaries"] if s["candidate_id"] == cid)
+
+
+def test_detailed_form_refreshes_summary():
+    client = make_client()
+    ApplicantService(client).save_detailed_form(
+        candidate_id="cand-1",
+        profile={"title": "Data Engineer", "experience_years": 6, "resume_url": "cand-1/cv.pdf"},
+        education=[],
+        experience=[],
+        skills=[{"name": "SQL", "years": 6}, {"name": "Python", "years": 4}, {"name": "Airflow", "years": 2}],
+    )
+
+    row = summary(client)
+    assert row["full_name"] == "Asha Rao"
+    assert row["title"] == "Data Engineer"
+    assert row["top_skills"] == ["SQL", "Python", "Airflow"]
+    assert row["has_resume"] is True
+    assert row["has_video"] is False
+    assert client.calls.count(("refresh_candidate_summary", "rpc")) == 1
+
+
+def test_general_video_refreshes_summary():
+    client = make_client()
+    VideoService(client).save_general_video("cand-1", "https://storage.test/videos/cand-1/g.webm")
+    assert summary(client)["has_video"] is True
+
+
+def test_refresh_failure_does_not_fail_the_save():
+    client = make_client()
+    del client.rpc_handlers["refresh_candidate_summary"]
+    ApplicantService(client).save_detailed_form(candidate_id="cand-1", profile={"title": "QA"})
+    assert client.tables["candidate_profiles"][0]["title"] == "QA"
+
+
+def test_applicant_pages_are_one_query_each():
+    client = make_client()
+    CandidateSummaryService(client).refresh("cand-1")
+    svc = CandidateSummaryService(client)
+    client.calls.clear()
+
+    first = svc.list_job_applicants("job-1", "rec-1", limit=3)
+    second = svc.list_job_applicants("job-1", "rec-1", limit=3, cursor=first["next_cursor"])
+    third = svc.list_job_applicants("job-1", "rec-1", limit=3, cursor=second["next_cursor"])
+
+    ids = [a["application_id"] for page in (first, second, third) for a in page["applicants"]]
+    assert ids == [f"app-{i:02d}" for i in range(6, -1, -1)]
+    assert third["next_cursor"] is None
+    assert third["applicants"][-1]["title"] is None and third["applicants"][-1]["full_name"] == "Asha Rao"
+    assert client.calls == [("list_job_applicants", "rpc")] * 3
+
+
+@pytest.fixture
+def applicants_client(monkeypatch):
+    monkeypatch.setattr(recruiter, "_summary_service", CandidateSummaryService(make_client()))
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield TestClient(main.app)
+    main.app.dependency_overrides.pop(recruiter.require_recruiter, None)
+
+
+def test_applicants_endpoint(applicants_client):
+    res = applicants_client.get("/recruiter/job/job-1/applicants", params={"limit": 2, "status": "shortlisted"})
+    assert res.status_code == 200
+    body = res.json()
+    assert [a["application_id"] for a in body["data"]] == ["app-06", "app-04"]
+    assert body["next_cursor"]
+
+    assert applicants_client.get("/recruiter/job/job-1/applicants", params={"cursor": "!!"}).status_code == 400
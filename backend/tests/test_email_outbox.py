@@ -0,0 +1,251 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from services.email_outbox import EmailOutbox, EmailOutboxWorker
+from test_utils import FakeQuery, FakeSupabase
+from utils_others.rate_limit import TokenBucket
+from utils_others.resend_email import ResendMailer
+
+
+class FakeResend:
+    """Minimal stand-in for the Resend HTTP API; fails the first `fail_first` sends."""
+
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.received = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.received.append((self.path, body))
+                if len(fake.received) <= fake.fail_first:
+                    status, payload = 500, {"statusCode": 500, "name": "internal_server_error", "message": "boom"}
+                elif isinstance(body, list):
+                    status, payload = 200, {"data": [{"id": f"email-{len(fake.received)}-{i}"} for i in range(len(body))]}
+                else:
+                    status, payload = 200, {"id": f"email-{len(fake.received)}"}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_resend():
+    servers = []
+
+    def start(fail_first: int = 0):
+        server = FakeResend(fail_first)
+        server.mailer = ResendMailer(api_key="re_test", base_url=server.url, rate_per_sender=1000, burst_per_sender=1000)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.mailer.close()
+        server.close()
+
+
+def make_outbox():
+    client = FakeSupabase()
+
+    def claim(params):
+        # Mirrors claim_email_outbox: dead-letter spent expired leases, then lease due and expired rows
+        now = datetime.now(timezone.utc)
+        claimed = []
+        for row in client.tables.get("email_outbox", []):
+            # Column defaults from create_email_outbox.sql
+            row.setdefault("attempts", 0)
+            row.setdefault("max_attempts", 8)
+            expired = row["status"] == "sending" and row["locked_until"] < now.isoformat()
+            if expired and row["attempts"] >= row["max_attempts"]:
+                row.update(status="dead", locked_by=None, locked_until=None, last_error="Lease expired on the final attempt")
+            elif expired or (row["status"] == "pending" and row["next_attempt_at"] <= now.isoformat()):
+                row["status"] = "sending"
+                row["attempts"] += 1
+                row["locked_by"] = params["p_worker"]
+                row["locked_until"] = (now + timedelta(seconds=params["p_lease_seconds"])).isoformat()
+                claimed.append(dict(row))
+            if len(claimed) >= params["p_limit"]:
+                break
+        return claimed
+
+    client.rpc_handlers["claim_email_outbox"] = claim
+    return client, EmailOutbox(client, retry_base_seconds=0)
+
+
+def test_worker_sends_queued_email(fake_resend):
+    server = fake_resend()
+    client, outbox = make_outbox()
+    outbox.enqueue("a@example.com", "Hello", "<p>hi</p>", email_type="welcome")
+
+    worker = EmailOutboxWorker(outbox, server.mailer, worker_id="w1")
+    assert worker.run_once() == 1
+
+    row = client.tables["email_outbox"][0]
+    assert row["status"] == "sent"
+    assert row["provider_id"] == "email-1-0"
+    assert server.received[0][0] == "/emails/batch"
+    assert server.received[0][1][0]["to"] == ["a@example.com"]
+    assert server.received[0][1][0]["from"] == row["from_addr"]
+    # Nothing left to claim
+    assert worker.run_once() == 0
+
+
+def test_failed_send_is_retried(fake_resend):
+    server = fake_resend(fail_first=1)
+    client, outbox = make_outbox()
+    outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    worker = EmailOutboxWorker(outbox, server.mailer, worker_id="w1")
+
+    worker.run_once()
+    row = client.tables["email_outbox"][0]
+    assert row["status"] == "pending"
+    assert row["attempts"] == 1
+    assert row["last_error"]
+
+    worker.run_once()
+    assert row["status"] == "sent"
+    assert worker.stats == {"sent": 1, "retried": 1, "dead": 0}
+
+
+def test_email_is_dead_lettered_after_max_attempts(fake_resend):
+    server = fake_resend(fail_first=100)
+    client, outbox = make_outbox()
+    outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    client.tables["email_outbox"][0]["max_attempts"] = 3
+    worker = EmailOutboxWorker(outbox, server.mailer, worker_id="w1")
+
+    for _ in range(5):
+        worker.run_once()
+    row = client.tables["email_outbox"][0]
+    assert row["status"] == "dead"
+    assert row["attempts"] == 3
+    assert worker.stats["dead"] == 1
+
+
+def test_repeatedly_expired_lease_is_dead_lettered():
+    client, outbox = make_outbox()
+    outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    row = client.tables["email_outbox"][0]
+    row["max_attempts"] = 3
+
+    # Each lease runs out without mark_sent/mark_failed, as when the send crashes the worker
+    for attempt in range(1, 4):
+        [leased] = outbox.claim("w1", lease_seconds=60)
+        assert leased["attempts"] == attempt
+        row["locked_until"] = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    assert outbox.claim("w1") == []
+    assert row["status"] == "dead"
+    assert row["attempts"] == 3
+
+
+def test_status_write_errors_are_surfaced(fake_resend, monkeypatch, caplog):
+    server = fake_resend()
+    client, outbox = make_outbox()
+    outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    outbox.enqueue("b@example.com", "Hello", "<p>hi</p>")
+    execute = FakeQuery.execute
+
+    def failing_updates(self):
+        res = execute(self)
+        if self.op == "update":
+            res.error = {"message": "permission denied"}
+        return res
+    monkeypatch.setattr(FakeQuery, "execute", failing_updates)
+
+    with pytest.raises(Exception, match="mark sent"):
+        outbox.mark_sent("email_outbox-1")
+    with pytest.raises(Exception, match="mark failed"):
+        outbox.mark_failed({"id": "email_outbox-1"}, "boom")
+
+    worker = EmailOutboxWorker(outbox, server.mailer, worker_id="w1")
+    assert worker.run_once() == 2
+    # Both rows are logged rather than counted, and one failure does not stop the batch
+    assert worker.stats["sent"] == 0
+    assert len([r for r in caplog.records if "not marked sent" in r.getMessage()]) == 2
+
+
+def test_worker_only_closes_a_mailer_it_owns():
+    _, outbox = make_outbox()
+    shared = ResendMailer(api_key="re_test")
+    shared.http
+    EmailOutboxWorker(outbox, shared).close()
+    assert shared._http is not None
+
+    own = ResendMailer(api_key="re_test")
+    own.http
+    EmailOutboxWorker(outbox, own, owns_mailer=True).close()
+    assert own._http is None
+    shared.close()
+
+
+def test_cancel_only_affects_pending_rows():
+    client, outbox = make_outbox()
+    row = outbox.enqueue("a@example.com", "Hello", "<p>hi</p>")
+    assert outbox.cancel(row["id"]) is True
+    assert client.tables["email_outbox"][0]["status"] == "cancelled"
+    assert outbox.cancel(row["id"]) is False
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.try_acquire() == 0
+
+
+def test_send_batch_groups_by_sender_and_chunks(fake_resend):
+    server = fake_resend()
+    messages = [
+        {"to": f"u{i}@example.com", "subject": "s", "html": "h", "from_addr": "a@skreenit.com" if i % 2 else "b@skreenit.com"}
+        for i in range(250)
+    ]
+    results = server.mailer.send_batch(messages)
+
+    # 125 per sender -> 100 + 25 for each
+    assert sorted(len(body) for _, body in server.received) == [25, 25, 100, 100]
+    for _, body in server.received:
+        assert len({m["from"] for m in body}) == 1
+    assert all("id" in r for r in results)
+    assert len({r["id"] for r in results}) == 250
+
+
+def test_send_batch_reports_errors_per_message(fake_resend):
+    server = fake_resend(fail_first=1)
+    results = server.mailer.send_batch([
+        {"to": "a@example.com", "subject": "s", "html": "h", "email_type": "info"},
+        {"to": "b@example.com", "subject": "s", "html": "h", "email_type": "welcome"},
+    ])
+    assert sum("error" in r for r in results) == 1
+    assert sum("id" in r for r in results) == 1
+
+
+def test_mailer_throttles_each_sender():
+    mailer = ResendMailer(api_key="re_test", rate_per_sender=2, burst_per_sender=1)
+    first = mailer.rate_limiter.bucket("a@skreenit.com")
+    assert first.try_acquire() == 0
+    assert first.try_acquire() > 0
+    # A different sender has its own budget
+    assert mailer.rate_limiter.bucket("b@skreenit.com").try_acquire() == 0
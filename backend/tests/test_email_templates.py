@@ -0,0 +1,51 @@
+import os
+
+from utils_others import email_templates
+from utils_others.email_templates import EmailTemplates, render, render_many
+
+
+def test_templates_autoescape_user_input():
+    html = render("password_changed.html", name="<script>alert(1)</script>")
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+
+
+def test_welcome_shows_company_id_only_when_given():
+    templates = EmailTemplates()
+    recruiter = templates.welcome({"full_name": "Ann", "email": "ann@example.com", "company_id": "CMP123"})
+    candidate = templates.welcome({"full_name": "Bob", "email": "bob@example.com"})
+    assert "CMP123" in recruiter
+    assert "Company ID" not in candidate
+    assert email_templates.LOGIN_URL in candidate
+
+
+def test_render_many_matches_render():
+    contexts = [{"name": f"User {i}"} for i in range(3)]
+    assert render_many("password_changed.html", contexts) == [
+        render("password_changed.html", **ctx) for ctx in contexts
+    ]
+
+
+def test_environment_is_shared():
+    assert EmailTemplates().env is EmailTemplates().env
+
+
+def test_bytecode_cache_directory_must_be_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("EMAIL_TEMPLATE_CACHE_DIR", raising=False)
+    default = email_templates._bytecode_cache()
+    assert default is not None
+    assert os.stat(default.directory).st_mode & 0o777 == 0o700
+
+    private = tmp_path / "private"
+    monkeypatch.setenv("EMAIL_TEMPLATE_CACHE_DIR", str(private))
+    assert email_templates._bytecode_cache().directory == str(private)
+    assert private.stat().st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    monkeypatch.setenv("EMAIL_TEMPLATE_CACHE_DIR", str(shared))
+    assert email_templates._bytecode_cache() is None
+
+    monkeypatch.setenv("EMAIL_TEMPLATE_CACHE_DIR", "")
+    assert email_templates._bytecode_cache() is None
@@ -0,0 +1,69 @@
+import random
+import pytest
+from utils_others.hyperloglog import HyperLogLog
+from services.analytics_sketches import UniqueCountService
+from test_utils import FakeSupabase
+
+
+@pytest.mark.parametrize("n", [10, 1000, 20000, 200000])
+def test_estimate_within_documented_error(n):
+    rng = random.Random(n)
+    values = [f"user-{rng.getrandbits(64)}" for _ in range(n)]
+    exact = len(set(values))
+    sketch = HyperLogLog(12)
+    sketch.update(values)
+    # 4 standard errors: a spurious failure is ~1 in 15000 runs per case
+    assert abs(sketch.count() - exact) <= max(2, 4 * sketch.relative_error * exact)
+
+
+def test_duplicates_do_not_inflate_count():
+    sketch = HyperLogLog(12)
+    for _ in range(50):
+        sketch.update(f"v{i}" for i in range(500))
+    assert abs(sketch.count() - 500) <= 4 * sketch.relative_error * 500
+
+
+def test_merge_matches_union_and_serialization_round_trips():
+    a, b, union = HyperLogLog(12), HyperLogLog(12), HyperLogLog(12)
+    for i in range(30000):
+        (a if i % 2 else b).add(str(i % 20000))
+        union.add(str(i % 20000))
+    merged = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+    assert merged.to_bytes() == union.to_bytes()
+    assert len(merged.to_bytes()) == 4096
+
+
+def test_daily_sketches_merge_over_range():
+    client = FakeSupabase()
+
+    def merge_rows(params):
+        import base64
+        for row in params["p_rows"]:
+            table = client.tables.setdefault("analytics_hll_sketches", [])
+            existing = next((r for r in table if (r["metric"], r["subject_id"], r["day"]) == (row["metric"], row["subject_id"], row["day"])), None)
+            regs = base64.b64decode(row["registers"])
+            if existing:
+                existing["registers"] = "\\x" + bytes(map(max, bytes.fromhex(existing["registers"][2:]), regs)).hex()
+            else:
+                table.append({**row, "registers": "\\x" + regs.hex()})
+        return None
+    client.rpc_handlers["merge_hll_sketches"] = merge_rows
+
+    svc = UniqueCountService(client)
+    events = []
+    for day in (1, 2, 3):
+        for u in range(day * 100, day * 100 + 300):  # overlapping users across days
+            events.append({
+                "event_type": "job_view",
+                "user_id": f"user{u}",
+                "event_data": {"job_id": "job-1"},
+                "created_at": f"2026-03-0{day}T12:00:00",
+            })
+    svc.record_events(events)
+    from datetime import date
+    res = svc.unique_count("job_viewers", "job-1", date(2026, 3, 1), date(2026, 3, 3))
+    exact = len({e["user_id"] for e in events})
+    assert res["days_with_data"] == 3
+    assert abs(res["estimate"] - exact) <= 4 * res["relative_error"] * exact
+    one_day = svc.unique_count("job_viewers", "job-1", date(2026, 3, 2), date(2026, 3, 2))
+    assert abs(one_day["estimate"] - 300) <= 4 * one_day["relative_error"] * 300
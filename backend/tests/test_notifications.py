@@ -0,0 +1,301 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from routers import notification
+from services import notification_service as ns
+from services.notification_broker import BrokerBackend, NotificationBroker
+from services.notification_service import FanoutConflict, NotificationService
+from test_utils import FakeQuery, FakeSupabase
+
+RECRUITER = {"id": "rec-1", "role": "recruiter"}
+
+
+def make_client(applicants=5):
+    return FakeSupabase({
+        "jobs": [{"id": "job-1", "created_by": "rec-1"}, {"id": "job-2", "created_by": "rec-2"}],
+        "job_applications": [
+            {"id": f"app-{i:04d}", "job_id": "job-1", "candidate_id": f"cand-{i:04d}",
+             "status": "submitted" if i % 2 else "under_review"}
+            for i in range(applicants)
+        ] + [{"id": "app-other", "job_id": "job-2", "candidate_id": "cand-other", "status": "submitted"}],
+        "notifications": [],
+        "notification_fanouts": [],
+    })
+
+
+@pytest.fixture
+def api(monkeypatch):
+    client = make_client()
+    service = NotificationService(client)
+    monkeypatch.setattr(notification, "_notification_service", service)
+    main.app.dependency_overrides[notification.require_recruiter] = lambda: RECRUITER
+    yield TestClient(main.app), client
+    main.app.dependency_overrides.clear()
+
+
+def test_resolve_audience_pages_through_applicants(monkeypatch):
+    monkeypatch.setattr(ns, "AUDIENCE_PAGE_SIZE", 10)
+    client = make_client(applicants=25)
+    service = NotificationService(client)
+    ids = service.resolve_audience({"job_id": "job-1", "user_ids": ["cand-0003", "extra"]})
+    assert ids[:2] == ["cand-0003", "extra"]
+    assert len(ids) == 26 and len(set(ids)) == 26
+    assert client.calls.count(("job_applications", "select")) == 4
+
+    only_review = service.resolve_audience({"job_id": "job-1", "statuses": ["under_review"]})
+    assert len(only_review) == 13
+
+
+def test_resolve_audience_continues_past_server_row_cap(monkeypatch):
+    monkeypatch.setattr(ns, "AUDIENCE_PAGE_SIZE", 10)
+    execute = FakeQuery.execute
+
+    def capped(self):
+        res = execute(self)
+        if self.op == "select":
+            # Like PostgREST max-rows set below the page size
+            res.data = res.data[:4]
+        return res
+    monkeypatch.setattr(FakeQuery, "execute", capped)
+
+    ids = NotificationService(make_client(applicants=25)).resolve_audience({"job_id": "job-1"})
+    assert ids == [f"cand-{i:04d}" for i in range(25)]
+
+
+def test_run_fanout_is_idempotent():
+    client = make_client(applicants=7)
+    service = NotificationService(client)
+    delivered = []
+    service.add_listener(delivered.extend)
+    started = service.start_fanout("k1", {"title": "T", "message": "M", "type": "info"}, {"job_id": "job-1"}, created_by="rec-1")
+    assert started["run"]
+    done = service.run_fanout("k1", chunk_size=3)
+    assert done["status"] == "completed" and done["sent"] == 7
+    assert len(client.tables["notifications"]) == 7
+
+    # Completed keys are not re-run, and a forced re-run inserts nothing new
+    assert service.start_fanout("k1", {}, {}, created_by="rec-1")["run"] is False
+    service.run_fanout("k1")
+    assert len(client.tables["notifications"]) == 7
+    assert len(delivered) == 7
+
+
+def test_fanout_key_belongs_to_its_creator():
+    service = NotificationService(make_client())
+    service.start_fanout("k1", {"title": "T", "message": "M", "type": "info"}, {"job_id": "job-1"}, created_by="rec-1")
+    with pytest.raises(FanoutConflict):
+        service.start_fanout("k1", {}, {"job_id": "job-2"}, created_by="rec-2")
+
+
+def test_check_audience_limits_recipients_to_own_applicants():
+    service = NotificationService(make_client())
+    service.check_audience({"job_id": "job-1", "user_ids": ["cand-0001", "cand-0002"]}, "rec-1")
+    with pytest.raises(PermissionError):
+        service.check_audience({"job_id": "job-2"}, "rec-1")
+    with pytest.raises(PermissionError):
+        service.check_audience({"user_ids": ["cand-0001", "cand-other"]}, "rec-1")
+    with pytest.raises(PermissionError):
+        service.check_audience({"user_ids": ["cand-0001"]}, "rec-2")
+
+
+def test_fanout_endpoints(api):
+    http, client = api
+    body = {"fanout_key": "launch", "template": {"title": "T", "message": "M", "type": "info"},
+            "audience": {"job_id": "job-1"}}
+    r = http.post("/notification/fanout", json=body)
+    assert r.status_code == 202
+    assert len(client.tables["notifications"]) == 5
+    r = http.get("/notification/fanout/launch")
+    assert r.status_code == 200 and r.json()["data"]["status"] == "completed"
+    assert http.post("/notification/fanout", json=body).status_code == 200
+
+    forbidden = {**body, "fanout_key": "other", "audience": {"user_ids": ["cand-other"]}}
+    assert http.post("/notification/fanout", json=forbidden).status_code == 403
+    assert http.post("/notification/fanout", json={**body, "audience": {"job_id": "job-2"}}).status_code == 403
+
+    main.app.dependency_overrides[notification.require_recruiter] = lambda: {"id": "rec-2", "role": "recruiter"}
+    assert http.get("/notification/fanout/launch").status_code == 404
+    assert http.post("/notification/fanout", json={**body, "audience": {"job_id": "job-2"}}).status_code == 409
+
+
+def test_ws_stats_requires_recruiter(api):
+    http, _ = api
+    assert http.get("/notification/ws-stats").status_code == 200
+    main.app.dependency_overrides.clear()
+    assert http.get("/notification/ws-stats").status_code == 401
+    assert http.get("/notification/ws-stats", headers={"Authorization": "Bearer t"}).status_code == 403
+
+
+def test_fanout_requires_recruiter_role():
+    http = TestClient(main.app)
+    body = {"fanout_key": "k", "template": {"title": "T", "message": "M", "type": "info"}, "audience": {"user_ids": ["x"]}}
+    assert http.post("/notification/fanout", json=body).status_code == 401
+    # The stub token resolves to a candidate
+    assert http.post("/notification/fanout", json=body, headers={"Authorization": "Bearer t"}).status_code == 403
+    assert http.get("/notification/fanout/k", headers={"Authorization": "Bearer t"}).status_code == 403
+
+
+@pytest.fixture
+def inbox(monkeypatch):
+    client = FakeSupabase({"notifications": [
+        {"id": f"n{i}", "user_id": "cand-1" if i < 3 else "cand-2", "is_read": False,
+         "created_at": f"2026-03-01T00:00:0{i}+00:00"}
+        for i in range(5)
+    ]})
+    monkeypatch.setattr(notification, "_notification_service", NotificationService(client))
+    main.app.dependency_overrides[notification.require_user] = lambda: {"id": "cand-1", "role": "candidate"}
+    yield TestClient(main.app), client
+    main.app.dependency_overrides.clear()
+
+
+def test_inbox_endpoints_are_limited_to_the_caller(inbox):
+    http, client = inbox
+    r = http.get("/notification/inbox/cand-1")
+    assert r.status_code == 200
+    assert [n["id"] for n in r.json()["data"]] == ["n2", "n1", "n0"]
+    assert http.get("/notification/unread-count/cand-1").json()["data"]["unread_count"] == 3
+
+    assert http.get("/notification/inbox/cand-2").status_code == 403
+    assert http.get("/notification/unread-count/cand-2").status_code == 403
+
+
+def test_inbox_rejects_malformed_cursor(inbox):
+    from utils_others.pagination import encode_cursor
+    http, _ = inbox
+    for cursor in ("not-base64!", encode_cursor({"id": "n1"}), encode_cursor({"created_at": None, "id": "n1"})):
+        r = http.get("/notification/inbox/cand-1", params={"cursor": cursor})
+        assert r.status_code == 400
+        assert r.json()["detail"] == "Invalid cursor"
+
+    page = http.get("/notification/inbox/cand-1", params={"limit": 2}).json()
+    rest = http.get("/notification/inbox/cand-1", params={"cursor": page["next_cursor"]})
+    assert [n["id"] for n in rest.json()["data"]] == ["n0"]
+
+
+def test_list_since_ignores_unknown_ids():
+    client = FakeSupabase({"notifications": [
+        {"id": "n1", "user_id": "cand-1", "created_at": "2026-03-01T00:00:01+00:00"},
+        {"id": "n2", "user_id": "cand-2", "created_at": "2026-03-01T00:00:02+00:00"},
+    ]})
+    service = NotificationService(client)
+    assert service.list_since("cand-1", "missing") == []
+    # Another user's id is not an anchor either
+    assert service.list_since("cand-1", "n2") == []
+
+
+def test_mark_read_uses_the_token_user(inbox):
+    http, client = inbox
+    # A user_id in the body is ignored; only the caller's rows can change
+    r = http.post("/notification/mark-read", json={"user_id": "cand-2", "all": True})
+    assert r.status_code == 200
+    assert r.json()["data"] == {"updated": 3, "unread_count": 0}
+    assert [n["id"] for n in client.tables["notifications"] if not n["is_read"]] == ["n3", "n4"]
+
+    r = http.post("/notification/mark-read", json={"notification_ids": ["n3"]})
+    assert r.json()["data"]["updated"] == 0
+
+
+def test_broker_delivers_per_user_channel():
+    async def scenario():
+        broker = NotificationBroker()
+        mine, other = broker.subscribe("u1"), broker.subscribe("u2")
+        broker.publish_rows([{"id": "n1", "user_id": "u1"}, {"id": "n2", "user_id": "u2"}, {"id": "n3"}])
+        await asyncio.sleep(0)
+        assert (await mine.queue.get())["data"]["id"] == "n1"
+        assert (await other.queue.get())["data"]["id"] == "n2"
+        assert mine.queue.empty() and other.queue.empty()
+        assert broker.stats() == {"connections": 2, "channels": 2, "published": 2, "delivered": 2}
+        broker.unsubscribe(mine)
+        broker.unsubscribe(other)
+        assert broker.stats()["connections"] == 0
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_overflows_once():
+    async def scenario():
+        broker = NotificationBroker(max_pending=2)
+        sub = broker.subscribe("u1")
+        for i in range(5):
+            broker.publish("u1", {"type": "notification", "data": {"id": f"n{i}"}})
+        await asyncio.sleep(0)
+        assert sub.overflowed
+        messages = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+        # The oldest message makes room for the overflow marker; later ones are dropped
+        assert messages == [{"type": "notification", "data": {"id": "n1"}}, {"type": "overflow"}]
+    asyncio.run(scenario())
+
+
+def test_backend_must_implement_publish():
+    class Incomplete(BrokerBackend):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.fixture
+def live(monkeypatch):
+    client = FakeSupabase({"notifications": [
+        {"id": f"n{i}", "user_id": "cand-1", "is_read": False, "created_at": f"2026-03-01T00:00:0{i}+00:00"}
+        for i in range(4)
+    ]})
+    broker = NotificationBroker()
+    monkeypatch.setattr(notification, "_broker", broker)
+    monkeypatch.setattr(notification, "_notification_service", NotificationService(client))
+    monkeypatch.setattr(notification, "get_user_from_bearer", lambda token: {"id": token, "role": "candidate"})
+    return TestClient(main.app), broker
+
+
+def wait_for_connection(broker, count=1):
+    deadline = time.monotonic() + 5
+    while broker.stats()["connections"] < count:
+        assert time.monotonic() < deadline, "subscriber never registered"
+        time.sleep(0.01)
+
+
+def test_websocket_rejects_other_users_channel(live):
+    http, broker = live
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with http.websocket_connect("/notification/ws/cand-2?token=cand-1") as ws:
+            ws.receive_json()
+    assert closed.value.code == 4403
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with http.websocket_connect("/notification/ws/cand-1") as ws:
+            ws.receive_json()
+    assert closed.value.code == 4401
+    assert broker.stats()["connections"] == 0
+
+
+def test_websocket_resumes_after_last_seen_id_then_goes_live(live):
+    http, broker = live
+    with http.websocket_connect("/notification/ws/cand-1?token=cand-1&last_seen_id=n1") as ws:
+        assert ws.receive_json()["data"]["id"] == "n2"
+        assert ws.receive_json()["data"]["id"] == "n3"
+        wait_for_connection(broker)
+        # n3 was already replayed, so its live copy is dropped
+        broker.publish_rows([{"id": "n3", "user_id": "cand-1"}, {"id": "n4", "user_id": "cand-1"},
+                             {"id": "x1", "user_id": "cand-2"}])
+        assert ws.receive_json() == {"type": "notification", "data": {"id": "n4", "user_id": "cand-1"}}
+    deadline = time.monotonic() + 5
+    while broker.stats()["connections"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_websocket_closes_slow_client_with_overflow(live):
+    http, broker = live
+    broker.max_pending = 1
+    with http.websocket_connect("/notification/ws/cand-1?token=cand-1") as ws:
+        wait_for_connection(broker)
+        sub = next(iter(broker._subscribers["cand-1"]))
+        sub.loop.call_soon_threadsafe(lambda: [sub._put({"type": "notification", "data": {"id": f"n{i}"}}) for i in range(3)])
+        messages = []
+        with pytest.raises(WebSocketDisconnect) as closed:
+            while True:
+                messages.append(ws.receive_json())
+    assert closed.value.code == 4408
+    assert len(messages) <= 1
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import test_utils
+from routers import recruiter
+from services.review_service import ApplicationReviewService, parse_review_fields
+from services.video_service import VideoService
+from test_utils import FakeSupabase
+
+PUBLIC = "https://proj.supabase.co/storage/v1/object/public/videos/"
+
+
+def make_client():
+    return FakeSupabase({
+        "jobs": [{"id": "job-1", "created_by": "rec-1", "title": "Backend Engineer"}],
+        "job_applications": [{"id": "app-1", "job_id": "job-1", "candidate_id": "cand-1", "status": "submitted"}],
+        "candidate_profiles": [{"id": "cand-1", "title": "Engineer", "resume_url": "cand-1/cv.pdf"}],
+        "candidate_education": [{"id": "edu-1", "candidate_id": "cand-1", "degree": "BSc"}],
+        "candidate_experience": [{"id": "exp-1", "candidate_id": "cand-1", "company": "Acme"}],
+        "candidate_skills": [{"id": "sk-1", "candidate_id": "cand-1", "skill_name": "Python"}],
+        "video_responses": [
+            {"id": "vr-1", "application_id": "app-1", "video_url": PUBLIC + "cand-1/q1.webm"},
+            {"id": "vr-2", "application_id": "app-1", "video_url": PUBLIC + "cand-1/q2.webm"},
+        ],
+        "general_video_interviews": [{"id": "gv-1", "candidate_id": "cand-1", "video_url": PUBLIC + "cand-1/general.webm"}],
+    })
+
+
+def test_parse_review_fields():
+    assert parse_review_fields(None)[0] == "job"
+    assert parse_review_fields("videos, profile,videos") == ["videos", "profile"]
+    with pytest.raises(ValueError):
+        parse_review_fields("profile,password")
+
+
+def test_review_assembles_everything_with_batched_signing():
+    client = make_client()
+    review = asyncio.run(ApplicationReviewService(client, VideoService(client)).get_review("app-1", "rec-1"))
+
+    assert review["application"]["id"] == "app-1"
+    assert review["job"]["title"] == "Backend Engineer"
+    assert review["profile"]["title"] == "Engineer"
+    assert [s["skill_name"] for s in review["skills"]] == ["Python"]
+    assert review["education"][0]["degree"] == "BSc"
+    assert review["experience"][0]["company"] == "Acme"
+    assert all(v["signed_url"].startswith("https://storage.test/object/sign/videos/cand-1/") for v in review["videos"])
+    assert review["general_video"]["signed_url"].startswith("https://storage.test/object/sign/videos/cand-1/general.webm")
+    assert review["resume"]["signed_url"].startswith("https://storage.test/object/sign/resumes/cand-1/cv.pdf")
+    # One signing call per bucket, however many videos there are
+    assert client.calls.count(("storage:videos", "create_signed_urls")) == 1
+    assert client.calls.count(("storage:resumes", "create_signed_urls")) == 1
+
+
+def test_field_selection_skips_unrequested_queries():
+    client = make_client()
+    review = asyncio.run(ApplicationReviewService(client).get_review("app-1", "rec-1", ["skills"]))
+
+    assert set(review) == {"application", "skills"}
+    tables = {name for name, _ in client.calls}
+    assert tables == {"job_applications", "jobs", "candidate_skills"}
+
+
+def test_sections_are_fetched_concurrently(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    execute = test_utils.FakeQuery.execute
+
+    def slow_execute(self):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.05)
+        try:
+            return execute(self)
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    monkeypatch.setattr(test_utils.FakeQuery, "execute", slow_execute)
+    asyncio.run(ApplicationReviewService(make_client()).get_review("app-1", "rec-1"))
+    assert in_flight["max"] >= 4
+
+
+@pytest.fixture
+def review_client(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(recruiter, "_review_service", ApplicationReviewService(client))
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield TestClient(main.app)
+    main.app.dependency_overrides.pop(recruiter.require_recruiter, None)
+
+
+def test_review_endpoint(review_client):
+    res = review_client.get("/recruiter/application/app-1/review", params={"fields": "profile,videos"})
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert set(data) == {"application", "profile", "videos"}
+    assert len(data["videos"]) == 2
+
+    assert review_client.get("/recruiter/application/app-1/review", params={"fields": "salary"}).status_code == 400
+    assert review_client.get("/recruiter/application/missing/review").status_code == 404
+
+
+def test_review_endpoint_hides_other_recruiters_applications(review_client):
+    main.app.dependency_overrides[recruiter.require_recruiter] = lambda: {"id": "rec-2", "role": "recruiter"}
+    assert review_client.get("/recruiter/application/app-1/review").status_code == 404
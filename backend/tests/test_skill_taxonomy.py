@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.applicant_service import ApplicantService
+from services.skill_backfill import backfill_skill_names
+from test_candidate_summary import install_summary_rpcs
+from test_utils import FakeSupabase
+from utils_others.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy
+
+
+@pytest.mark.parametrize("raw, canonical", [
+    ("JS", "JavaScript"),
+    ("Javascript", "JavaScript"),
+    ("javascript ", "JavaScript"),
+    ("NodeJS", "Node.js"),
+    ("node  js", "Node.js"),
+    ("k8s", "Kubernetes"),
+    ("postgres", "PostgreSQL"),
+    ("c++", "C++"),
+    ("  Haskell   lang ", "Haskell lang"),
+])
+def test_normalize(raw, canonical):
+    assert get_skill_taxonomy().normalize(raw) == canonical
+
+
+def test_autocomplete_ranks_exact_and_popular_first():
+    taxonomy = SkillTaxonomy([
+        {"name": "JavaScript", "aliases": ["js"]},
+        {"name": "Java", "aliases": ["core java"]},
+        {"name": "Machine Learning", "aliases": ["ml"]},
+        {"name": "C", "aliases": []},
+    ])
+    assert taxonomy.autocomplete("ja") == ["JavaScript", "Java"]
+    assert taxonomy.autocomplete("JS") == ["JavaScript"]
+    assert taxonomy.autocomplete("c") == ["C", "Java"]
+    assert taxonomy.autocomplete("learn") == ["Machine Learning"]
+    assert taxonomy.autocomplete("zz") == []
+    assert taxonomy.autocomplete("  ") == []
+
+
+def test_autocomplete_endpoint():
+    res = TestClient(main.app).get("/applicant/skills/autocomplete", params={"q": "reac", "limit": 2})
+    assert res.status_code == 200
+    assert res.json()["data"] == ["React", "React Native"]
+
+
+def test_detailed_form_stores_canonical_skills_once():
+    client = FakeSupabase()
+    ApplicantService(client).save_detailed_form(
+        candidate_id="cand-1",
+        skills=[{"name": "JS", "years": 2}, {"name": "javascript ", "years": 5}, {"name": "Golang", "years": 1}],
+    )
+    stored = sorted((s["skill_name"], s["years_experience"]) for s in client.tables["candidate_skills"])
+    assert stored == [("Go", 1), ("JavaScript", 5)]
+
+
+def test_backfill_renames_and_dedupes_across_pages():
+    rows = [
+        {"id": "s01", "candidate_id": "a", "skill_name": "JS", "years_experience": 1},
+        {"id": "s02", "candidate_id": "a", "skill_name": "Javascript", "years_experience": 4},
+        {"id": "s03", "candidate_id": "a", "skill_name": "Python", "years_experience": 3},
+        {"id": "s04", "candidate_id": "b", "skill_name": "python3", "years_experience": 2},
+        {"id": "s05", "candidate_id": "b", "skill_name": "k8s", "years_experience": 1},
+        {"id": "s06", "candidate_id": "b", "skill_name": "Kubernetes ", "years_experience": 1},
+        {"id": "s07", "candidate_id": "c", "skill_name": "Haskell", "years_experience": 1},
+    ]
+    dry = FakeSupabase({"candidate_skills": [dict(r) for r in rows]})
+    assert backfill_skill_names(dry, "candidate_skills", batch_size=2, dry_run=True) == {
+        "scanned": 7, "renamed": 3, "duplicates_removed": 2,
+    }
+    assert dry.tables["candidate_skills"] == rows
+
+    assert dry.calls.count(("refresh_candidate_summary", "rpc")) == 0
+
+    client = install_summary_rpcs(FakeSupabase({"candidate_skills": [dict(r) for r in rows]}))
+    stats = backfill_skill_names(client, "candidate_skills", batch_size=2)
+    assert stats["duplicates_removed"] == 2
+    remaining = sorted((r["candidate_id"], r["skill_name"], r["id"]) for r in client.tables["candidate_skills"])
+    assert remaining == [
+        ("a", "JavaScript", "s02"),
+        ("a", "Python", "s03"),
+        ("b", "Kubernetes", "s05"),
+        ("b", "Python", "s04"),
+        ("c", "Haskell", "s07"),
+    ]
+    # Only candidates whose skills changed get their summary rebuilt
+    summaries = {s["candidate_id"]: s["top_skills"] for s in client.tables["candidate_summaries"]}
+    assert summaries == {"a": ["JavaScript", "Python"], "b": ["Python", "Kubernetes"]}
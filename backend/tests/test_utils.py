@@ -1,6 +1,8 @@
 import os
+import re
 import secrets
 import string
+from types import SimpleNamespace
 import pytest
 from typing import Dict, Any, Optional
 from supabase import create_client, Client
@@ -74,4 +76,271 @@ async def get_confirmation_email(user_email: str, timeout: int = 30) -> Optional
     3. Use Supabase's test email templates
     """
     # This is a placeholder - implement based on your email testing strategy
-    return None
\ No newline at end of file
+    return None
+
+class FakeResponse:
+    def __init__(self, data: Any = None, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+        self.error = None
+
+
+_KEYSET_EXPR = re.compile(
+    r'^(?P<col>\w+)\.(?P<op>lt|gt)\."(?P<v>[^"]*)",and\((?P=col)\.eq\."(?P=v)",(?P<tie>\w+)\.(?P=op)\."(?P<t>[^"]*)"\)$'
+)
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest query against an in-memory table."""
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table_name = table
+        self.op = "select"
+        self.payload: Any = None
+        self.filters = []
+        self._order = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+        self._count = None
+
+    def _rows(self):
+        return self.db.tables.setdefault(self.table_name, [])
+
+    def select(self, *columns, count=None, **kwargs):
+        self._count = count
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", ignore_duplicates: bool = False, **kwargs):
+        self.op, self.payload = "upsert", payload
+        self.on_conflict = [c.strip() for c in on_conflict.split(",")]
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda r: r.get(column) != value)
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) <= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) < value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) > value)
+        return self
+
+    def or_(self, expr):
+        """Only the keyset form produced by utils_others.pagination.keyset_filter."""
+        m = _KEYSET_EXPR.match(expr)
+        if not m:
+            raise NotImplementedError(f"FakeQuery.or_ cannot evaluate {expr!r}")
+        column, op, value, tie_column, tie_value = m.group("col", "op", "v", "tie", "t")
+        after = op == "gt"
+
+        def past(r):
+            key, anchor = (r.get(column), r.get(tie_column)), (value, tie_value)
+            return key > anchor if after else key < anchor
+        self.filters.append(lambda r: r.get(column) is not None and past(r))
+        return self
+
+    def order(self, column, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def maybe_single(self):
+        return self.single()
+
+    def _matching(self):
+        return [r for r in self._rows() if all(f(r) for f in self.filters)]
+
+    def execute(self):
+        self.db.calls.append((self.table_name, self.op))
+        if self.db.fail_tables.get(self.table_name):
+            self.db.fail_tables[self.table_name] -= 1
+            raise Exception(f"simulated failure on {self.table_name}")
+        rows = self._rows()
+        if self.op == "insert":
+            items = self.payload if isinstance(self.payload, list) else [self.payload]
+            items = [dict(i) for i in items]
+            for i in items:
+                i.setdefault("id", f"{self.table_name}-{len(rows) + 1}")
+                rows.append(i)
+            return FakeResponse(items)
+        if self.op == "upsert":
+            items = self.payload if isinstance(self.payload, list) else [self.payload]
+            out = []
+            for item in items:
+                key = tuple(item.get(c) for c in self.on_conflict)
+                existing = next((r for r in rows if tuple(r.get(c) for c in self.on_conflict) == key), None)
+                if existing is not None:
+                    if not self.ignore_duplicates:
+                        existing.update(item)
+                        out.append(existing)
+                else:
+                    row = dict(item)
+                    row.setdefault("id", f"{self.table_name}-{len(rows) + 1}")
+                    rows.append(row)
+                    out.append(row)
+            return FakeResponse(out)
+        matched = self._matching()
+        if self.op == "update":
+            for r in matched:
+                r.update(self.payload)
+            return FakeResponse([dict(r) for r in matched])
+        if self.op == "delete":
+            self.db.tables[self.table_name] = [r for r in rows if r not in matched]
+            return FakeResponse(matched)
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        count = len(matched) if self._count else None
+        if self._limit is not None:
+            matched = matched[self._offset: self._offset + self._limit]
+        if self._single:
+            return FakeResponse(dict(matched[0]) if matched else None)
+        return FakeResponse([dict(r) for r in matched], count=count)
+
+
+class FakeAuthAdmin:
+    def __init__(self, auth: "FakeAuth"):
+        self.auth = auth
+
+    def get_user_by_id(self, user_id):
+        self.auth.db.calls.append(("auth", "get_user_by_id"))
+        user = self.auth.users.get(user_id)
+        return SimpleNamespace(user=SimpleNamespace(**user) if user else None)
+
+    def update_user_by_id(self, user_id, attributes):
+        self.auth.db.calls.append(("auth", "update_user_by_id"))
+        user = self.auth.users[user_id]
+        user["user_metadata"] = {**user.get("user_metadata", {}), **attributes.get("user_metadata", {})}
+        return SimpleNamespace(user=SimpleNamespace(**user))
+
+    def delete_user(self, user_id):
+        self.auth.db.calls.append(("auth", "delete_user"))
+        self.auth.users.pop(user_id, None)
+
+
+class FakeAuth:
+    """supabase.auth stand-in keeping users in a dict keyed by id."""
+    def __init__(self, db: "FakeSupabase"):
+        self.db = db
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.admin = FakeAuthAdmin(self)
+
+    def sign_up(self, payload):
+        self.db.calls.append(("auth", "sign_up"))
+        if any(u["email"] == payload["email"] for u in self.users.values()):
+            raise Exception("User already registered")
+        user_id = f"user-{len(self.users) + 1}"
+        self.users[user_id] = {
+            "id": user_id,
+            "email": payload["email"],
+            "user_metadata": dict(payload.get("options", {}).get("data", {})),
+        }
+        return SimpleNamespace(user=SimpleNamespace(id=user_id))
+
+
+class FakeBucket:
+    def __init__(self, storage: "FakeStorage", name: str):
+        self.storage = storage
+        self.name = name
+
+    def upload(self, path, data, *args, **kwargs):
+        self.storage.db.calls.append((f"storage:{self.name}", "upload"))
+        if self.storage.fail_uploads:
+            self.storage.fail_uploads -= 1
+            raise Exception("simulated upload failure")
+        self.storage.objects[(self.name, path)] = data
+        return SimpleNamespace(path=path, error=None)
+
+    def create_signed_urls(self, paths, expires_in, options=None):
+        self.storage.db.calls.append((f"storage:{self.name}", "create_signed_urls"))
+        return [
+            {"path": p, "error": None, "signedURL": f"https://storage.test/object/sign/{self.name}/{p}?token=t{expires_in}"}
+            for p in paths
+        ]
+
+    def get_public_url(self, path):
+        return f"https://storage.test/object/public/{self.name}/{path}"
+
+    def remove(self, paths):
+        self.storage.db.calls.append((f"storage:{self.name}", "remove"))
+        for path in paths:
+            self.storage.objects.pop((self.name, path), None)
+        return [{"name": p} for p in paths]
+
+
+class FakeStorage:
+    """supabase.storage stand-in; objects live in a dict keyed by (bucket, path)."""
+    def __init__(self, db: "FakeSupabase"):
+        self.db = db
+        self.objects: Dict[Any, bytes] = {}
+        self.fail_uploads = 0
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self, bucket)
+
+
+class FakeSupabase:
+    """Minimal in-memory Supabase client for unit tests that must not hit the network."""
+    def __init__(self, tables: Optional[Dict[str, list]] = None):
+        self.tables: Dict[str, list] = tables or {}
+        self.calls = []
+        self.fail_tables: Dict[str, int] = {}
+        self.rpc_handlers: Dict[str, Any] = {}
+        self.auth = FakeAuth(self)
+        self.storage = FakeStorage(self)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None):
+        db = self
+
+        class _Rpc:
+            def execute(self_inner):
+                db.calls.append((name, "rpc"))
+                return FakeResponse(db.rpc_handlers[name](params or {}))
+        return _Rpc()
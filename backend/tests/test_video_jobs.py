@@ -0,0 +1,200 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.video_jobs import (
+    STUB_PROCESSORS,
+    InMemoryVideoJobStore,
+    VideoJobRunner,
+)
+
+
+def boom(job):
+    raise RuntimeError("decoder crashed")
+
+
+def run_until_idle(runner, rounds=50):
+    for _ in range(rounds):
+        runner.run_once(wait_timeout=1)
+        if not runner.stats()["inflight"] and not any(s["pending"] for s in runner.store.stats()):
+            return
+
+
+def test_stub_processors_write_results_back():
+    store = InMemoryVideoJobStore()
+    store.enqueue("video_responses", "v1", "https://cdn/v1.webm", ["thumbnail", "transcript", "analysis"])
+    store.enqueue("general_video_interviews", "g1", "https://cdn/g1.mp4", ["thumbnail"])
+    runner = VideoJobRunner(store, STUB_PROCESSORS, concurrency=3, executor=ThreadPoolExecutor(3))
+
+    run_until_idle(runner)
+
+    v1 = store.videos[("video_responses", "v1")]
+    assert v1["thumbnail_url"] == "https://cdn/v1.webm#t=1"
+    assert v1["transcript"] == ""
+    assert v1["ai_analysis"]["processor"] == "stub"
+    assert store.videos[("general_video_interviews", "g1")]["thumbnail_url"].endswith("#t=1")
+    assert {j["status"] for j in store.jobs.values()} == {"completed"}
+    assert runner.stats()["completed"] == 4
+
+
+def test_enqueue_is_idempotent_per_video_and_processor():
+    store = InMemoryVideoJobStore()
+    assert len(store.enqueue("video_responses", "v1", "u", ["thumbnail", "thumbnail"])) == 1
+    assert store.enqueue("video_responses", "v1", "u", ["thumbnail"]) == []
+
+
+def test_reupload_resets_jobs_and_stale_results_are_dropped():
+    store = InMemoryVideoJobStore()
+    store.enqueue("general_video_interviews", "g1", "https://cdn/old.mp4", ["thumbnail"])
+    runner = VideoJobRunner(store, STUB_PROCESSORS, executor=ThreadPoolExecutor(1))
+    run_until_idle(runner)
+    assert store.enqueue("general_video_interviews", "g1", "https://cdn/old.mp4", ["thumbnail"]) == []
+
+    # A new recording keeps the row id; its job starts over
+    [job] = store.enqueue("general_video_interviews", "g1", "https://cdn/new.mp4", ["thumbnail"])
+    assert (job["status"], job["attempts"], job["video_url"]) == ("pending", 0, "https://cdn/new.mp4")
+    [leased] = store.claim("w1", ["thumbnail"], 1, lease_seconds=30)
+    store.enqueue("general_video_interviews", "g1", "https://cdn/newer.mp4", ["thumbnail"])
+    store.complete(leased, "w1", {"thumbnail_url": "https://cdn/new.mp4#t=1"})
+    assert store.videos[("general_video_interviews", "g1")]["thumbnail_url"] == "https://cdn/old.mp4#t=1"
+
+    run_until_idle(runner)
+    assert store.videos[("general_video_interviews", "g1")]["thumbnail_url"] == "https://cdn/newer.mp4#t=1"
+    assert len(store.jobs) == 1
+
+
+def test_store_enqueues_through_sql_and_surfaces_write_errors(monkeypatch):
+    import pytest
+    from services.video_jobs import VideoJobStore
+    from test_utils import FakeQuery, FakeSupabase
+
+    client = FakeSupabase({"video_responses": [{"id": "v1", "video_url": "u"}], "video_jobs": [{"id": "j1", "locked_by": "w1"}]})
+    store = VideoJobStore(client)
+    calls = []
+    client.rpc_handlers["enqueue_video_jobs"] = lambda params: calls.append(params) or []
+    store.enqueue("video_responses", "v1", "u", ["thumbnail", "thumbnail", "analysis"])
+    assert calls == [{"p_video_table": "video_responses", "p_video_id": "v1", "p_video_url": "u",
+                      "p_processors": ["thumbnail", "analysis"]}]
+    job = {"id": "j1", "video_table": "video_responses", "video_id": "v1", "video_url": "u"}
+    execute = FakeQuery.execute
+
+    def failing_job_updates(self):
+        res = execute(self)
+        if self.table_name == "video_jobs":
+            res.error = {"message": "permission denied"}
+        return res
+    monkeypatch.setattr(FakeQuery, "execute", failing_job_updates)
+
+    with pytest.raises(Exception, match="complete"):
+        store.complete(job, "w1", {"thumbnail_url": "u#t=1"})
+    assert client.tables["video_responses"][0]["thumbnail_url"] == "u#t=1"
+
+
+def test_runs_in_a_process_pool():
+    store = InMemoryVideoJobStore()
+    store.enqueue("video_responses", "v1", "https://cdn/v1.webm", ["thumbnail", "analysis"])
+    runner = VideoJobRunner(store, STUB_PROCESSORS, concurrency=2)
+    try:
+        run_until_idle(runner)
+    finally:
+        runner.stop()
+    assert set(store.videos[("video_responses", "v1")]) == {"thumbnail_url", "ai_analysis"}
+
+
+def test_failures_are_retried_then_dead_lettered():
+    store = InMemoryVideoJobStore(max_attempts=3)
+    store.enqueue("video_responses", "v1", "u", ["transcript"])
+    runner = VideoJobRunner(store, {"transcript": boom}, executor=ThreadPoolExecutor(1))
+
+    run_until_idle(runner)
+
+    [job] = store.jobs.values()
+    assert job["status"] == "dead"
+    assert job["attempts"] == 3
+    assert "decoder crashed" in job["last_error"]
+    stats = runner.stats()
+    assert (stats["failed"], stats["dead"]) == (2, 1)
+    assert stats["queue"][0]["dead"] == 1
+
+
+def test_per_processor_limit_caps_concurrency():
+    release = threading.Event()
+
+    def slow(job):
+        release.wait(5)
+        return {}
+
+    store = InMemoryVideoJobStore()
+    for i in range(4):
+        store.enqueue("video_responses", f"v{i}", "u", ["transcript", "thumbnail"])
+    runner = VideoJobRunner(
+        store, {"transcript": slow, "thumbnail": slow},
+        concurrency=4, limits={"transcript": 1}, executor=ThreadPoolExecutor(4),
+    )
+    runner.claim_and_submit()
+    running = [j["processor"] for j in store.jobs.values() if j["status"] == "running"]
+    assert running.count("transcript") == 1
+    assert running.count("thumbnail") == 3
+    release.set()
+    run_until_idle(runner)
+    assert {j["status"] for j in store.jobs.values()} == {"completed"}
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_cannot_finish():
+    now = [1000.0]
+    store = InMemoryVideoJobStore(clock=lambda: now[0])
+    store.enqueue("video_responses", "v1", "u", ["thumbnail"])
+    [stale] = store.claim("crashed-worker", ["thumbnail"], 1, lease_seconds=30)
+    assert store.claim("other", ["thumbnail"], 1, lease_seconds=30) == []
+
+    now[0] += 31
+    [job] = store.claim("other", ["thumbnail"], 1, lease_seconds=30)
+    assert job["attempts"] == 2
+    assert store.heartbeat("crashed-worker", [stale["id"]], 30) == []
+    assert store.heartbeat("other", [job["id"]], 30) == [job["id"]]
+
+    store.complete(stale, "crashed-worker", {"thumbnail_url": "stale"})
+    assert store.jobs[job["id"]]["status"] == "running"
+    store.complete(job, "other", {"thumbnail_url": "fresh"})
+    assert store.jobs[job["id"]]["status"] == "completed"
+
+
+def test_upload_queues_processing_jobs(monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    from routers import video
+    from services.video_service import VideoService
+    from test_utils import FakeSupabase
+    from test_video_probe import mp4
+
+    store = InMemoryVideoJobStore()
+    monkeypatch.setattr(video, "_video_service", VideoService(FakeSupabase()))
+    monkeypatch.setattr(video, "_video_job_store", store)
+    monkeypatch.setenv("VIDEO_PROCESSORS", "thumbnail,transcript")
+    res = TestClient(main.app).post(
+        "/video/general",
+        data={"candidate_id": "cand-1"},
+        files={"video": ("intro.mp4", mp4(), "video/mp4")},
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert res.status_code == 200
+    assert res.json()["data"]["processing_jobs"] == ["thumbnail", "transcript"]
+    assert {(j["video_table"], j["processor"]) for j in store.jobs.values()} == {
+        ("general_video_interviews", "thumbnail"),
+        ("general_video_interviews", "transcript"),
+    }
+
+
+def test_job_stats_require_recruiter(monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    from routers import video
+
+    monkeypatch.setattr(video, "_video_job_store", InMemoryVideoJobStore())
+    http = TestClient(main.app)
+    assert http.get("/video/jobs/stats").status_code == 401
+    main.app.dependency_overrides[video.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    try:
+        assert http.get("/video/jobs/stats").json()["ok"] is True
+    finally:
+        main.app.dependency_overrides.clear()
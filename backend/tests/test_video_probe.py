@@ -0,0 +1,112 @@
+import io
+import struct
+
+import pytest
+
+from utils_others.video_probe import VideoProbeError, probe_video
+
+
+def box(kind: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mp4(duration_s=12.5, width=1280, height=720, fmt=b"avc1", moov_last=True, brand=b"isom"):
+    mvhd = box(b"mvhd", b"\x00" * 4 + struct.pack(">III", 0, 0, 1000) + struct.pack(">I", int(duration_s * 1000)) + b"\x00" * 80)
+    tkhd = box(b"tkhd", b"\x00" * 4 + b"\x00" * 72 + struct.pack(">II", width << 16, height << 16))
+    hdlr = box(b"hdlr", b"\x00" * 8 + b"vide" + b"\x00" * 12)
+    entry = box(fmt, b"\x00" * 6 + b"\x00\x01" + b"\x00" * 16 + struct.pack(">HH", width, height) + b"\x00" * 50)
+    stsd = box(b"stsd", b"\x00" * 4 + struct.pack(">I", 1) + entry)
+    trak = box(b"trak", tkhd + box(b"mdia", hdlr + box(b"minf", box(b"stbl", stsd))))
+    audio = box(b"trak", box(b"mdia", box(b"hdlr", b"\x00" * 8 + b"soun" + b"\x00" * 12)))
+    moov = box(b"moov", mvhd + audio + trak)
+    ftyp = box(b"ftyp", brand + b"\x00\x00\x02\x00")
+    mdat = box(b"mdat", b"\xAB" * 5000)
+    return ftyp + (mdat + moov if moov_last else moov + mdat)
+
+
+def vint_size(n: int) -> bytes:
+    return bytes([0x10]) + n.to_bytes(3, "big") if n >= 0x3FFF else bytes([0x40 | (n >> 8), n & 0xFF])
+
+
+def el(element_id: int, payload: bytes) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + vint_size(len(payload)) + payload
+
+
+UNKNOWN = b"\x01\xFF\xFF\xFF\xFF\xFF\xFF\xFF"
+
+
+def webm(duration_ms=None, width=640, height=480, clusters=((0, [0, 33, 66]), (1000, [0, 500]))):
+    header = el(0x1A45DFA3, el(0x4282, b"webm"))
+    info_children = el(0x2AD7B1, (1_000_000).to_bytes(3, "big"))
+    if duration_ms is not None:
+        info_children += el(0x4489, struct.pack(">d", duration_ms))
+    info = el(0x1549A966, info_children)
+    video = el(0xE0, el(0xB0, width.to_bytes(2, "big")) + el(0xBA, height.to_bytes(2, "big")))
+    tracks = el(0x1654AE6B, el(0xAE, el(0x83, b"\x01") + el(0x86, b"V_VP8") + video))
+    body = b""
+    for cluster_time, blocks in clusters:
+        children = el(0xE7, cluster_time.to_bytes(2, "big"))
+        for rel in blocks:
+            children += el(0xA3, b"\x81" + struct.pack(">h", rel) + b"\x80" + b"\x00" * 200)
+        # MediaRecorder writes unknown-size clusters
+        body += (0x1F43B675).to_bytes(4, "big") + UNKNOWN + children
+    segment = (0x18538067).to_bytes(4, "big") + UNKNOWN + info + tracks + body
+    return header + segment
+
+
+def test_mp4_with_moov_after_mdat():
+    info = probe_video(mp4())
+    assert info == {"container": "mp4", "duration": 12.5, "width": 1280, "height": 720, "codec": "h264"}
+
+
+def test_mp4_faststart_and_quicktime_brand():
+    info = probe_video(mp4(duration_s=3, fmt=b"hvc1", moov_last=False, brand=b"qt  "))
+    assert info["container"] == "mov"
+    assert info["codec"] == "hevc"
+    assert info["duration"] == 3
+
+
+def test_webm_with_duration_element():
+    info = probe_video(webm(duration_ms=4200.0))
+    assert info == {"container": "webm", "duration": 4.2, "width": 640, "height": 480, "codec": "vp8"}
+
+
+def test_webm_without_duration_uses_last_block():
+    info = probe_video(webm())
+    assert info["duration"] == pytest.approx(1.5)
+    assert (info["width"], info["height"]) == (640, 480)
+
+
+def test_file_objects_are_rewound():
+    f = io.BytesIO(mp4())
+    f.seek(100)
+    assert probe_video(f)["duration"] == 12.5
+    assert f.tell() == 0
+
+
+def test_unknown_and_truncated_input():
+    assert probe_video(b"not a video at all")["container"] is None
+    with pytest.raises(VideoProbeError):
+        probe_video(mp4(moov_last=False)[:60])
+
+
+def test_upload_stores_probed_metadata(monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    from routers import video
+    from services.video_service import VideoService
+    from test_utils import FakeSupabase
+
+    client = FakeSupabase()
+    monkeypatch.setattr(video, "_video_service", VideoService(client))
+    res = TestClient(main.app).post(
+        "/video/general",
+        data={"candidate_id": "cand-1", "application_id": "app-1", "question_id": "q-1"},
+        files={"video": ("answer.mp4", mp4(duration_s=42.4), "video/mp4")},
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert res.status_code == 200
+    [row] = client.tables["video_responses"]
+    assert (row["duration"], row["width"], row["height"], row["codec"]) == (42, 1280, 720, "h264")
+    assert ("videos", row["video_url"].split("/videos/", 1)[1]) in client.storage.objects
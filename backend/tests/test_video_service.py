@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import video
+from services.video_service import VideoService
+from test_utils import FakeSupabase
+from utils_others.file_upload import storage_path_from_url
+
+PUBLIC = "https://proj.supabase.co/storage/v1/object/public/videos/"
+
+
+def test_storage_path_from_url():
+    assert storage_path_from_url(PUBLIC + "cand-1/a%20b.webm", "videos") == "cand-1/a b.webm"
+    assert storage_path_from_url("https://x/storage/v1/object/sign/videos/c/1.mp4?token=abc", "videos") == "c/1.mp4"
+    assert storage_path_from_url("c/1.mp4", "videos") == "c/1.mp4"
+
+
+def candidate_videos_rpc(client):
+    """Python model of the candidate_videos SQL function."""
+    def handler(params):
+        owned = {j["id"] for j in client.tables["jobs"]
+                 if params.get("p_recruiter_id") in (None, j["created_by"])}
+        out = []
+        for cid in params["p_candidate_ids"]:
+            apps = {a["id"]: a["job_id"] for a in client.tables["job_applications"]
+                    if a.get("candidate_id") == cid and a["job_id"] in owned}
+            videos = sorted(
+                ({**v, "job_id": apps[v["application_id"]]} for v in client.tables["video_responses"] if v["application_id"] in apps),
+                key=lambda v: v["recorded_at"],
+            )
+            general = next((g for g in client.tables.get("general_video_interviews", []) if g["candidate_id"] == cid), None)
+            if params.get("p_recruiter_id") and not apps:
+                general = None
+            out.append({"candidate_id": cid, "videos": videos, "general_video": general})
+        return out
+    return handler
+
+
+def make_client():
+    client = FakeSupabase({
+        "jobs": [{"id": "job-1", "created_by": "rec-1"}, {"id": "job-2", "created_by": "someone-else"}],
+        "job_applications": [
+            {"id": "app-1", "job_id": "job-1", "candidate_id": "c1"},
+            {"id": "app-2", "job_id": "job-1", "candidate_id": "c2"},
+            {"id": "app-3", "job_id": "job-2", "candidate_id": "c3"},
+            {"id": "app-4", "job_id": "job-2", "candidate_id": "c1"},
+        ],
+        "video_responses": [
+            {"id": "vr-1", "application_id": "app-1", "video_url": PUBLIC + "c1/q1.webm", "recorded_at": "2026-01-01T00:00:00"},
+            {"id": "vr-2", "application_id": "app-1", "video_url": PUBLIC + "c1/q2.webm", "recorded_at": "2026-01-01T00:01:00"},
+            {"id": "vr-3", "application_id": "app-2", "video_url": PUBLIC + "c2/q1.webm", "recorded_at": "2026-01-02T00:00:00"},
+            {"id": "vr-4", "application_id": "app-3", "video_url": PUBLIC + "c3/q1.webm", "recorded_at": "2026-01-03T00:00:00"},
+            {"id": "vr-5", "application_id": "app-4", "video_url": PUBLIC + "c1/other.webm", "recorded_at": "2026-01-04T00:00:00"},
+        ],
+        "general_video_interviews": [
+            {"id": "gv-1", "candidate_id": "c1", "video_url": PUBLIC + "c1/general.webm"},
+            {"id": "gv-3", "candidate_id": "c3", "video_url": PUBLIC + "c3/general.webm"},
+        ],
+    })
+    client.rpc_handlers["candidate_videos"] = candidate_videos_rpc(client)
+    return client
+
+
+def test_signed_responses_use_one_signing_call_and_cache():
+    client = make_client()
+    service = VideoService(client)
+
+    first = service.get_signed_responses(["app-1", "app-2"])
+    assert [r["id"] for r in first["app-1"]] == ["vr-1", "vr-2"]
+    assert first["app-2"][0]["signed_url"].startswith("https://storage.test/object/sign/videos/c2/q1.webm")
+    assert client.calls.count(("storage:videos", "create_signed_urls")) == 1
+
+    service.get_signed_responses(["app-1", "app-2"])
+    assert client.calls.count(("storage:videos", "create_signed_urls")) == 1
+
+
+def test_candidate_videos_span_applications_in_one_query():
+    client = make_client()
+    result = VideoService(client).get_candidate_videos("c1")
+
+    assert [v["id"] for v in result["videos"]] == ["vr-1", "vr-2", "vr-5"]
+    assert {v["job_id"] for v in result["videos"]} == {"job-1", "job-2"}
+    assert result["general_video"]["id"] == "gv-1"
+    assert client.calls == [("candidate_videos", "rpc")]
+
+
+def test_candidate_videos_scoped_to_recruiter():
+    grouped = VideoService(make_client()).get_candidates_videos(["c1", "c3", "c1", "nobody"], recruiter_id="rec-1")
+
+    assert list(grouped) == ["c1", "c3", "nobody"]
+    assert [v["id"] for v in grouped["c1"]["videos"]] == ["vr-1", "vr-2"]
+    assert grouped["c3"] == {"videos": [], "general_video": None}
+    assert grouped["nobody"] == {"videos": [], "general_video": None}
+
+
+@pytest.fixture
+def recruiter_client(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(video, "_video_service", VideoService(client))
+    main.app.dependency_overrides[video.require_recruiter] = lambda: {"id": "rec-1", "role": "recruiter"}
+    yield TestClient(main.app), client
+    main.app.dependency_overrides.pop(video.require_recruiter, None)
+
+
+def test_endpoint_returns_only_the_recruiters_applications(recruiter_client):
+    http, client = recruiter_client
+    res = http.get("/video/responses/signed", params=[("application_id", "app-1"), ("application_id", "app-3")])
+
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert set(data) == {"app-1"}
+    assert all(r["signed_url"] for r in data["app-1"])
+
+
+def test_endpoint_requires_recruiter_role():
+    res = TestClient(main.app).get("/video/responses/signed", params={"application_id": "app-1"},
+                                   headers={"Authorization": "Bearer token"})
+    # The stub token resolves to a candidate
+    assert res.status_code == 403
+
+
+def test_compare_endpoint_signs_every_video_in_one_call(recruiter_client):
+    http, client = recruiter_client
+    res = http.get("/video/candidates", params=[("candidate_id", "c1"), ("candidate_id", "c2")])
+
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert [v["id"] for v in data["c1"]["videos"]] == ["vr-1", "vr-2"]
+    assert data["c1"]["general_video"]["signed_url"].startswith("https://storage.test/object/sign/videos/c1/general.webm")
+    assert all(v["signed_url"] for v in data["c2"]["videos"])
+    assert client.calls.count(("candidate_videos", "rpc")) == 1
+    assert client.calls.count(("storage:videos", "create_signed_urls")) == 1
@@ -0,0 +1,215 @@
+import re
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from routers import video
+from services.video_stream import RangeNotSatisfiable, VideoStreamer, parse_range
+from utils_others.chunk_cache import DiskChunkCache
+
+CHUNK = 1024
+BLOB = bytes(range(256)) * 40  # 10240 bytes, ten chunks
+
+
+class FakeStorage:
+    """Serves Range requests for BLOB and records every upstream request."""
+
+    def __init__(self, blob=BLOB, honour_range=True, piece=512):
+        self.blob = blob
+        self.honour_range = honour_range
+        self.piece = piece
+        self.requests = []
+        self.pieces_sent = 0
+
+    def full_body(self):
+        for i in range(0, len(self.blob), self.piece):
+            self.pieces_sent += 1
+            yield self.blob[i:i + self.piece]
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.headers.get("range")))
+        if "missing" in request.url.path:
+            return httpx.Response(404)
+        size = len(self.blob)
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-length": str(size)})
+        m = re.match(r"bytes=(\d+)-(\d+)", request.headers.get("range", ""))
+        if not m or not self.honour_range:
+            return httpx.Response(200, content=self.full_body())
+        start, end = int(m.group(1)), min(int(m.group(2)), size - 1)
+        if start >= size:
+            return httpx.Response(416, headers={"content-range": f"bytes */{size}"})
+        return httpx.Response(
+            206,
+            content=self.blob[start:end + 1],
+            headers={"content-range": f"bytes {start}-{end}/{size}"},
+        )
+
+
+def sign(path):
+    return f"https://storage.test/object/sign/videos/{path}?token=t"
+
+
+def make_streamer(tmp_path, max_bytes=64 * CHUNK, storage=None, sign=sign):
+    storage = storage or FakeStorage()
+    streamer = VideoStreamer(
+        sign=sign,
+        cache=DiskChunkCache(str(tmp_path / "chunks"), max_bytes=max_bytes),
+        chunk_size=CHUNK,
+        http=httpx.Client(transport=httpx.MockTransport(storage)),
+    )
+    return streamer, storage
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-", 100) == (0, 99)
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-500", 100) == (90, 99)
+    assert parse_range("bytes=-30", 100) == (70, 99)
+    assert parse_range("bytes=5-9, 20-30", 100) == (5, 9)
+    assert parse_range("items=0-5", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_seek_fetches_only_the_needed_chunks(tmp_path):
+    streamer, storage = make_streamer(tmp_path)
+    size = streamer.object_size("c/v.webm", offset_hint=7000)
+    assert size == len(BLOB)
+    body = b"".join(streamer.iter_range("c/v.webm", 7000, 8500))
+    assert body == BLOB[7000:8501]
+    # Chunks 6, 7 and 8 only; the size came for free with chunk 6
+    assert storage.requests == [("GET", f"bytes={i * CHUNK}-{(i + 1) * CHUNK - 1}") for i in (6, 7, 8)]
+
+
+def test_repeat_range_is_served_from_disk(tmp_path):
+    streamer, storage = make_streamer(tmp_path)
+    first = b"".join(streamer.iter_range("c/v.webm", 0, 4095))
+    fetched = len(storage.requests)
+    # A fresh streamer over the same directory (e.g. after a restart) reuses the chunks
+    again, storage2 = make_streamer(tmp_path, storage=FakeStorage())
+    assert b"".join(again.iter_range("c/v.webm", 0, 4095)) == first == BLOB[:4096]
+    assert fetched == 4
+    assert storage2.requests == []
+    assert again.cache.stats()["hits"] == 4
+
+
+def test_range_ignoring_upstream_is_read_only_up_to_the_chunk(tmp_path):
+    streamer, storage = make_streamer(tmp_path, storage=FakeStorage(honour_range=False))
+    assert streamer.chunk("c/v.webm", 2) == BLOB[2 * CHUNK:3 * CHUNK]
+    # 512-byte pieces: reading stops once chunk 2 is complete
+    assert storage.pieces_sent == 6
+    assert streamer.chunk("c/v.webm", 9) == BLOB[9 * CHUNK:]
+    assert streamer.object_size("c/v.webm") == len(BLOB)
+
+
+def test_chunk_cache_stays_bounded(tmp_path):
+    streamer, _ = make_streamer(tmp_path, max_bytes=3 * CHUNK)
+    b"".join(streamer.iter_range("c/v.webm", 0, len(BLOB) - 1))
+    stats = streamer.cache.stats()
+    assert stats["bytes"] <= 3 * CHUNK
+    assert stats["entries"] == 3
+    assert len(list((tmp_path / "chunks").iterdir())) == 3
+    # Least recently used chunks went first
+    assert streamer.cache.get(("c/v.webm@1024", 9)) is not None
+    assert streamer.cache.get(("c/v.webm@1024", 0)) is None
+
+
+@pytest.fixture
+def stream_client(tmp_path, monkeypatch):
+    streamer, storage = make_streamer(tmp_path)
+    monkeypatch.setattr(video, "_video_streamer", streamer)
+    return TestClient(main.app), storage
+
+
+AUTH = {"Authorization": "Bearer token"}
+
+
+def test_endpoint_serves_partial_content(stream_client):
+    http, _ = stream_client
+    res = http.get("/video/stream/user_id/v.webm", headers={**AUTH, "Range": "bytes=1000-2999"})
+    assert res.status_code == 206
+    assert res.content == BLOB[1000:3000]
+    assert res.headers["content-range"] == f"bytes 1000-2999/{len(BLOB)}"
+    assert res.headers["content-length"] == "2000"
+    assert res.headers["accept-ranges"] == "bytes"
+    assert res.headers["content-type"] == "video/webm"
+
+
+def test_endpoint_full_and_suffix_ranges(stream_client):
+    http, _ = stream_client
+    full = http.get("/video/stream/user_id/v.webm", params={"token": "token"})
+    assert full.status_code == 200
+    assert full.content == BLOB
+    tail = http.get("/video/stream/user_id/v.webm", headers={**AUTH, "Range": "bytes=-100"})
+    assert tail.status_code == 206
+    assert tail.content == BLOB[-100:]
+
+
+def test_endpoint_unsatisfiable_and_missing(stream_client):
+    http, _ = stream_client
+    res = http.get("/video/stream/user_id/v.webm", headers={**AUTH, "Range": f"bytes={len(BLOB)}-"})
+    assert res.status_code == 416
+    assert res.headers["content-range"] == f"bytes */{len(BLOB)}"
+    assert http.get("/video/stream/user_id/missing.webm", headers=AUTH).status_code == 404
+
+
+def test_candidates_only_stream_their_own_videos(stream_client):
+    http, storage = stream_client
+    assert http.get("/video/stream/someone-else/v.webm", headers=AUTH).status_code == 403
+    assert http.get("/video/stream/user_id/v.webm").status_code == 401
+    assert storage.requests == []
+
+
+def test_recruiters_only_stream_their_applicants_videos(stream_client, monkeypatch):
+    from services.video_service import VideoService
+    from test_video_service import make_client
+
+    http, storage = stream_client
+    client = make_client()
+    monkeypatch.setattr(video, "_video_service", VideoService(client))
+    monkeypatch.setattr(video, "get_user_from_bearer", lambda token: {"id": "rec-1", "role": "recruiter"})
+
+    # c1 answered questions for rec-1's job; c3 only applied to someone else's
+    assert http.get("/video/stream/c1/q1.webm", headers=AUTH).status_code == 200
+    assert http.get("/video/stream/c1/q1.webm", headers={**AUTH, "Range": "bytes=0-99"}).status_code == 206
+    assert client.calls.count(("candidate_videos", "rpc")) == 1
+    assert http.get("/video/stream/c3/general.webm", headers=AUTH).status_code == 403
+    assert http.get("/video/stream/c1/not-a-video.webm", headers=AUTH).status_code == 403
+    assert http.get("/video/stream/stray.webm", headers=AUTH).status_code == 403
+
+    monkeypatch.setattr(video, "get_user_from_bearer", lambda token: {"id": "x", "role": "admin"})
+    assert http.get("/video/stream/c1/q1.webm", headers=AUTH).status_code == 403
+
+
+def test_paths_with_dot_segments_are_rejected(stream_client):
+    http, storage = stream_client
+    for path in ("user_id/%2E%2E/someone-else/v.webm", "user_id/%2E/v.webm", "user_id/%2E%2E%2Fsomeone-else%2Fv.webm"):
+        assert http.get(f"/video/stream/{path}", headers=AUTH).status_code == 400
+    assert storage.requests == []
+
+
+def test_unsignable_object_is_not_found(tmp_path, monkeypatch):
+    from services.video_service import VideoService
+    from test_utils import FakeSupabase
+
+    client = FakeSupabase()
+    # Storage leaves out paths it cannot sign, e.g. deleted objects
+    monkeypatch.setattr(type(client.storage.from_("videos")), "create_signed_urls", lambda self, paths, expires_in, options=None: [])
+    monkeypatch.setenv("VIDEO_CHUNK_CACHE_DIR", str(tmp_path / "chunks"))
+    monkeypatch.setattr(video, "_video_service", VideoService(client))
+    monkeypatch.setattr(video, "_video_streamer", None)
+    assert TestClient(main.app).get("/video/stream/user_id/gone.webm", headers=AUTH).status_code == 404
+
+
+def test_signing_failure_is_a_bad_gateway(tmp_path, monkeypatch):
+    def failing_sign(path):
+        raise RuntimeError("storage unavailable")
+
+    streamer, storage = make_streamer(tmp_path, sign=failing_sign)
+    monkeypatch.setattr(video, "_video_streamer", streamer)
+    assert TestClient(main.app).get("/video/stream/user_id/v.webm", headers=AUTH).status_code == 502
+    assert storage.requests == []
@@ -1,128 +1,149 @@
-from typing import Dict, Any
-from pathlib import Path
+import logging
 import os
-from jinja2 import Environment, FileSystemLoader
+import stat
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+LOGIN_URL = "https://login.skreenit.com/login.html"
+
+logger = logging.getLogger(__name__)
+
+_env: Optional[Environment] = None
+_env_lock = threading.Lock()
+
+def _private_directory(directory: str) -> bool:
+    """Create directory as 0700 if needed; only use it if we own it and nobody else can write to it."""
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """
+    Compiled template cache shared across workers/restarts. Cached bytecode is
+    executed, so the directory must be private to this user: by default Jinja's
+    per-user 0700 temp directory, or EMAIL_TEMPLATE_CACHE_DIR if it passes the
+    same checks. EMAIL_TEMPLATE_CACHE_DIR="" disables the cache.
+    """
+    directory = os.getenv("EMAIL_TEMPLATE_CACHE_DIR")
+    if directory == "":
+        return None
+    if directory is None:
+        try:
+            return FileSystemBytecodeCache()
+        except RuntimeError as e:
+            logger.warning(f"Email template bytecode cache disabled: {e}")
+            return None
+    if not _private_directory(directory):
+        logger.warning(f"Email template bytecode cache disabled: {directory} is not a private directory")
+        return None
+    return FileSystemBytecodeCache(directory)
+
+def get_environment() -> Environment:
+    """
+    The shared Jinja2 environment. Built on first use; templates are compiled
+    once and kept in memory, and auto_reload is off so renders never stat the
+    template files.
+    """
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                _env = Environment(
+                    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+                    autoescape=select_autoescape(["html"]),
+                    bytecode_cache=_bytecode_cache(),
+                    auto_reload=False,
+                    cache_size=100,
+                )
+    return _env
+
+def get_template(template_name: str) -> Template:
+    return get_environment().get_template(template_name)
+
+def render(template_name: str, /, **context: Any) -> str:
+    return get_template(template_name).render(**context)
+
+def render_many(template_name: str, contexts: Iterable[Dict[str, Any]]) -> List[str]:
+    """Render one template for many recipients, looking it up once."""
+    template = get_template(template_name)
+    return [template.render(**ctx) for ctx in contexts]
 
 class EmailTemplates:
     def __init__(self):
-        template_dir = Path(__file__).parent / 'templates'
-        self.env = Environment(loader=FileSystemLoader(str(template_dir)))
-        
+        self.env = get_environment()
+
     def registration_confirmation(self, user_data: Dict[str, Any]) -> str:
         """Generate registration confirmation email"""
-        template = self.env.get_template('registration_confirmation.html')
-        return template.render(
+        return render(
+            'registration_confirmation.html',
             name=user_data['full_name'],
             role=user_data['role'],
-            login_url='https://login.skreenit.com/login.html'
+            login_url=LOGIN_URL
         )
-        
+
     def recruiter_welcome(self, user_data: Dict[str, Any]) -> str:
         """Generate recruiter welcome email with company ID"""
-        template = self.env.get_template('recruiter_welcome.html')
-        return template.render(
+        return render(
+            'recruiter_welcome.html',
             name=user_data['full_name'],
             email=user_data['email'],
             company_id=user_data['company_id'],
-            login_url='https://login.skreenit.com/login.html'
+            login_url=LOGIN_URL
         )
-        
+
     def password_reset(self, user_data: Dict[str, Any]) -> str:
         """Generate password reset email"""
-        template = self.env.get_template('password_reset.html')
-        return template.render(
+        return render(
+            'password_reset.html',
             name=user_data['full_name'],
             reset_url=user_data['reset_url']
         )
-        
+
     def password_updated(self, user_data: Dict[str, Any]) -> str:
         """Generate password updated confirmation email"""
-        template = self.env.get_template('password_updated.html')
-        return template.render(
+        return render(
+            'password_updated.html',
+            name=user_data['full_name'],
+            login_url=LOGIN_URL
+        )
+
+    def welcome(self, user_data: Dict[str, Any]) -> str:
+        """Generate the post-registration welcome email (company ID shown for recruiters)"""
+        return render(
+            'welcome.html',
             name=user_data['full_name'],
-            login_url='https://login.skreenit.com/login.html'
+            email=user_data['email'],
+            company_id=user_data.get('company_id'),
+            login_url=user_data.get('login_url') or LOGIN_URL
+        )
+
+    def password_changed(self, user_data: Dict[str, Any]) -> str:
+        """Generate the security notice sent after a password change"""
+        return render('password_changed.html', name=user_data['full_name'])
+
+    def recruiter_company(self, user_data: Dict[str, Any]) -> str:
+        """Generate the recruiter company ID email"""
+        return render(
+            'recruiter_company.html',
+            name=user_data.get('full_name') or '',
+            company_id=user_data['company_id'],
+            company_name=user_data.get('company_name') or 'Your Company'
         )
 
-# Create email templates directory and files
-template_dir = Path('backend/utils_others/templates')
-template_dir.mkdir(exist_ok=True)
-
-# Registration confirmation template
-registration_template = """
-<!DOCTYPE html>
-<html>
-<body>
-    <h2>Welcome to Skreenit!</h2>
-    <p>Dear {{ name }},</p>
-    <p>Thank you for registering with Skreenit as a {{ role }}.</p>
-    <p>Please click the verification link in your email to confirm your address and set up your password.</p>
-    <p>After verification, you can login here:</p>
-    <p><a href="{{ login_url }}">{{ login_url }}</a></p>
-    <p>Best regards,<br>The Skreenit Team</p>
-</body>
-</html>
-"""
-
-# Recruiter welcome template
-recruiter_template = """
-<!DOCTYPE html>
-<html>
-<body>
-    <h2>Welcome to Skreenit!</h2>
-    <p>Dear {{ name }},</p>
-    <p>Your recruiter account has been created successfully.</p>
-    <p><strong>Important Information:</strong></p>
-    <ul>
-        <li><strong>Login Email:</strong> {{ email }}</li>
-        <li><strong>Company ID:</strong> {{ company_id }}</li>
-    </ul>
-    <p>You'll need your Company ID for future logins.</p>
-    <p>Please click the verification link in your email to confirm your address and set up your password.</p>
-    <p>After verification, you can login here:</p>
-    <p><a href="{{ login_url }}">{{ login_url }}</a></p>
-    <p>Best regards,<br>The Skreenit Team</p>
-</body>
-</html>
-"""
-
-# Password reset template
-password_reset_template = """
-<!DOCTYPE html>
-<html>
-<body>
-    <h2>Reset Your Password</h2>
-    <p>Dear {{ name }},</p>
-    <p>We received a request to reset your password. Click the link below to create a new password:</p>
-    <p><a href="{{ reset_url }}">Reset Password</a></p>
-    <p>If you didn't request this change, please ignore this email.</p>
-    <p>Best regards,<br>The Skreenit Team</p>
-</body>
-</html>
-"""
-
-# Password updated template
-password_updated_template = """
-<!DOCTYPE html>
-<html>
-<body>
-    <h2>Password Updated Successfully</h2>
-    <p>Dear {{ name }},</p>
-    <p>Your password has been updated successfully.</p>
-    <p>You can now login with your new password here:</p>
-    <p><a href="{{ login_url }}">{{ login_url }}</a></p>
-    <p>Best regards,<br>The Skreenit Team</p>
-</body>
-</html>
-"""
-
-# Save templates
-templates = {
-    'registration_confirmation.html': registration_template,
-    'recruiter_welcome.html': recruiter_template,
-    'password_reset.html': password_reset_template,
-    'password_updated.html': password_updated_template
-}
-
-for filename, content in templates.items():
-    with open(template_dir / filename, 'w') as f:
-        f.write(content)
\ No newline at end of file
+    def application_status(self, user_data: Dict[str, Any]) -> str:
+        """Generate the application status update sent to a candidate"""
+        return render(
+            'application_status.html',
+            name=user_data.get('full_name') or '',
+            job_title=user_data.get('job_title') or 'your application',
+            company_name=user_data.get('company_name'),
+            status_label=user_data['status_label'],
+            message=user_data.get('message'),
+            login_url=LOGIN_URL
+        )
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
 from supabase import Client
 
 def upload_to_bucket(
@@ -29,3 +30,35 @@ def create_signed_url(
     if not url:
         raise Exception("Failed to create signed URL")
     return url
+
+def create_signed_urls(
+    client: Client,
+    bucket: str,
+    paths: List[str],
+    expire_seconds: int = 3600
+) -> Dict[str, str]:
+    """
+    Signs many objects in one storage request. Returns {path: signed URL};
+    paths the storage API could not sign are left out.
+    """
+    if not paths:
+        return {}
+    items = client.storage.from_(bucket).create_signed_urls(paths, expire_seconds)
+    out: Dict[str, str] = {}
+    for item in items or []:
+        url = item.get("signedURL") or item.get("signedUrl")
+        if item.get("path") and url and not item.get("error"):
+            out[item["path"]] = url
+    return out
+
+def storage_path_from_url(url: str, bucket: str) -> str:
+    """
+    Object path inside `bucket` for a stored URL: public or signed storage
+    URLs are reduced to the path, bare paths are returned unchanged.
+    """
+    parsed = urlparse(url)
+    path = unquote(parsed.path) if parsed.scheme else url
+    for marker in (f"/object/public/{bucket}/", f"/object/sign/{bucket}/", f"/object/authenticated/{bucket}/"):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path.lstrip("/")
@@ -0,0 +1,75 @@
+import hashlib
+import math
+from typing import Iterable, Union
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch (Flajolet et al. 2007) over a 64-bit hash.
+
+    With precision p the sketch has m = 2**p one-byte registers and a relative
+    standard error of about 1.04 / sqrt(m): p=12 (4 KiB) gives ~1.6%, so ~95% of
+    estimates fall within ±3.25% of the true count. Small cardinalities use
+    linear counting, which is close to exact. Sketches with the same precision
+    merge losslessly (register-wise max), so per-day sketches can be combined
+    into any date range without rescanning events.
+    """
+
+    def __init__(self, precision: int = 12, registers: Union[bytes, bytearray, None] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is not None and len(registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, value: Union[str, bytes]) -> None:
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        h = int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+        index = h >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        w = h & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - w.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[Union[str, bytes]]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        m = self.m
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        # 64-bit hashes make the large-range correction unnecessary
+        return int(round(estimate))
+
+    def is_empty(self) -> bool:
+        return not any(self.registers)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(precision=int(math.log2(len(data))), registers=data)
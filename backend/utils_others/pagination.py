@@ -0,0 +1,53 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for keyset pagination."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str], keys: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Values of a cursor made by encode_cursor/split_page. Every key in keys must
+    be present with a string or number value; anything else raises ValueError.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    for key in keys:
+        value = values.get(key)
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError("Invalid cursor")
+    return values
+
+def keyset_filter(column: str, value: Any, tie_column: str, tie_value: Any, descending: bool = True) -> str:
+    """
+    PostgREST `or` expression selecting rows strictly after (value, tie_value)
+    in (column, tie_column) order, e.g. for use with `.or_(...)`.
+    """
+    op = "lt" if descending else "gt"
+    v, t = _quote(value), _quote(tie_value)
+    return f"{column}.{op}.{v},and({column}.eq.{v},{tie_column}.{op}.{t})"
+
+def split_page(rows: List[Dict[str, Any]], limit: int, keys: Tuple[str, ...]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Given up to limit + 1 rows, return the page and the cursor for the next one
+    (None when this is the last page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor({k: last.get(k) for k in keys})
+
+def _quote(value: Any) -> str:
+    # Timestamps contain ':' and '+', which PostgREST only accepts inside double quotes
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
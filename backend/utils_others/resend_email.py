@@ -1,10 +1,155 @@
 import os
-from typing import List, Union, Optional
+import threading
+from typing import Any, Dict, List, Union, Optional
+import httpx
+from utils_others.rate_limit import KeyedRateLimiter
+
+# Resend accepts at most 100 messages per /emails/batch call
+RESEND_BATCH_LIMIT = 100
 
 class EmailError(Exception):
     """Custom exception for email sending errors."""
     pass
 
+def get_sender_address(email_type: str = "default") -> str:
+    """Sender address for an email type ("welcome", "verification", "info", "support", "noreply")."""
+    email_senders = {
+        "welcome": os.getenv("EMAIL_WELCOME", "welcome@skreenit.com"),
+        "verification": os.getenv("EMAIL_VERIFICATION", "verification@skreenit.com"),
+        "info": os.getenv("EMAIL_INFO", "info@skreenit.com"),
+        "support": os.getenv("EMAIL_SUPPORT", "support@skreenit.com"),
+        "noreply": os.getenv("EMAIL_NOREPLY", "do-not-reply@skreenit.com"),
+        "default": os.getenv("EMAIL_FROM", "info@skreenit.com")
+    }
+    return email_senders.get(email_type, email_senders["default"])
+
+class ResendMailer:
+    """
+    Resend client that keeps one pooled HTTP session, groups messages into
+    /emails/batch calls and throttles each sender address with a token bucket
+    (one token per API call), so bulk sends stay under the provider's limits.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rate_per_sender: float = 2.0,
+        burst_per_sender: float = 2.0,
+        timeout: float = 15.0,
+    ):
+        self.api_key = api_key or os.getenv("RESEND_API_KEY")
+        self.base_url = (base_url or os.getenv("RESEND_API_URL", "https://api.resend.com")).rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = KeyedRateLimiter(rate_per_sender, burst_per_sender)
+        self._http: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    @property
+    def http(self) -> httpx.Client:
+        if self._http is None:
+            if not self.api_key:
+                raise EmailError("Missing RESEND_API_KEY")
+            with self._lock:
+                if self._http is None:
+                    self._http = httpx.Client(
+                        base_url=self.base_url,
+                        timeout=self.timeout,
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                    )
+        return self._http
+
+    def _post(self, path: str, payload: Any) -> Dict[str, Any]:
+        try:
+            res = self.http.post(path, json=payload)
+        except httpx.HTTPError as e:
+            raise EmailError(f"Resend request failed: {e}")
+        try:
+            body = res.json()
+        except ValueError:
+            body = {}
+        if res.status_code >= 400:
+            message = body.get("message") if isinstance(body, dict) else None
+            raise EmailError(f"Resend error {res.status_code}: {message or res.text}")
+        return body
+
+    @staticmethod
+    def _message(
+        to: Union[str, List[str]],
+        subject: str,
+        html: str,
+        from_addr: Optional[str] = None,
+        email_type: str = "default",
+    ) -> Dict[str, Any]:
+        return {
+            "from": from_addr or get_sender_address(email_type),
+            "to": [to] if isinstance(to, str) else list(to),
+            "subject": subject,
+            "html": html,
+        }
+
+    def send(
+        self,
+        to: Union[str, List[str]],
+        subject: str,
+        html: str,
+        from_addr: Optional[str] = None,
+        email_type: str = "default",
+    ) -> Dict[str, Any]:
+        message = self._message(to, subject, html, from_addr, email_type)
+        self.rate_limiter.acquire(message["from"])
+        return self._post("/emails", message)
+
+    def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many messages (dicts with to/subject/html and from_addr or
+        email_type). Returns one result per input, in order: {"id": ...} on
+        success or {"error": ...} when its batch call failed.
+        """
+        results: List[Dict[str, Any]] = [{} for _ in messages]
+        by_sender: Dict[str, List[int]] = {}
+        prepared = []
+        for i, msg in enumerate(messages):
+            payload = self._message(
+                msg["to"], msg["subject"], msg["html"],
+                msg.get("from_addr"), msg.get("email_type") or "default",
+            )
+            prepared.append(payload)
+            by_sender.setdefault(payload["from"], []).append(i)
+
+        for sender, indexes in by_sender.items():
+            for start in range(0, len(indexes), RESEND_BATCH_LIMIT):
+                chunk = indexes[start:start + RESEND_BATCH_LIMIT]
+                self.rate_limiter.acquire(sender)
+                try:
+                    body = self._post("/emails/batch", [prepared[i] for i in chunk])
+                    ids = body.get("data") or []
+                    for pos, i in enumerate(chunk):
+                        results[i] = ids[pos] if pos < len(ids) else {"error": "Missing id in batch response"}
+                except EmailError as e:
+                    for i in chunk:
+                        results[i] = {"error": str(e)}
+        return results
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+_mailer: Optional[ResendMailer] = None
+_mailer_lock = threading.Lock()
+
+def get_mailer() -> ResendMailer:
+    global _mailer
+    if _mailer is None:
+        with _mailer_lock:
+            if _mailer is None:
+                _mailer = ResendMailer(
+                    rate_per_sender=float(os.getenv("EMAIL_RATE_PER_SENDER", "2")),
+                    burst_per_sender=float(os.getenv("EMAIL_BURST_PER_SENDER", "2")),
+                )
+    return _mailer
+
 def send_email(
     to: Union[str, List[str]],
     subject: str,
@@ -19,38 +164,4 @@ def send_email(
     Args:
         email_type: Type of email ("welcome", "verification", "info", "support", "noreply")
     """
-    try:
-        import resend
-    except Exception as e:
-        raise EmailError(f"Resend import failed: {e}")
-
-    api_key = os.getenv("RESEND_API_KEY")
-    if not api_key:
-        raise EmailError("Missing RESEND_API_KEY")
-
-    resend.api_key = api_key
-
-    if isinstance(to, str):
-        to = [to]
-
-    # Use different sender addresses based on email type
-    if from_addr is None:
-        email_senders = {
-            "welcome": os.getenv("EMAIL_WELCOME", "welcome@skreenit.com"),
-            "verification": os.getenv("EMAIL_VERIFICATION", "verification@skreenit.com"),
-            "info": os.getenv("EMAIL_INFO", "info@skreenit.com"),
-            "support": os.getenv("EMAIL_SUPPORT", "support@skreenit.com"),
-            "noreply": os.getenv("EMAIL_NOREPLY", "do-not-reply@skreenit.com"),
-            "default": os.getenv("EMAIL_FROM", "info@skreenit.com")
-        }
-        from_addr = email_senders.get(email_type, email_senders["default"])
-
-    try:
-        return resend.Emails.send({
-            "from": from_addr,
-            "to": to,
-            "subject": subject,
-            "html": html,
-        })
-    except Exception as e:
-        raise EmailError(str(e))
+    return get_mailer().send(to, subject, html, from_addr=from_addr, email_type=email_type)
@@ -0,0 +1,119 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SKILLS_FILE = Path(__file__).parent / "data" / "skills.json"
+MAX_SUGGESTIONS = 20
+
+_WS = re.compile(r"\s+")
+_PUNCT = re.compile(r"[\s.\-_/]+")
+
+def clean_skill(name: Optional[str]) -> str:
+    """Trim and collapse internal whitespace; casing is kept."""
+    return _WS.sub(" ", name or "").strip()
+
+def lookup_key(name: str) -> str:
+    """Case-, space- and punctuation-insensitive key: 'Node.js', 'node js' and 'NodeJS' all match."""
+    return _PUNCT.sub("", clean_skill(name).lower())
+
+class SkillTrie:
+    """
+    Prefix index over skill names and aliases. Every node keeps its best
+    MAX_SUGGESTIONS completions precomputed, so a lookup is one walk down the
+    prefix with no subtree traversal.
+    """
+
+    def __init__(self, max_suggestions: int = MAX_SUGGESTIONS):
+        self.max_suggestions = max_suggestions
+        self._root: Dict = {"c": {}, "top": []}
+
+    def insert(self, term: str, canonical: str, rank: int) -> None:
+        """Index term (lowercased) as a way to reach canonical; lower rank sorts first."""
+        node = self._root
+        for ch in clean_skill(term).lower():
+            node = node["c"].setdefault(ch, {"c": {}, "top": []})
+            self._offer(node, canonical, rank)
+        if node is not self._root and node.get("exact", (rank + 1,))[0] > rank:
+            node["exact"] = (rank, canonical)
+
+    def _offer(self, node: Dict, canonical: str, rank: int) -> None:
+        top: List[Tuple[int, str]] = node["top"]
+        for i, (r, name) in enumerate(top):
+            if name == canonical:
+                if rank >= r:
+                    return
+                del top[i]
+                break
+        top.append((rank, canonical))
+        top.sort()
+        del top[self.max_suggestions:]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        node = self._root
+        for ch in clean_skill(prefix).lower():
+            node = node["c"].get(ch)
+            if node is None:
+                return []
+        names = [name for _, name in node["top"]]
+        if "exact" in node:
+            # A full term match ("c", "go", "r") leads even if it is less common
+            exact = node["exact"][1]
+            names = [exact] + [n for n in names if n != exact]
+        return names[:limit]
+
+class SkillTaxonomy:
+    """Canonical skill names with aliases: normalization on write and autocomplete."""
+
+    def __init__(self, entries: Iterable[Dict]):
+        self.canonical: List[str] = []
+        self._by_key: Dict[str, str] = {}
+        self.trie = SkillTrie()
+        entries = list(entries)
+        count = len(entries)
+        for rank, entry in enumerate(entries):
+            name = clean_skill(entry["name"])
+            self.canonical.append(name)
+            self._by_key[lookup_key(name)] = name
+            self.trie.insert(name, name, rank)
+            for alias in entry.get("aliases") or []:
+                self._by_key.setdefault(lookup_key(alias), name)
+                self.trie.insert(alias, name, rank)
+            # Later words too, so "learn" suggests "Machine Learning" (after direct prefix hits)
+            words = name.split(" ")
+            for i in range(1, len(words)):
+                self.trie.insert(" ".join(words[i:]), name, count + rank)
+
+    @classmethod
+    def from_file(cls, path: Path = SKILLS_FILE) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def canonical_name(self, name: Optional[str]) -> Optional[str]:
+        """The dictionary name for a known skill or alias, else None."""
+        return self._by_key.get(lookup_key(name or ""))
+
+    def normalize(self, name: Optional[str]) -> str:
+        """Canonical name when known; otherwise the cleaned input, so unknown skills are still stored consistently."""
+        cleaned = clean_skill(name)
+        return self.canonical_name(cleaned) or cleaned
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        if not clean_skill(prefix):
+            return []
+        return self.trie.complete(prefix, min(limit, self.trie.max_suggestions))
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_taxonomy_lock = threading.Lock()
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = SkillTaxonomy.from_file()
+    return _taxonomy
+
+def normalize_skill(name: Optional[str]) -> str:
+    return get_skill_taxonomy().normalize(name)
@@ -0,0 +1,323 @@
+"""
+Container-level metadata for uploaded videos (MP4/MOV and WebM/Matroska).
+
+Only box/element headers are read and everything else is skipped with seek(),
+so probing a large upload costs a few small reads rather than a decode.
+"""
+import io
+import struct
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+class VideoProbeError(Exception):
+    """Raised when a file looks like a supported container but its headers are corrupt."""
+    pass
+
+MP4_CODECS = {
+    "avc1": "h264", "avc3": "h264",
+    "hvc1": "hevc", "hev1": "hevc",
+    "vp09": "vp9", "av01": "av1",
+    "mp4v": "mpeg4",
+}
+MATROSKA_CODECS = {
+    "V_VP8": "vp8", "V_VP9": "vp9", "V_AV1": "av1",
+    "V_MPEG4/ISO/AVC": "h264", "V_MPEGH/ISO/HEVC": "hevc",
+}
+
+def _empty(container: Optional[str] = None) -> Dict[str, Any]:
+    return {"container": container, "duration": None, "width": None, "height": None, "codec": None}
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise VideoProbeError("Unexpected end of file")
+    return data
+
+def _stream_size(f: BinaryIO) -> int:
+    pos = f.tell()
+    end = f.seek(0, io.SEEK_END)
+    f.seek(pos)
+    return end
+
+# MP4 / ISO BMFF
+
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+def _mp4_boxes(f: BinaryIO, start: int, end: int):
+    """Yield (type, payload_start, payload_end) for the boxes in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box_type = struct.unpack(">I4s", _read_exact(f, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", _read_exact(f, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            raise VideoProbeError(f"Invalid MP4 box size for {box_type!r}")
+        if pos + size > end:
+            raise VideoProbeError(f"Truncated MP4 box {box_type!r}")
+        yield box_type, pos + header, pos + size
+        pos += size
+
+def _probe_mp4(f: BinaryIO, end: int) -> Dict[str, Any]:
+    info = _empty("mp4")
+    for box_type, start, stop in _mp4_boxes(f, 0, end):
+        if box_type == b"ftyp":
+            f.seek(start)
+            if f.read(4) == b"qt  ":
+                info["container"] = "mov"
+        elif box_type == b"moov":
+            _probe_moov(f, start, stop, info)
+            break  # moov may sit after mdat; _mp4_boxes seeks past mdat without reading it
+    return info
+
+def _probe_moov(f: BinaryIO, start: int, stop: int, info: Dict[str, Any]) -> None:
+    for box_type, b_start, b_stop in _mp4_boxes(f, start, stop):
+        if box_type == b"mvhd":
+            f.seek(b_start)
+            version = _read_exact(f, 4)[0]
+            if version == 1:
+                timescale, duration = struct.unpack(">16xIQ", _read_exact(f, 28))
+            else:
+                timescale, duration = struct.unpack(">8xII", _read_exact(f, 16))
+            if timescale:
+                info["duration"] = duration / timescale
+        elif box_type == b"trak" and info["codec"] is None:
+            track: Dict[str, Any] = {}
+            _probe_trak(f, b_start, b_stop, track)
+            if track.get("handler") == b"vide":
+                info["codec"] = MP4_CODECS.get(track.get("format", ""), track.get("format"))
+                info["width"] = track.get("width") or track.get("entry_width")
+                info["height"] = track.get("height") or track.get("entry_height")
+
+def _probe_trak(f: BinaryIO, start: int, stop: int, track: Dict[str, Any]) -> None:
+    for box_type, b_start, b_stop in _mp4_boxes(f, start, stop):
+        if box_type in MP4_CONTAINERS:
+            _probe_trak(f, b_start, b_stop, track)
+        elif box_type == b"tkhd":
+            f.seek(b_start)
+            version = _read_exact(f, 4)[0]
+            # Skip to the 16.16 fixed-point width/height at the end of the box
+            f.seek(b_start + (84 if version == 1 else 72) + 4)
+            width, height = struct.unpack(">II", _read_exact(f, 8))
+            track["width"], track["height"] = width >> 16, height >> 16
+        elif box_type == b"hdlr":
+            f.seek(b_start + 8)
+            track["handler"] = _read_exact(f, 4)
+        elif box_type == b"stsd":
+            f.seek(b_start + 8)  # version/flags + entry_count
+            _, fmt = struct.unpack(">I4s", _read_exact(f, 8))
+            track["format"] = fmt.decode("latin-1").strip()
+            if track.get("handler") == b"vide":
+                f.seek(b_start + 8 + 8 + 24)  # reserved, data ref index, pre-defined
+                track["entry_width"], track["entry_height"] = struct.unpack(">HH", _read_exact(f, 4))
+
+# WebM / Matroska (EBML)
+
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+DOC_TYPE = 0x4282
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+# Elements that can only appear at Segment level; seeing one ends an unknown-size Cluster
+SEGMENT_CHILDREN = {0x114D9B74, INFO, TRACKS, CLUSTER, 0x1C53BB6B, 0x1043A770, 0x1254C367, 0x1941A469}
+UNKNOWN_SIZE = -1
+
+def _read_vint(f: BinaryIO, keep_marker: bool):
+    first = f.read(1)
+    if not first:
+        return None, 0
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not b & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise VideoProbeError("Invalid EBML variable-length integer")
+    value = b if keep_marker else b & (mask - 1)
+    rest = _read_exact(f, length - 1)
+    all_ones = (b & (mask - 1)) == mask - 1 and all(x == 0xFF for x in rest)
+    for x in rest:
+        value = (value << 8) | x
+    if not keep_marker and all_ones:
+        return UNKNOWN_SIZE, length
+    return value, length
+
+def _ebml_elements(f: BinaryIO, start: int, end: int):
+    """Yield (id, data_start, size) for elements in [start, end); size may be UNKNOWN_SIZE."""
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        element_id, id_len = _read_vint(f, keep_marker=True)
+        if element_id is None:
+            return
+        size, size_len = _read_vint(f, keep_marker=False)
+        if size is None:
+            return
+        data_start = pos + id_len + size_len
+        yield element_id, data_start, size
+        if size == UNKNOWN_SIZE:
+            return
+        pos = data_start + size
+
+def _read_uint(f: BinaryIO, start: int, size: int) -> int:
+    f.seek(start)
+    return int.from_bytes(_read_exact(f, size), "big") if size else 0
+
+def _read_float(f: BinaryIO, start: int, size: int) -> float:
+    f.seek(start)
+    if size == 4:
+        return struct.unpack(">f", _read_exact(f, 4))[0]
+    if size == 8:
+        return struct.unpack(">d", _read_exact(f, 8))[0]
+    raise VideoProbeError("Invalid EBML float size")
+
+def _read_string(f: BinaryIO, start: int, size: int) -> str:
+    f.seek(start)
+    return _read_exact(f, size).decode("ascii", "replace").rstrip("\x00")
+
+def _probe_matroska(f: BinaryIO, end: int) -> Dict[str, Any]:
+    info = _empty("matroska")
+    segment = None
+    for element_id, start, size in _ebml_elements(f, 0, end):
+        if element_id == EBML_HEADER:
+            for child_id, c_start, c_size in _ebml_elements(f, start, start + size):
+                if child_id == DOC_TYPE:
+                    info["container"] = _read_string(f, c_start, c_size)
+        elif element_id == SEGMENT:
+            segment = (start, end if size == UNKNOWN_SIZE else min(start + size, end))
+            break
+    if segment is None:
+        return info
+
+    timecode_scale = 1_000_000  # ns per tick (Matroska default)
+    duration_ticks = None
+    last_ticks = None
+    pos = segment[0]
+    while pos < segment[1]:
+        element = next(_ebml_elements(f, pos, segment[1]), None)
+        if element is None:
+            break
+        element_id, start, size = element
+        if element_id == INFO:
+            for child_id, c_start, c_size in _ebml_elements(f, start, start + size):
+                if child_id == TIMECODE_SCALE:
+                    timecode_scale = _read_uint(f, c_start, c_size)
+                elif child_id == DURATION:
+                    duration_ticks = _read_float(f, c_start, c_size)
+        elif element_id == TRACKS:
+            _probe_tracks(f, start, start + size, info)
+        elif element_id == CLUSTER and duration_ticks is None:
+            # Live recordings (e.g. MediaRecorder) omit Duration; derive it from
+            # the last block timestamp, reading block headers only.
+            cluster_end, cluster_last = _scan_cluster(f, start, size, segment[1])
+            if cluster_last is not None:
+                last_ticks = cluster_last if last_ticks is None else max(last_ticks, cluster_last)
+            pos = cluster_end
+            continue
+        elif element_id == CLUSTER:
+            # Duration already known and clusters come after Info/Tracks
+            break
+        if size == UNKNOWN_SIZE:
+            break
+        pos = start + size
+
+    ticks = duration_ticks if duration_ticks is not None else last_ticks
+    if ticks is not None:
+        info["duration"] = ticks * timecode_scale / 1e9
+    return info
+
+def _probe_tracks(f: BinaryIO, start: int, end: int, info: Dict[str, Any]) -> None:
+    for element_id, e_start, e_size in _ebml_elements(f, start, end):
+        if element_id != TRACK_ENTRY:
+            continue
+        track: Dict[str, Any] = {}
+        for child_id, c_start, c_size in _ebml_elements(f, e_start, e_start + e_size):
+            if child_id == TRACK_TYPE:
+                track["type"] = _read_uint(f, c_start, c_size)
+            elif child_id == CODEC_ID:
+                track["codec"] = _read_string(f, c_start, c_size)
+            elif child_id == VIDEO:
+                for v_id, v_start, v_size in _ebml_elements(f, c_start, c_start + c_size):
+                    if v_id == PIXEL_WIDTH:
+                        track["width"] = _read_uint(f, v_start, v_size)
+                    elif v_id == PIXEL_HEIGHT:
+                        track["height"] = _read_uint(f, v_start, v_size)
+        if track.get("type") == 1 and info["codec"] is None:
+            codec = track.get("codec")
+            info["codec"] = MATROSKA_CODECS.get(codec, codec)
+            info["width"] = track.get("width")
+            info["height"] = track.get("height")
+
+def _block_timecode(f: BinaryIO, start: int) -> int:
+    f.seek(start)
+    _read_vint(f, keep_marker=False)  # track number
+    return struct.unpack(">h", _read_exact(f, 2))[0]
+
+def _scan_cluster(f: BinaryIO, start: int, size: int, segment_end: int):
+    """Return (end offset, last block timestamp in ticks) for one cluster."""
+    end = segment_end if size == UNKNOWN_SIZE else min(start + size, segment_end)
+    cluster_time = 0
+    last = None
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        element_id, id_len = _read_vint(f, keep_marker=True)
+        if element_id is None:
+            return end, last
+        if size == UNKNOWN_SIZE and element_id in SEGMENT_CHILDREN:
+            return pos, last
+        child_size, size_len = _read_vint(f, keep_marker=False)
+        if child_size is None or child_size == UNKNOWN_SIZE:
+            return end, last
+        data_start = pos + id_len + size_len
+        if element_id == CLUSTER_TIMECODE:
+            cluster_time = _read_uint(f, data_start, child_size)
+        elif element_id == SIMPLE_BLOCK:
+            t = cluster_time + _block_timecode(f, data_start)
+            last = t if last is None else max(last, t)
+        elif element_id == BLOCK_GROUP:
+            for g_id, g_start, _ in _ebml_elements(f, data_start, data_start + child_size):
+                if g_id == BLOCK:
+                    t = cluster_time + _block_timecode(f, g_start)
+                    last = t if last is None else max(last, t)
+        pos = data_start + child_size
+    return end, last
+
+def probe_video(source: Union[bytes, bytearray, BinaryIO]) -> Dict[str, Any]:
+    """
+    Return {"container", "duration" (seconds, float), "width", "height",
+    "codec"} for an MP4/MOV or WebM/Matroska file; fields that cannot be
+    determined are None. File objects must be seekable and are left at
+    offset 0.
+    """
+    f = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    f.seek(0)
+    try:
+        head = f.read(12)
+        end = _stream_size(f)
+        if head[:4] == EBML_HEADER.to_bytes(4, "big"):
+            return _probe_matroska(f, end)
+        if head[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+            return _probe_mp4(f, end)
+        return _empty()
+    except struct.error as e:
+        raise VideoProbeError(f"Corrupt video header: {e}")
+    finally:
+        f.seek(0)
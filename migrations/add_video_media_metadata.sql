@@ -0,0 +1,13 @@
+-- Container metadata read from uploaded videos (utils_others/video_probe.py)
+ALTER TABLE public.video_responses
+  ADD COLUMN IF NOT EXISTS width INTEGER,
+  ADD COLUMN IF NOT EXISTS height INTEGER,
+  ADD COLUMN IF NOT EXISTS codec TEXT,
+  ADD COLUMN IF NOT EXISTS container TEXT;
+
+ALTER TABLE IF EXISTS public.general_video_interviews
+  ADD COLUMN IF NOT EXISTS duration INTEGER, -- seconds
+  ADD COLUMN IF NOT EXISTS width INTEGER,
+  ADD COLUMN IF NOT EXISTS height INTEGER,
+  ADD COLUMN IF NOT EXISTS codec TEXT,
+  ADD COLUMN IF NOT EXISTS container TEXT;
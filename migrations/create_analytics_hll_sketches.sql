@@ -0,0 +1,49 @@
+-- HyperLogLog sketches for approximate unique counts (e.g. unique viewers of a
+-- job per day). registers holds 2^12 one-byte registers (4 KiB) per row; see
+-- backend/utils_others/hyperloglog.py for the encoding and error bounds.
+CREATE TABLE IF NOT EXISTS public.analytics_hll_sketches (
+  metric TEXT NOT NULL,
+  subject_id TEXT NOT NULL,
+  day DATE NOT NULL,
+  registers BYTEA NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (metric, subject_id, day)
+);
+
+ALTER TABLE public.analytics_hll_sketches ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.analytics_hll_sketches TO service_role;
+
+-- Register-wise max of two sketches of equal precision
+CREATE OR REPLACE FUNCTION public.hll_merge_registers(a BYTEA, b BYTEA)
+RETURNS BYTEA AS $$
+DECLARE
+  merged BYTEA := a;
+  i INTEGER;
+BEGIN
+  IF a IS NULL THEN
+    RETURN b;
+  END IF;
+  IF length(a) <> length(b) THEN
+    RAISE EXCEPTION 'HLL precision mismatch (% vs % registers)', length(a), length(b);
+  END IF;
+  FOR i IN 0..length(b) - 1 LOOP
+    IF get_byte(b, i) > get_byte(merged, i) THEN
+      merged := set_byte(merged, i, get_byte(b, i));
+    END IF;
+  END LOOP;
+  RETURN merged;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Merge in-memory deltas from the API workers: rows is a JSON array of
+-- {metric, subject_id, day, registers (base64)}
+CREATE OR REPLACE FUNCTION public.merge_hll_sketches(p_rows JSONB)
+RETURNS VOID AS $$
+BEGIN
+  INSERT INTO public.analytics_hll_sketches AS s (metric, subject_id, day, registers)
+  SELECT x.metric, x.subject_id, x.day, decode(x.registers, 'base64')
+  FROM jsonb_to_recordset(p_rows) AS x(metric TEXT, subject_id TEXT, day DATE, registers TEXT)
+  ON CONFLICT (metric, subject_id, day)
+  DO UPDATE SET registers = public.hll_merge_registers(s.registers, EXCLUDED.registers), updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
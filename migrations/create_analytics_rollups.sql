@@ -0,0 +1,125 @@
+-- Hourly/daily event counts per (event_type, subject) so reports never scan analytics_events.
+-- subject_id is the job/application/related id taken from event_data ('' when absent).
+CREATE TABLE IF NOT EXISTS public.analytics_rollups (
+  granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day')),
+  bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  event_type TEXT NOT NULL,
+  subject_id TEXT NOT NULL DEFAULT '',
+  event_count BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (granularity, event_type, bucket_start, subject_id)
+);
+
+-- Series for a single subject (e.g. views of one job over time)
+CREATE INDEX IF NOT EXISTS idx_analytics_rollups_subject
+  ON public.analytics_rollups(granularity, event_type, subject_id, bucket_start);
+
+ALTER TABLE public.analytics_rollups ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.analytics_rollups TO service_role;
+
+-- Subject extraction shared by the rebuild job; keep in sync with
+-- services/analytics_service.py::rollup_subject; empty strings fall through
+-- to the next key like missing ones
+CREATE OR REPLACE FUNCTION public.analytics_event_subject(p_event_data JSONB)
+RETURNS TEXT AS $$
+  SELECT COALESCE(
+    NULLIF(p_event_data->>'job_id', ''),
+    NULLIF(p_event_data->>'application_id', ''),
+    NULLIF(p_event_data->>'related_id', ''),
+    ''
+  );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Incremental update from the ingestion path: rows is a JSON array of
+-- {granularity, bucket_start, event_type, subject_id, event_count}
+CREATE OR REPLACE FUNCTION public.increment_analytics_rollups(p_rows JSONB)
+RETURNS VOID AS $$
+BEGIN
+  INSERT INTO public.analytics_rollups AS r (granularity, bucket_start, event_type, subject_id, event_count)
+  SELECT x.granularity, x.bucket_start, x.event_type, COALESCE(x.subject_id, ''), x.event_count
+  FROM jsonb_to_recordset(p_rows) AS x(
+    granularity TEXT, bucket_start TIMESTAMP WITH TIME ZONE, event_type TEXT, subject_id TEXT, event_count BIGINT
+  )
+  ON CONFLICT (granularity, event_type, bucket_start, subject_id)
+  DO UPDATE SET event_count = r.event_count + EXCLUDED.event_count, updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute rollups for [p_since, p_until) from raw events. Used by the nightly
+-- reconciliation job and for backfilling after the table is first created.
+CREATE OR REPLACE FUNCTION public.rebuild_analytics_rollups(
+  p_since TIMESTAMP WITH TIME ZONE,
+  p_until TIMESTAMP WITH TIME ZONE
+)
+RETURNS VOID AS $$
+DECLARE
+  g TEXT;
+BEGIN
+  FOREACH g IN ARRAY ARRAY['hour', 'day'] LOOP
+    DELETE FROM public.analytics_rollups
+    WHERE granularity = g
+      AND bucket_start >= date_trunc(g, p_since)
+      AND bucket_start < p_until;
+
+    INSERT INTO public.analytics_rollups (granularity, bucket_start, event_type, subject_id, event_count)
+    SELECT g, date_trunc(g, e.created_at), e.event_type, public.analytics_event_subject(e.event_data), COUNT(*)
+    FROM public.analytics_events e
+    WHERE e.created_at >= date_trunc(g, p_since)
+      AND e.created_at < p_until
+    GROUP BY 1, 2, 3, 4;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Time series for one event type, optionally narrowed to a single subject
+CREATE OR REPLACE FUNCTION public.analytics_rollup_series(
+  p_event_type TEXT,
+  p_granularity TEXT,
+  p_since TIMESTAMP WITH TIME ZONE,
+  p_until TIMESTAMP WITH TIME ZONE,
+  p_subject_id TEXT DEFAULT NULL
+)
+RETURNS TABLE(bucket_start TIMESTAMP WITH TIME ZONE, event_count BIGINT) AS $$
+  SELECT r.bucket_start, SUM(r.event_count)::BIGINT
+  FROM public.analytics_rollups r
+  WHERE r.granularity = p_granularity
+    AND r.event_type = p_event_type
+    AND r.bucket_start >= p_since
+    AND r.bucket_start < p_until
+    AND (p_subject_id IS NULL OR r.subject_id = p_subject_id)
+  GROUP BY r.bucket_start
+  ORDER BY r.bucket_start;
+$$ LANGUAGE sql STABLE;
+
+-- Top-N subjects (e.g. most viewed jobs) over a time range
+CREATE OR REPLACE FUNCTION public.top_analytics_subjects(
+  p_event_type TEXT,
+  p_granularity TEXT,
+  p_since TIMESTAMP WITH TIME ZONE,
+  p_until TIMESTAMP WITH TIME ZONE,
+  p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE(subject_id TEXT, event_count BIGINT) AS $$
+  SELECT r.subject_id, SUM(r.event_count)::BIGINT AS event_count
+  FROM public.analytics_rollups r
+  WHERE r.granularity = p_granularity
+    AND r.event_type = p_event_type
+    AND r.bucket_start >= p_since
+    AND r.bucket_start < p_until
+    AND r.subject_id <> ''
+  GROUP BY r.subject_id
+  ORDER BY event_count DESC
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Nightly reconciliation of yesterday's buckets when pg_cron is available
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'analytics-rollups-reconcile',
+      '15 3 * * *',
+      $cron$SELECT public.rebuild_analytics_rollups(date_trunc('day', NOW()) - INTERVAL '1 day', date_trunc('day', NOW()))$cron$
+    );
+  END IF;
+END $$;
@@ -0,0 +1,39 @@
+-- Bulk status change for a recruiter's applications in one statement.
+-- Rows are locked, checked against the allowed source statuses and updated
+-- together; every owned application comes back with its previous status and
+-- whether it changed, so the caller can report per-row outcomes.
+-- Applications on other recruiters' jobs are simply not returned.
+CREATE OR REPLACE FUNCTION public.bulk_update_application_status(
+  p_recruiter_id UUID,
+  p_application_ids UUID[],
+  p_to_status TEXT,
+  p_allowed_from TEXT[]
+)
+RETURNS TABLE (
+  application_id UUID,
+  candidate_id UUID,
+  job_id UUID,
+  from_status TEXT,
+  updated BOOLEAN
+) AS $$
+  WITH target AS (
+    SELECT a.id, a.candidate_id, a.job_id, a.status::TEXT AS from_status
+    FROM public.job_applications a
+    JOIN public.jobs j ON j.id = a.job_id
+    WHERE a.id = ANY(p_application_ids)
+      AND j.created_by = p_recruiter_id
+    FOR UPDATE OF a
+  ),
+  changed AS (
+    UPDATE public.job_applications a
+    SET status = p_to_status::application_status,
+        updated_at = NOW()
+    FROM target t
+    WHERE a.id = t.id
+      AND t.from_status = ANY(p_allowed_from)
+    RETURNING a.id
+  )
+  SELECT t.id, t.candidate_id, t.job_id, t.from_status, c.id IS NOT NULL
+  FROM target t
+  LEFT JOIN changed c ON c.id = t.id;
+$$ LANGUAGE sql;
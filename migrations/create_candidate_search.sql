@@ -0,0 +1,94 @@
+-- Recruiter candidate search: free text over profile title/bio and skill
+-- names, boolean skill filters, experience range and location, ranked, with
+-- keyset pagination on (score, candidate_id).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Exact (case-insensitive) skill filters
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_name_lower
+  ON public.candidate_skills(lower(skill_name), candidate_id);
+-- Fuzzy / substring matches on skill names
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_name_trgm
+  ON public.candidate_skills USING GIN (lower(skill_name) gin_trgm_ops);
+-- Free text over title and bio; the expression must match search_candidates()
+CREATE INDEX IF NOT EXISTS idx_candidate_profiles_search_trgm
+  ON public.candidate_profiles USING GIN ((lower(coalesce(title, '') || ' ' || coalesce(bio, ''))) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_candidate_profiles_experience
+  ON public.candidate_profiles(experience_years);
+CREATE INDEX IF NOT EXISTS idx_users_location_trgm
+  ON public.users USING GIN (lower(location) gin_trgm_ops);
+
+-- Candidates must have every skill in p_all_skills, at least one of
+-- p_any_skills and none of p_exclude_skills (names compared
+-- case-insensitively). Score: word similarity of p_query to title/bio, plus
+-- 0.25 per requested skill the candidate has. The next page starts after
+-- (p_after_score, p_after_id) in (score DESC, candidate_id DESC) order.
+CREATE OR REPLACE FUNCTION public.search_candidates(
+  p_query TEXT DEFAULT NULL,
+  p_all_skills TEXT[] DEFAULT '{}',
+  p_any_skills TEXT[] DEFAULT '{}',
+  p_exclude_skills TEXT[] DEFAULT '{}',
+  p_min_experience INTEGER DEFAULT NULL,
+  p_max_experience INTEGER DEFAULT NULL,
+  p_location TEXT DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20,
+  p_after_score REAL DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  candidate_id UUID,
+  full_name TEXT,
+  location TEXT,
+  title TEXT,
+  experience_years INTEGER,
+  matched_skills TEXT[],
+  score REAL
+) AS $$
+  WITH params AS (
+    SELECT
+      NULLIF(lower(trim(p_query)), '') AS q,
+      ARRAY(SELECT lower(trim(s)) FROM unnest(COALESCE(p_all_skills, '{}')) s) AS all_skills,
+      ARRAY(SELECT lower(trim(s)) FROM unnest(COALESCE(p_any_skills, '{}')) s) AS any_skills,
+      ARRAY(SELECT lower(trim(s)) FROM unnest(COALESCE(p_exclude_skills, '{}')) s) AS exclude_skills,
+      NULLIF(lower(trim(p_location)), '') AS loc
+  ),
+  hits AS (
+    SELECT cs.candidate_id, array_agg(DISTINCT lower(cs.skill_name)) AS skills
+    FROM public.candidate_skills cs, params
+    WHERE lower(cs.skill_name) = ANY(params.all_skills || params.any_skills)
+    GROUP BY cs.candidate_id
+  ),
+  ranked AS (
+    SELECT
+      p.id AS candidate_id,
+      u.full_name,
+      u.location,
+      p.title,
+      p.experience_years,
+      COALESCE(h.skills, '{}') AS matched_skills,
+      (CASE WHEN params.q IS NULL THEN 0
+            ELSE word_similarity(params.q, lower(coalesce(p.title, '') || ' ' || coalesce(p.bio, ''))) END
+       + 0.25 * COALESCE(cardinality(h.skills), 0))::REAL AS score
+    FROM params
+    CROSS JOIN public.candidate_profiles p
+    LEFT JOIN public.users u ON u.id = p.id
+    LEFT JOIN hits h ON h.candidate_id = p.id
+    WHERE (cardinality(params.all_skills) = 0 OR h.skills @> params.all_skills)
+      AND (cardinality(params.any_skills) = 0 OR h.skills && params.any_skills)
+      AND (cardinality(params.exclude_skills) = 0 OR NOT EXISTS (
+            SELECT 1 FROM public.candidate_skills x
+            WHERE x.candidate_id = p.id AND lower(x.skill_name) = ANY(params.exclude_skills)))
+      AND (p_min_experience IS NULL OR p.experience_years >= p_min_experience)
+      AND (p_max_experience IS NULL OR p.experience_years <= p_max_experience)
+      AND (params.loc IS NULL OR lower(u.location) LIKE '%' || params.loc || '%')
+      AND (params.q IS NULL
+           OR params.q <% lower(coalesce(p.title, '') || ' ' || coalesce(p.bio, ''))
+           OR EXISTS (
+             SELECT 1 FROM public.candidate_skills y
+             WHERE y.candidate_id = p.id AND lower(y.skill_name) LIKE '%' || params.q || '%'))
+  )
+  SELECT candidate_id, full_name, location, title, experience_years, matched_skills, score
+  FROM ranked
+  WHERE p_after_score IS NULL OR (score, candidate_id) < (p_after_score, p_after_id)
+  ORDER BY score DESC, candidate_id DESC
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,118 @@
+-- One denormalized row per candidate with the headline fields applicant
+-- lists show, so a list page is a single indexed read instead of joins over
+-- profiles, skills, general videos and storage. Rows are recomputed by
+-- refresh_candidate_summary() whenever the backend saves the profile form,
+-- a resume or the general video.
+CREATE TABLE IF NOT EXISTS public.candidate_summaries (
+  candidate_id UUID PRIMARY KEY,
+  full_name TEXT,
+  location TEXT,
+  title TEXT,
+  experience_years INTEGER,
+  top_skills TEXT[] NOT NULL DEFAULT '{}',
+  skill_count INTEGER NOT NULL DEFAULT 0,
+  has_video BOOLEAN NOT NULL DEFAULT false,
+  video_status TEXT,
+  has_resume BOOLEAN NOT NULL DEFAULT false,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.candidate_summaries ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.candidate_summaries TO service_role;
+
+-- Applicant lists page newest first per job
+CREATE INDEX IF NOT EXISTS idx_applications_job_applied
+  ON public.job_applications(job_id, applied_at DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION public.refresh_candidate_summary(p_candidate_id UUID)
+RETURNS public.candidate_summaries AS $$
+  INSERT INTO public.candidate_summaries AS s (
+    candidate_id, full_name, location, title, experience_years,
+    top_skills, skill_count, has_video, video_status, has_resume, updated_at
+  )
+  SELECT
+    p_candidate_id,
+    u.full_name,
+    u.location,
+    p.title,
+    p.experience_years,
+    COALESCE(sk.top_skills, '{}'),
+    COALESCE(sk.skill_count, 0),
+    g.video_url IS NOT NULL,
+    g.status,
+    p.resume_url IS NOT NULL AND p.resume_url <> '',
+    NOW()
+  FROM (SELECT p_candidate_id AS id) c
+  LEFT JOIN public.users u ON u.id = c.id
+  LEFT JOIN public.candidate_profiles p ON p.id = c.id
+  LEFT JOIN public.general_video_interviews g ON g.candidate_id = c.id
+  LEFT JOIN LATERAL (
+    SELECT
+      (array_agg(skill_name ORDER BY years_experience DESC NULLS LAST, skill_name))[1:5] AS top_skills,
+      COUNT(*)::INTEGER AS skill_count
+    FROM public.candidate_skills
+    WHERE candidate_id = c.id
+  ) sk ON true
+  ON CONFLICT (candidate_id) DO UPDATE SET
+    full_name = EXCLUDED.full_name,
+    location = EXCLUDED.location,
+    title = EXCLUDED.title,
+    experience_years = EXCLUDED.experience_years,
+    top_skills = EXCLUDED.top_skills,
+    skill_count = EXCLUDED.skill_count,
+    has_video = EXCLUDED.has_video,
+    video_status = EXCLUDED.video_status,
+    has_resume = EXCLUDED.has_resume,
+    updated_at = EXCLUDED.updated_at
+  RETURNING s.*;
+$$ LANGUAGE sql;
+
+-- One page of a job's applicants with their summary, newest first.
+-- Keyset on (applied_at, id): pass the last row's values to get the next
+-- page. Returns nothing unless p_recruiter_id owns the job.
+CREATE OR REPLACE FUNCTION public.list_job_applicants(
+  p_job_id UUID,
+  p_recruiter_id UUID,
+  p_limit INTEGER DEFAULT 50,
+  p_after_applied_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_status TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  application_id UUID,
+  candidate_id UUID,
+  status TEXT,
+  ai_score INTEGER,
+  applied_at TIMESTAMP WITH TIME ZONE,
+  full_name TEXT,
+  location TEXT,
+  title TEXT,
+  experience_years INTEGER,
+  top_skills TEXT[],
+  skill_count INTEGER,
+  has_video BOOLEAN,
+  has_resume BOOLEAN
+) AS $$
+  SELECT
+    a.id, a.candidate_id, a.status::TEXT, a.ai_score, a.applied_at,
+    s.full_name, s.location, s.title, s.experience_years,
+    COALESCE(s.top_skills, '{}'), COALESCE(s.skill_count, 0),
+    COALESCE(s.has_video, false), COALESCE(s.has_resume, false)
+  FROM public.job_applications a
+  LEFT JOIN public.candidate_summaries s ON s.candidate_id = a.candidate_id
+  WHERE a.job_id = p_job_id
+    AND EXISTS (SELECT 1 FROM public.jobs j WHERE j.id = p_job_id AND j.created_by = p_recruiter_id)
+    AND (p_status IS NULL OR a.status::TEXT = p_status)
+    AND (p_after_applied_at IS NULL
+         OR (a.applied_at, a.id) < (p_after_applied_at, p_after_id))
+  ORDER BY a.applied_at DESC, a.id DESC
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Backfill existing candidates
+SELECT public.refresh_candidate_summary(c.id)
+FROM (
+  SELECT id FROM public.candidate_profiles
+  UNION
+  SELECT candidate_id FROM public.general_video_interviews WHERE candidate_id IS NOT NULL
+) c;
@@ -0,0 +1,44 @@
+-- All videos of one or more candidates in a single round trip.
+-- video_responses is keyed by application_id, so the lookup joins through
+-- job_applications(candidate_id) and picks up the general video by its
+-- unique candidate_id. Covering index so the join is an index-only scan.
+CREATE INDEX IF NOT EXISTS idx_applications_candidate_job
+  ON public.job_applications(candidate_id) INCLUDE (id, job_id);
+
+-- p_recruiter_id limits the result to applications for that recruiter's
+-- jobs; the general video is then returned only for candidates who applied
+-- to one of them. NULL returns everything (candidate viewing their own).
+CREATE OR REPLACE FUNCTION public.candidate_videos(
+  p_candidate_ids UUID[],
+  p_recruiter_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  candidate_id UUID,
+  videos JSONB,
+  general_video JSONB
+) AS $$
+  WITH apps AS (
+    SELECT a.id, a.job_id, a.candidate_id
+    FROM public.job_applications a
+    JOIN public.jobs j ON j.id = a.job_id
+    WHERE a.candidate_id = ANY(p_candidate_ids)
+      AND (p_recruiter_id IS NULL OR j.created_by = p_recruiter_id)
+  )
+  SELECT
+    c.candidate_id,
+    COALESCE((
+      SELECT jsonb_agg(to_jsonb(v) || jsonb_build_object('job_id', apps.job_id)
+                       ORDER BY v.recorded_at)
+      FROM apps
+      JOIN public.video_responses v ON v.application_id = apps.id
+      WHERE apps.candidate_id = c.candidate_id
+    ), '[]'::jsonb),
+    (
+      SELECT to_jsonb(g)
+      FROM public.general_video_interviews g
+      WHERE g.candidate_id = c.candidate_id
+        AND (p_recruiter_id IS NULL
+             OR EXISTS (SELECT 1 FROM apps WHERE apps.candidate_id = c.candidate_id))
+    )
+  FROM unnest(p_candidate_ids) AS c(candidate_id);
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,62 @@
+-- Transactional email outbox: requests insert a row, a background worker sends it.
+CREATE TABLE IF NOT EXISTS public.email_outbox (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  to_addrs TEXT[] NOT NULL,
+  subject TEXT NOT NULL,
+  html TEXT NOT NULL,
+  email_type TEXT NOT NULL DEFAULT 'default',
+  from_addr TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending'
+    CHECK (status IN ('pending', 'sending', 'sent', 'dead', 'cancelled')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 8,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  locked_by TEXT,
+  locked_until TIMESTAMP WITH TIME ZONE,
+  last_error TEXT,
+  provider_id TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  sent_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Workers only ever look at due pending rows and expired leases
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+  ON public.email_outbox(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_email_outbox_leased
+  ON public.email_outbox(locked_until) WHERE status = 'sending';
+
+ALTER TABLE public.email_outbox ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.email_outbox TO service_role;
+
+-- Lease up to p_limit due messages to one worker. SKIP LOCKED lets several
+-- workers poll concurrently; rows whose lease expired (crashed worker) are
+-- picked up again. attempts counts every lease, so a message that crashes the
+-- worker each time it is sent is dead-lettered once its last lease expires.
+CREATE OR REPLACE FUNCTION public.claim_email_outbox(
+  p_worker TEXT,
+  p_limit INTEGER DEFAULT 50,
+  p_lease_seconds INTEGER DEFAULT 120
+)
+RETURNS SETOF public.email_outbox AS $$
+  UPDATE public.email_outbox
+  SET status = 'dead',
+      locked_by = NULL,
+      locked_until = NULL,
+      last_error = 'Lease expired on the final attempt'
+  WHERE status = 'sending' AND locked_until < NOW() AND attempts >= max_attempts;
+
+  UPDATE public.email_outbox o
+  SET status = 'sending',
+      attempts = o.attempts + 1,
+      locked_by = p_worker,
+      locked_until = NOW() + make_interval(secs => p_lease_seconds)
+  WHERE o.id IN (
+    SELECT id FROM public.email_outbox
+    WHERE (status = 'pending' AND next_attempt_at <= NOW())
+       OR (status = 'sending' AND locked_until < NOW())
+    ORDER BY next_attempt_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING o.*;
+$$ LANGUAGE sql;
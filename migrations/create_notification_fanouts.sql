@@ -0,0 +1,26 @@
+-- Bulk notification fan-out: one row per fan-out job for progress and idempotency.
+CREATE TABLE IF NOT EXISTS public.notification_fanouts (
+  fanout_key TEXT PRIMARY KEY,
+  template JSONB NOT NULL,
+  audience JSONB NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+  total INTEGER NOT NULL DEFAULT 0,
+  sent INTEGER NOT NULL DEFAULT 0,
+  error TEXT,
+  created_by UUID REFERENCES public.users(id),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  completed_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE public.notification_fanouts ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.notification_fanouts TO service_role;
+
+CREATE TRIGGER update_notification_fanouts_updated_at BEFORE UPDATE ON public.notification_fanouts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Rows written by a fan-out carry its key; the unique pair makes re-running a
+-- chunk a no-op. NULLs are distinct, so ordinary notifications are unaffected.
+ALTER TABLE public.notifications ADD COLUMN IF NOT EXISTS fanout_key TEXT;
+ALTER TABLE public.notifications
+  ADD CONSTRAINT notifications_fanout_user_key UNIQUE (fanout_key, user_id);
@@ -0,0 +1,7 @@
+-- Keyset pagination of a user's inbox, newest first
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+  ON public.notifications(user_id, created_at DESC, id DESC);
+
+-- Cold-cache unread counts only touch unread rows
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+  ON public.notifications(user_id) WHERE is_read = false;
@@ -0,0 +1,127 @@
+-- Post-processing jobs for uploaded videos (thumbnails, transcripts, analysis).
+-- One row per (video, processor); workers lease rows and renew the lease
+-- with heartbeats while a processor runs.
+CREATE TABLE IF NOT EXISTS public.video_jobs (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  video_table TEXT NOT NULL CHECK (video_table IN ('video_responses', 'general_video_interviews')),
+  video_id UUID NOT NULL,
+  video_url TEXT NOT NULL,
+  processor TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending'
+    CHECK (status IN ('pending', 'running', 'completed', 'dead')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 5,
+  run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  locked_by TEXT,
+  locked_until TIMESTAMP WITH TIME ZONE,
+  result JSONB,
+  last_error TEXT,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  started_at TIMESTAMP WITH TIME ZONE,
+  finished_at TIMESTAMP WITH TIME ZONE,
+  UNIQUE (video_table, video_id, processor)
+);
+
+CREATE INDEX IF NOT EXISTS idx_video_jobs_due
+  ON public.video_jobs(run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_video_jobs_leased
+  ON public.video_jobs(locked_until) WHERE status = 'running';
+
+ALTER TABLE public.video_jobs ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.video_jobs TO service_role;
+
+ALTER TABLE public.video_responses ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
+ALTER TABLE IF EXISTS public.general_video_interviews ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
+ALTER TABLE IF EXISTS public.general_video_interviews ADD COLUMN IF NOT EXISTS transcript TEXT;
+
+-- Queue processors for a video. A repeat for the same upload is a no-op; a
+-- new recording under the same video row (general videos are upserted per
+-- candidate) resets finished or in-flight jobs so the new file is processed.
+-- Returns the jobs that were created or reset.
+CREATE OR REPLACE FUNCTION public.enqueue_video_jobs(
+  p_video_table TEXT,
+  p_video_id UUID,
+  p_video_url TEXT,
+  p_processors TEXT[]
+)
+RETURNS SETOF public.video_jobs AS $$
+  INSERT INTO public.video_jobs (video_table, video_id, video_url, processor)
+  SELECT p_video_table, p_video_id, p_video_url, p
+  FROM unnest(p_processors) AS p
+  ON CONFLICT (video_table, video_id, processor) DO UPDATE
+  SET video_url = EXCLUDED.video_url,
+      status = 'pending',
+      attempts = 0,
+      run_after = NOW(),
+      locked_by = NULL,
+      locked_until = NULL,
+      result = NULL,
+      last_error = NULL,
+      created_at = NOW(),
+      started_at = NULL,
+      finished_at = NULL
+  WHERE public.video_jobs.video_url IS DISTINCT FROM EXCLUDED.video_url
+  RETURNING *;
+$$ LANGUAGE sql;
+
+-- Lease up to p_limit due jobs for the given processors. Expired leases
+-- (crashed or stalled workers) are reclaimed; attempts counts every lease.
+CREATE OR REPLACE FUNCTION public.claim_video_jobs(
+  p_worker TEXT,
+  p_processors TEXT[],
+  p_limit INTEGER DEFAULT 10,
+  p_lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF public.video_jobs AS $$
+  UPDATE public.video_jobs j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      locked_by = p_worker,
+      locked_until = NOW() + make_interval(secs => p_lease_seconds),
+      started_at = NOW()
+  WHERE j.id IN (
+    SELECT id FROM public.video_jobs
+    WHERE processor = ANY(p_processors)
+      AND ((status = 'pending' AND run_after <= NOW())
+        OR (status = 'running' AND locked_until < NOW()))
+    ORDER BY run_after
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$ LANGUAGE sql;
+
+-- Extend the leases a worker still holds; returns the ids it still owns.
+CREATE OR REPLACE FUNCTION public.heartbeat_video_jobs(
+  p_worker TEXT,
+  p_ids UUID[],
+  p_lease_seconds INTEGER DEFAULT 60
+)
+RETURNS SETOF UUID AS $$
+  UPDATE public.video_jobs
+  SET locked_until = NOW() + make_interval(secs => p_lease_seconds)
+  WHERE id = ANY(p_ids) AND locked_by = p_worker AND status = 'running'
+  RETURNING id;
+$$ LANGUAGE sql;
+
+-- Queue depth and latency per processor.
+CREATE OR REPLACE FUNCTION public.video_job_stats()
+RETURNS TABLE (
+  processor TEXT,
+  pending BIGINT,
+  running BIGINT,
+  dead BIGINT,
+  oldest_pending_seconds DOUBLE PRECISION,
+  avg_latency_seconds DOUBLE PRECISION
+) AS $$
+  SELECT
+    processor,
+    COUNT(*) FILTER (WHERE status = 'pending'),
+    COUNT(*) FILTER (WHERE status = 'running'),
+    COUNT(*) FILTER (WHERE status = 'dead'),
+    EXTRACT(EPOCH FROM NOW() - MIN(created_at) FILTER (WHERE status = 'pending')),
+    AVG(EXTRACT(EPOCH FROM finished_at - created_at))
+      FILTER (WHERE status = 'completed' AND finished_at > NOW() - INTERVAL '1 hour')
+  FROM public.video_jobs
+  GROUP BY processor;
+$$ LANGUAGE sql STABLE;
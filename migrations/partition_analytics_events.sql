@@ -0,0 +1,107 @@
+-- Convert analytics_events to a table range-partitioned by month on created_at,
+-- add the (user_id, created_at) index used by cursor pagination, and install
+-- helpers for creating upcoming partitions and dropping expired ones.
+--
+-- Run once; it copies existing rows into the new layout inside one transaction.
+
+BEGIN;
+
+ALTER TABLE public.analytics_events RENAME TO analytics_events_legacy;
+
+CREATE TABLE public.analytics_events (
+    id UUID DEFAULT gen_random_uuid() NOT NULL,
+    user_id UUID REFERENCES public.users(id),
+    event_type TEXT NOT NULL,
+    event_data JSONB,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- The partition key must be part of every unique constraint
+    PRIMARY KEY (created_at, id)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every monthly partition (e.g. clock skew) instead of failing inserts
+CREATE TABLE public.analytics_events_default PARTITION OF public.analytics_events DEFAULT;
+
+-- Indexes declared on the parent are created on every partition
+CREATE INDEX idx_analytics_user_created ON public.analytics_events(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_analytics_type_created ON public.analytics_events(event_type, created_at);
+
+-- Create the partition holding p_month (any timestamp inside the month)
+CREATE OR REPLACE FUNCTION public.create_analytics_partition(p_month TIMESTAMP WITH TIME ZONE)
+RETURNS TEXT AS $$
+DECLARE
+  start_ts TIMESTAMP WITH TIME ZONE := date_trunc('month', p_month);
+  end_ts TIMESTAMP WITH TIME ZONE := date_trunc('month', p_month) + INTERVAL '1 month';
+  part_name TEXT := 'analytics_events_' || to_char(start_ts, 'YYYY_MM');
+BEGIN
+  IF to_regclass('public.' || part_name) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE public.%I PARTITION OF public.analytics_events FOR VALUES FROM (%L) TO (%L)',
+      part_name, start_ts, end_ts
+    );
+  END IF;
+  RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure the current month and the next p_months_ahead months exist
+CREATE OR REPLACE FUNCTION public.ensure_analytics_partitions(p_months_ahead INTEGER DEFAULT 2)
+RETURNS VOID AS $$
+DECLARE
+  i INTEGER;
+BEGIN
+  FOR i IN 0..p_months_ahead LOOP
+    PERFORM public.create_analytics_partition(NOW() + make_interval(months => i));
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention: drop monthly partitions that ended more than p_retain_months ago.
+-- Dropping a partition is O(1) compared with DELETE on a single large table.
+CREATE OR REPLACE FUNCTION public.drop_old_analytics_partitions(p_retain_months INTEGER DEFAULT 12)
+RETURNS SETOF TEXT AS $$
+DECLARE
+  part RECORD;
+  cutoff TIMESTAMP WITH TIME ZONE := date_trunc('month', NOW()) - make_interval(months => p_retain_months);
+BEGIN
+  FOR part IN
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = 'analytics_events'
+      AND c.relname ~ '^analytics_events_[0-9]{4}_[0-9]{2}$'
+  LOOP
+    IF to_timestamp(substring(part.relname from '[0-9]{4}_[0-9]{2}$'), 'YYYY_MM') < cutoff THEN
+      EXECUTE format('DROP TABLE public.%I', part.relname);
+      RETURN NEXT part.relname;
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for every month that already has data, then upcoming months
+SELECT public.create_analytics_partition(m)
+FROM (SELECT DISTINCT date_trunc('month', created_at) AS m FROM public.analytics_events_legacy WHERE created_at IS NOT NULL) months;
+SELECT public.ensure_analytics_partitions(2);
+
+INSERT INTO public.analytics_events (id, user_id, event_type, event_data, ip_address, user_agent, created_at)
+SELECT id, user_id, event_type, event_data, ip_address, user_agent, COALESCE(created_at, NOW())
+FROM public.analytics_events_legacy;
+
+DROP TABLE public.analytics_events_legacy;
+
+ALTER TABLE public.analytics_events ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.analytics_events TO service_role;
+
+COMMIT;
+
+-- Monthly maintenance when pg_cron is available: create ahead, drop expired
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('analytics-partitions-ensure', '0 2 1 * *', $cron$SELECT public.ensure_analytics_partitions(2)$cron$);
+    PERFORM cron.schedule('analytics-partitions-retention', '30 2 1 * *', $cron$SELECT public.drop_old_analytics_partitions(12)$cron$);
+  END IF;
+END $$;